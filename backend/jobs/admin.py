@@ -0,0 +1,27 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "name",
+        "status",
+        "priority",
+        "attempts",
+        "run_at",
+        "finished_at",
+        "duration",
+    )
+    list_filter = ("status", "name")
+    search_fields = ("name",)
+    actions = ["requeue"]
+
+    @admin.action(description="Reenfileirar")
+    def requeue(self, request, queryset):
+        queryset.exclude(status=Job.Status.RUNNING).update(
+            status=Job.Status.QUEUED, attempts=0, run_at=timezone.now()
+        )
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, F, Max, Q
+
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = "Totais e tempos por tarefa (fila, falhas, duração e espera)"
+
+    def handle(self, *args, **options):
+        done = Q(status=Job.Status.DONE)
+        rows = (
+            Job.objects.values("name")
+            .annotate(
+                queued=Count("id", filter=Q(status=Job.Status.QUEUED)),
+                running=Count("id", filter=Q(status=Job.Status.RUNNING)),
+                done=Count("id", filter=done),
+                failed=Count("id", filter=Q(status=Job.Status.FAILED)),
+                avg_duration=Avg("duration", filter=done),
+                max_duration=Max("duration", filter=done),
+                # Da hora prevista ao início da última tentativa
+                avg_wait=Avg(F("started_at") - F("run_at"), filter=done),
+            )
+            .order_by("name")
+        )
+        for row in rows:
+            wait = row["avg_wait"].total_seconds() if row["avg_wait"] else 0
+            self.stdout.write(
+                f"{row['name']}: {row['queued']} na fila, {row['running']} em "
+                f"execução, {row['done']} concluídas, {row['failed']} falhas; "
+                f"duração média {row['avg_duration'] or 0:.3f}s "
+                f"(máx. {row['max_duration'] or 0:.3f}s), espera média {wait:.3f}s"
+            )
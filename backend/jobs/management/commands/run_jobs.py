@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Executa as tarefas da fila (jobs.Job) até receber SIGTERM/SIGINT"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency", type=int, default=4, help="Tarefas simultâneas"
+        )
+        parser.add_argument(
+            "--processes",
+            action="store_true",
+            help="Pool de processos em vez de threads (tarefas de CPU)",
+        )
+        parser.add_argument(
+            "--burst", action="store_true", help="Sai quando a fila esvaziar"
+        )
+
+    def handle(self, *args, **options):
+        Worker(
+            concurrency=options["concurrency"],
+            processes=options["processes"],
+            burst=options["burst"],
+        ).run()
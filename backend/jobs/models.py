@@ -0,0 +1,55 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """Tarefa enfileirada (ver ``jobs.queue``)."""
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Na fila"
+        RUNNING = "running", "Em execução"
+        DONE = "done", "Concluída"
+        FAILED = "failed", "Falhou"
+
+    # Nome registrado com ``@task`` e argumentos posicionais (JSON)
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list, blank=True)
+    # Maior primeiro
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.QUEUED
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    # Não executar antes (atraso pedido ou espera entre tentativas)
+    run_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Segundos da última execução
+    duration = models.FloatField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            # Reserva: próximas da fila, por prioridade
+            models.Index(
+                fields=["-priority", "run_at", "id"],
+                condition=models.Q(status="queued"),
+                name="job_queued_idx",
+            ),
+            # Tarefas presas (worker que caiu) e limpeza das concluídas
+            models.Index(
+                fields=["started_at"],
+                condition=models.Q(status="running"),
+                name="job_running_idx",
+            ),
+            models.Index(
+                fields=["finished_at"],
+                condition=models.Q(status="done"),
+                name="job_done_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
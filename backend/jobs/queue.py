@@ -0,0 +1,195 @@
+"""
+Fila de tarefas no PostgreSQL (tabela ``jobs_job``), sem broker externo.
+
+Tarefas são funções registradas com ``@task`` (em ``<app>/tasks.py``) e
+enfileiradas com ``enqueue`` com argumentos JSON — ids, não instâncias. A
+linha é gravada na transação corrente: se a requisição for desfeita, a tarefa
+também é, e o worker só a vê depois do commit.
+
+O worker (``manage.py run_jobs``) reserva tarefas com ``SELECT ... FOR UPDATE
+SKIP LOCKED``, de modo que vários workers dividem a fila sem disputar as
+mesmas linhas. Uma tarefa pode rodar mais de uma vez (nova tentativa, worker
+que caiu no meio): tarefas devem ser idempotentes.
+"""
+
+import logging
+import time
+import traceback
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Canal do NOTIFY enviado a cada enqueue (acorda os workers em espera)
+CHANNEL = "jobs"
+
+Task = namedtuple("Task", ["func", "priority", "max_attempts", "every"])
+
+registry = {}
+
+
+def task(priority=0, max_attempts=None, every=None):
+    """
+    Registra a função decorada como tarefa, com nome ``módulo.função``.
+
+    Com ``every`` (segundos) e sem argumentos, a tarefa é periódica: os
+    workers a enfileiram nesse intervalo (``schedule_periodic``).
+    """
+
+    def decorator(func):
+        func.job_name = f"{func.__module__}.{func.__qualname__}"
+        registry[func.job_name] = Task(func, priority, max_attempts, every)
+        return func
+
+    return decorator
+
+
+def get_task(name):
+    try:
+        return registry[name]
+    except KeyError:
+        raise LookupError(f"Unknown job: {name}") from None
+
+
+def enqueue(func, *args, priority=None, delay=0, max_attempts=None):
+    """
+    Enfileira a tarefa ``func`` (função registrada ou seu nome) com ``args``.
+
+    Com ``JOBS_EAGER`` a tarefa roda na hora e nada é enfileirado.
+    """
+    name = getattr(func, "job_name", func)
+    spec = get_task(name)
+    if settings.JOBS_EAGER:
+        spec.func(*args)
+        return None
+
+    job = Job.objects.create(
+        name=name,
+        args=list(args),
+        priority=spec.priority if priority is None else priority,
+        max_attempts=max_attempts or spec.max_attempts or settings.JOBS_MAX_ATTEMPTS,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+    if connection.vendor == "postgresql":
+        # Entregue no commit; vários NOTIFY iguais na transação viram um
+        with connection.cursor() as cursor:
+            cursor.execute(f"NOTIFY {CHANNEL}")
+    return job
+
+
+def schedule_periodic(last_scheduled, now):
+    """
+    Enfileira as tarefas periódicas vencidas em ``last_scheduled`` (nome ->
+    instante do último agendamento, atualizado aqui), exceto as que já
+    estão na fila ou em execução. Vários workers podem agendar a mesma tarefa
+    no mesmo intervalo: tarefas periódicas também devem ser idempotentes.
+    """
+    for name, spec in registry.items():
+        if spec.every is None:
+            continue
+        if now - last_scheduled.get(name, now - spec.every) < spec.every:
+            continue
+        last_scheduled[name] = now
+        pending = Job.objects.filter(
+            name=name, status__in=[Job.Status.QUEUED, Job.Status.RUNNING]
+        )
+        if not pending.exists():
+            enqueue(name)
+
+
+def claim(limit):
+    """Reserva até ``limit`` tarefas prontas, por prioridade e ordem de chegada."""
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.Status.QUEUED, run_at__lte=now)
+            .order_by("-priority", "run_at", "id")[:limit]
+        )
+        if jobs:
+            Job.objects.filter(pk__in=[job.pk for job in jobs]).update(
+                status=Job.Status.RUNNING, started_at=now, attempts=F("attempts") + 1
+            )
+    for job in jobs:
+        job.status = Job.Status.RUNNING
+        job.started_at = now
+        job.attempts += 1
+    return jobs
+
+
+def execute(name, args):
+    """
+    Executa a tarefa numa transação; devolve ``(erro, duração)``, com o
+    traceback em ``erro`` se ela falhou.
+    """
+    start = time.perf_counter()
+    error = None
+    try:
+        with transaction.atomic():
+            get_task(name).func(*args)
+    except Exception:
+        error = traceback.format_exc()
+    return error, time.perf_counter() - start
+
+
+def finish(job, error, duration):
+    """Grava o resultado; falhas voltam para a fila com espera crescente."""
+    now = timezone.now()
+    job.finished_at = now
+    job.duration = duration
+    if error is None:
+        job.status = Job.Status.DONE
+        job.last_error = ""
+        logger.info("Job %s #%s done in %.3fs", job.name, job.pk, duration)
+    elif job.attempts < job.max_attempts:
+        job.status = Job.Status.QUEUED
+        job.run_at = now + timedelta(
+            seconds=settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1)
+        )
+        job.last_error = error
+        logger.warning("Job %s #%s failed, retrying: %s", job.name, job.pk, error)
+    else:
+        job.status = Job.Status.FAILED
+        job.last_error = error
+        logger.error("Job %s #%s failed: %s", job.name, job.pk, error)
+    job.save(
+        update_fields=["status", "run_at", "finished_at", "duration", "last_error"]
+    )
+
+
+def requeue_stale():
+    """
+    Devolve à fila as tarefas em execução há mais de ``JOBS_TIMEOUT`` segundos
+    (worker encerrado no meio); as que já esgotaram as tentativas falham.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.JOBS_TIMEOUT)
+    stale = Job.objects.filter(status=Job.Status.RUNNING, started_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.Status.FAILED, last_error="Timed out"
+    )
+    requeued = stale.update(status=Job.Status.QUEUED, last_error="Timed out")
+    return requeued + failed
+
+
+def purge():
+    """Remove as tarefas concluídas há mais de ``JOBS_RETENTION`` segundos."""
+    cutoff = timezone.now() - timedelta(seconds=settings.JOBS_RETENTION)
+    done = Job.objects.filter(status=Job.Status.DONE, finished_at__lt=cutoff)
+    return done.delete()[0]
+
+
+def run_pending():
+    """Executa na thread atual as tarefas prontas, até a fila esvaziar."""
+    count = 0
+    while jobs := claim(1):
+        (job,) = jobs
+        finish(job, *execute(job.name, job.args))
+        count += 1
+    return count
@@ -0,0 +1,147 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from . import queue
+from .models import Job
+
+calls = []
+
+
+@queue.task()
+def record(value):
+    calls.append(value)
+
+
+@queue.task(max_attempts=2)
+def fail(message):
+    raise ValueError(message)
+
+
+class QueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_runs_by_priority_then_arrival(self):
+        queue.enqueue(record, "low")
+        queue.enqueue(record, "high", priority=5)
+        queue.enqueue(record, "low-2")
+        queue.enqueue(record, "later", delay=60)
+
+        self.assertEqual(queue.run_pending(), 3)
+        self.assertEqual(calls, ["high", "low", "low-2"])
+        job = Job.objects.get(args=["high"])
+        self.assertEqual(job.status, Job.Status.DONE)
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.duration)
+        self.assertEqual(Job.objects.get(args=["later"]).status, Job.Status.QUEUED)
+
+    def test_failures_are_retried_then_fail(self):
+        job = queue.enqueue(fail, "boom")
+        with self.assertLogs("jobs.queue", "WARNING"):
+            queue.run_pending()
+        job.refresh_from_db()
+        # Nova tentativa adiada por JOBS_RETRY_DELAY
+        self.assertEqual(job.status, Job.Status.QUEUED)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn("ValueError: boom", job.last_error)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs("jobs.queue", "ERROR"):
+            queue.run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_failed_task_is_rolled_back(self):
+        @queue.task()
+        def write_then_fail():
+            Job.objects.create(name="partial")
+            raise RuntimeError
+
+        queue.enqueue(write_then_fail)
+        with self.assertLogs("jobs.queue", "WARNING"):
+            queue.run_pending()
+        self.assertFalse(Job.objects.filter(name="partial").exists())
+
+    def test_stale_running_jobs_are_requeued(self):
+        job = queue.enqueue(record, "stale")
+        queue.claim(1)
+        Job.objects.filter(pk=job.pk).update(
+            started_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(queue.requeue_stale(), 1)
+        self.assertEqual(queue.run_pending(), 1)
+        self.assertEqual(calls, ["stale"])
+
+    @override_settings(JOBS_EAGER=True)
+    def test_eager_runs_inline(self):
+        self.assertIsNone(queue.enqueue(record, "now"))
+        self.assertEqual(calls, ["now"])
+        self.assertFalse(Job.objects.exists())
+
+    def test_unknown_task(self):
+        with self.assertRaises(LookupError):
+            queue.enqueue("missing.task")
+
+    def test_stats_command(self):
+        queue.enqueue(record, 1)
+        queue.enqueue(record, 2)
+        queue.run_pending()
+        out = StringIO()
+        call_command("job_stats", stdout=out)
+        self.assertIn(
+            "jobs.tests.record: 0 na fila, 0 em execução, 2 concluídas", out.getvalue()
+        )
+
+
+class WorkerTest(TransactionTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_claims_skip_rows_locked_by_another_worker(self):
+        for value in range(4):
+            queue.enqueue(record, value)
+
+        claimed = []
+        locked = threading.Event()
+        release = threading.Event()
+
+        def hold_two():
+            # Outro worker com a transação de reserva ainda aberta
+            with transaction.atomic():
+                jobs = list(
+                    Job.objects.select_for_update(skip_locked=True).order_by("id")[:2]
+                )
+                claimed.extend(job.pk for job in jobs)
+                locked.set()
+                release.wait(5)
+            connections.close_all()
+
+        thread = threading.Thread(target=hold_two)
+        thread.start()
+        locked.wait(5)
+        try:
+            jobs = queue.claim(4)
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual(len(jobs), 2)
+        self.assertFalse({job.pk for job in jobs} & set(claimed))
+
+    def test_burst_worker_runs_queue_in_threads(self):
+        for value in range(10):
+            queue.enqueue(record, value)
+        queue.enqueue(fail, "boom", max_attempts=1)
+
+        with self.assertLogs("jobs.queue", "ERROR"):
+            call_command("run_jobs", concurrency=3, burst=True)
+
+        self.assertEqual(sorted(calls), list(range(10)))
+        self.assertEqual(Job.objects.filter(status=Job.Status.DONE).count(), 10)
+        self.assertEqual(Job.objects.filter(status=Job.Status.FAILED).count(), 1)
@@ -0,0 +1,150 @@
+"""
+Worker da fila (``manage.py run_jobs``).
+
+A thread principal reserva tarefas (até uma por vaga livre), entrega cada uma
+a um pool de threads ou de processos e grava o resultado. Sem vaga ou sem
+tarefa, ela dorme até uma tarefa terminar, chegar um ``NOTIFY`` do
+``enqueue`` (``LISTEN`` na própria conexão) ou passar ``JOBS_POLL_INTERVAL``
+segundos — tarefas adiadas e novas tentativas só são vistas no polling.
+A cada volta ela também enfileira as tarefas periódicas vencidas (exceto
+com ``burst``).
+"""
+
+import logging
+import multiprocessing
+import os
+import select
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+from . import queue
+
+logger = logging.getLogger(__name__)
+
+# Intervalo (s) entre as manutenções: tarefas presas e limpeza das concluídas
+MAINTENANCE_INTERVAL = 60
+
+
+def run_job(name, args):
+    """Entrada das threads e processos do pool."""
+    # Conexões destas threads não são fechadas pelo ciclo de request
+    close_old_connections()
+    try:
+        return queue.execute(name, args)
+    finally:
+        close_old_connections()
+
+
+class Worker:
+    def __init__(self, concurrency=4, processes=False, burst=False):
+        self.concurrency = concurrency
+        self.processes = processes
+        # Sai quando a fila esvazia, em vez de esperar novas tarefas
+        self.burst = burst
+        self.running = {}
+        self.stopping = False
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        os.set_blocking(self._wakeup_write, False)
+        self._listening = False
+        self._maintained_at = 0.0
+        self._scheduled = {}
+
+    def stop(self, *args):
+        self.stopping = True
+        self._wake()
+
+    def _wake(self, *args):
+        try:
+            os.write(self._wakeup_write, b"\0")
+        except BlockingIOError:
+            pass
+
+    def _executor(self):
+        if self.processes:
+            # spawn: os filhos não herdam a conexão (e o LISTEN) do pai
+            return ProcessPoolExecutor(
+                self.concurrency,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            )
+        return ThreadPoolExecutor(self.concurrency, thread_name_prefix="job")
+
+    def _listen(self):
+        if connection.vendor != "postgresql":
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {queue.CHANNEL}")
+        self._listening = True
+
+    def _sleep(self, timeout):
+        sockets = [self._wakeup_read]
+        if self._listening:
+            sockets.append(connection.connection)
+        readable, _, _ = select.select(sockets, [], [], timeout)
+        if self._wakeup_read in readable:
+            os.read(self._wakeup_read, 1024)
+        if self._listening:
+            connection.connection.poll()
+            connection.connection.notifies.clear()
+
+    def _maintain(self):
+        if time.monotonic() - self._maintained_at < MAINTENANCE_INTERVAL:
+            return
+        self._maintained_at = time.monotonic()
+        stale = queue.requeue_stale()
+        if stale:
+            logger.warning("Requeued %s stale jobs", stale)
+        queue.purge()
+
+    def _collect(self):
+        for future in [future for future in self.running if future.done()]:
+            job = self.running.pop(future)
+            try:
+                error, duration = future.result()
+            except Exception as exc:
+                # Processo do pool encerrado no meio da tarefa
+                error, duration = repr(exc), time.monotonic() - job.monotonic_start
+            queue.finish(job, error, duration)
+
+    def run(self):
+        handlers = {
+            signum: signal.signal(signum, self.stop)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        try:
+            self._listen()
+            self._loop()
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+            if self._listening:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"UNLISTEN {queue.CHANNEL}")
+
+    def _loop(self):
+        with self._executor() as executor:
+            while not self.stopping:
+                self._maintain()
+                if not self.burst:
+                    queue.schedule_periodic(self._scheduled, time.monotonic())
+                self._collect()
+                free = self.concurrency - len(self.running)
+                jobs = queue.claim(free) if free else []
+                for job in jobs:
+                    job.monotonic_start = time.monotonic()
+                    future = executor.submit(run_job, job.name, job.args)
+                    self.running[future] = job
+                    future.add_done_callback(self._wake)
+                if self.burst and not self.running:
+                    break
+                if not jobs or len(self.running) == self.concurrency:
+                    self._sleep(settings.JOBS_POLL_INTERVAL)
+            # Encerramento: termina as tarefas em andamento
+            for future in list(self.running):
+                future.exception()
+            self._collect()
@@ -0,0 +1,8 @@
+from django.contrib import admin
+
+from .models import Trend
+
+
+@admin.register(Trend)
+class TrendAdmin(admin.ModelAdmin):
+    list_display = ("position", "hashtag", "score", "tweets", "refreshed_at")
@@ -0,0 +1,155 @@
+"""
+Contadores dos assuntos do momento (hashtags).
+
+Cada hashtag guarda um anel compacto com as contagens dos últimos
+``TRENDS_BUCKETS`` intervalos de ``TRENDS_BUCKET_SECONDS``: gravar um tweet
+soma 1 no intervalo corrente e zera as posições dos intervalos que passaram
+sem uso. As contagens chegam pela fila (``trends.tasks.count_hashtags``, a
+partir da criação do tweet), fora da requisição.
+
+``refresh`` (tarefa periódica) pontua as hashtags ativas, com peso que cai à
+metade a cada ``TRENDS_HALF_LIFE`` segundos, e grava o top-K em ``Trend``. A
+rota ``/api/trends/`` só lê esse top-K: nada é agregado sobre ``Tweet``.
+"""
+
+import heapq
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import HashtagCounter, Trend
+
+
+def bucket_at(moment):
+    """Intervalo do instante ``moment`` (segundos desde a época)."""
+    return int(moment // settings.TRENDS_BUCKET_SECONDS)
+
+
+def advance(counts, last, bucket):
+    """
+    Move o anel ``counts`` (último intervalo gravado: ``last``) até
+    ``bucket``, zerando as posições dos intervalos intermediários.
+    """
+    size = len(counts)
+    for skipped in range(max(last + 1, bucket - size + 1), bucket + 1):
+        counts[skipped % size] = 0
+
+
+def add(counter, bucket, amount=1):
+    """Soma ``amount`` ao intervalo ``bucket`` do anel de ``counter``."""
+    size = settings.TRENDS_BUCKETS
+    if len(counter.counts) != size:
+        # Tamanho da janela mudou: recomeça a contagem
+        counter.counts, counter.bucket = [0] * size, bucket
+    if bucket > counter.bucket:
+        advance(counter.counts, counter.bucket, bucket)
+        counter.bucket = bucket
+    elif counter.bucket - bucket >= size:
+        # Atrasado demais: o intervalo já saiu da janela
+        return
+    counter.counts[bucket % size] += amount
+
+
+# Mesma regra de ``add``, num único INSERT ... ON CONFLICT: sem leitura
+# travada nem ida e volta por hashtag. As linhas são gravadas em ordem de
+# hashtag, então tarefas concorrentes não se bloqueiam em ciclo.
+RECORD_SQL = f"""
+    INSERT INTO {HashtagCounter._meta.db_table} AS counter (hashtag, counts, bucket)
+    SELECT name, ARRAY(
+        SELECT (i = %(slot)s)::integer
+        FROM generate_series(0, %(size)s - 1) AS i ORDER BY i
+    ), %(bucket)s
+    FROM unnest(%(hashtags)s::varchar[]) AS name
+    ORDER BY name
+    ON CONFLICT (hashtag) DO UPDATE SET
+        counts = CASE
+            WHEN cardinality(counter.counts) <> %(size)s THEN EXCLUDED.counts
+            WHEN counter.bucket - %(bucket)s >= %(size)s THEN counter.counts
+            ELSE ARRAY(
+                SELECT CASE
+                    WHEN %(bucket)s > counter.bucket
+                        AND mod(mod(i - counter.bucket - 1, %(size)s) + %(size)s,
+                                %(size)s) < %(bucket)s - counter.bucket
+                    THEN 0
+                    ELSE counter.counts[i + 1]
+                END + (i = %(slot)s)::integer
+                FROM generate_series(0, %(size)s - 1) AS i ORDER BY i
+            )
+        END,
+        bucket = CASE
+            WHEN cardinality(counter.counts) <> %(size)s THEN EXCLUDED.bucket
+            ELSE GREATEST(counter.bucket, EXCLUDED.bucket)
+        END
+"""
+
+
+def record(hashtags, moment):
+    """Conta um tweet com ``hashtags`` (normalizadas) publicado em ``moment``."""
+    hashtags = sorted(set(hashtags))
+    if not hashtags:
+        return
+    bucket = bucket_at(moment)
+    size = settings.TRENDS_BUCKETS
+    params = {
+        "hashtags": hashtags,
+        "bucket": bucket,
+        "size": size,
+        "slot": bucket % size,
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(RECORD_SQL, params)
+
+
+def score(counts, last, now):
+    """
+    Pontuação no intervalo ``now``: soma das contagens ainda na janela, com
+    peso que cai à metade a cada ``TRENDS_HALF_LIFE`` segundos de idade.
+    Devolve também o total sem decaimento.
+    """
+    size = len(counts)
+    decay = 0.5 ** (settings.TRENDS_BUCKET_SECONDS / settings.TRENDS_HALF_LIFE)
+    total, weighted = 0, 0.0
+    # Intervalos depois de ``last`` não tiveram uso (posições ainda não zeradas)
+    for bucket in range(max(last - size + 1, now - size + 1), min(last, now) + 1):
+        count = counts[bucket % size]
+        total += count
+        weighted += count * decay ** (now - bucket)
+    return weighted, total
+
+
+def refresh(moment=None):
+    """Recalcula o top-K em ``Trend`` e apaga os contadores fora da janela."""
+    now = bucket_at(time.time() if moment is None else moment)
+    oldest = now - settings.TRENDS_BUCKETS + 1
+    active = HashtagCounter.objects.filter(bucket__gte=oldest).values_list(
+        "hashtag", "counts", "bucket"
+    )
+    scored = (
+        (*score(counts, last, now), hashtag)
+        for hashtag, counts, last in active.iterator()
+    )
+    # Empate na pontuação: mais tweets na janela
+    top = heapq.nlargest(
+        settings.TRENDS_TOP_K,
+        (item for item in scored if item[1]),
+        key=lambda item: item[:2],
+    )
+    refreshed_at = timezone.now()
+    with transaction.atomic():
+        Trend.objects.all().delete()
+        Trend.objects.bulk_create(
+            [
+                Trend(
+                    position=position,
+                    hashtag=hashtag,
+                    score=weighted,
+                    tweets=total,
+                    refreshed_at=refreshed_at,
+                )
+                for position, (weighted, total, hashtag) in enumerate(top, 1)
+            ]
+        )
+    HashtagCounter.objects.filter(bucket__lt=oldest).delete()
+    return len(top)
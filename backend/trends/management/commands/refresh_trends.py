@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from trends import counters
+
+
+class Command(BaseCommand):
+    help = "Recalcula os assuntos do momento (sem worker, rode periodicamente)"
+
+    def handle(self, *args, **options):
+        count = counters.refresh()
+        self.stdout.write(self.style.SUCCESS(f"{count} assuntos no ranking"))
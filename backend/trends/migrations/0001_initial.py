@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:17
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="HashtagCounter",
+            fields=[
+                (
+                    "hashtag",
+                    models.CharField(max_length=100, primary_key=True, serialize=False),
+                ),
+                (
+                    "counts",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.PositiveIntegerField(), size=None
+                    ),
+                ),
+                ("bucket", models.BigIntegerField(db_index=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="Trend",
+            fields=[
+                (
+                    "position",
+                    models.PositiveSmallIntegerField(primary_key=True, serialize=False),
+                ),
+                ("hashtag", models.CharField(max_length=100)),
+                ("score", models.FloatField()),
+                ("tweets", models.PositiveIntegerField()),
+                ("refreshed_at", models.DateTimeField()),
+            ],
+            options={
+                "ordering": ["position"],
+            },
+        ),
+    ]
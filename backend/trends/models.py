@@ -0,0 +1,33 @@
+from django.contrib.postgres.fields import ArrayField
+from django.db import models
+
+
+class HashtagCounter(models.Model):
+    """Uso recente de uma hashtag, em intervalos (ver ``trends.counters``)."""
+
+    hashtag = models.CharField(max_length=100, primary_key=True)
+    # Anel de TRENDS_BUCKETS posições: o intervalo n fica em counts[n % tamanho]
+    counts = ArrayField(models.PositiveIntegerField())
+    # Último intervalo gravado (época em segundos // TRENDS_BUCKET_SECONDS)
+    bucket = models.BigIntegerField(db_index=True)
+
+    def __str__(self):
+        return f"#{self.hashtag}"
+
+
+class Trend(models.Model):
+    """Top-K pré-calculado por ``trends.counters.refresh``."""
+
+    position = models.PositiveSmallIntegerField(primary_key=True)
+    hashtag = models.CharField(max_length=100)
+    # Contagem com decaimento exponencial (ordena o ranking)
+    score = models.FloatField()
+    # Tweets na janela inteira, sem decaimento
+    tweets = models.PositiveIntegerField()
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["position"]
+
+    def __str__(self):
+        return f"{self.position}. #{self.hashtag}"
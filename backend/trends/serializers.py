@@ -0,0 +1,9 @@
+from rest_framework import serializers
+
+from .models import Trend
+
+
+class TrendSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Trend
+        fields = ["position", "hashtag", "tweets", "score", "refreshed_at"]
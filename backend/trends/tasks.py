@@ -0,0 +1,17 @@
+"""Tarefas da fila (``jobs.queue``) dos assuntos do momento."""
+
+from django.conf import settings
+
+from jobs.queue import task
+
+from . import counters
+
+
+@task(priority=1)
+def count_hashtags(hashtags, moment):
+    counters.record(hashtags, moment)
+
+
+@task(every=settings.TRENDS_REFRESH_INTERVAL)
+def refresh():
+    counters.refresh()
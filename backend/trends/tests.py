@@ -0,0 +1,111 @@
+import time
+
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from jobs import queue
+from users.models import User
+
+from . import counters
+from .models import HashtagCounter, Trend
+
+BUCKET = 900
+NOW = 1_000_000 * BUCKET
+
+
+@override_settings(
+    TRENDS_BUCKET_SECONDS=BUCKET, TRENDS_BUCKETS=4, TRENDS_HALF_LIFE=BUCKET
+)
+class CountersTest(TestCase):
+    def test_ring_advances_and_clears_skipped_buckets(self):
+        counter = HashtagCounter(hashtag="a", counts=[0] * 4, bucket=10)
+        for bucket in (10, 10, 11, 13):
+            counters.add(counter, bucket)
+        self.assertEqual((counter.counts, counter.bucket), ([0, 1, 2, 1], 13))
+        # Atrasado, ainda na janela / fora da janela
+        counters.add(counter, 12)
+        counters.add(counter, 9)
+        self.assertEqual(counter.counts, [1, 1, 2, 1])
+        # Volta completa: só o novo intervalo fica
+        counters.add(counter, 20)
+        self.assertEqual(counter.counts, [1, 0, 0, 0])
+
+    def test_record_matches_ring_rule(self):
+        # A gravação em SQL segue ``add``: avanço, atraso, volta completa
+        expected = HashtagCounter(hashtag="a", counts=[0] * 4, bucket=10)
+        for bucket in (10, 10, 11, 13, 12, 9, 15, 20, 22):
+            with self.assertNumQueries(1):
+                counters.record(["a", "a"], bucket * BUCKET)
+            counters.add(expected, bucket)
+            counter = HashtagCounter.objects.get(hashtag="a")
+            self.assertEqual(
+                (counter.counts, counter.bucket), (expected.counts, expected.bucket)
+            )
+
+        # Tamanho da janela mudou: recomeça a contagem
+        with self.settings(TRENDS_BUCKETS=3):
+            counters.record(["a"], 5 * BUCKET)
+        counter = HashtagCounter.objects.get(hashtag="a")
+        self.assertEqual((counter.counts, counter.bucket), ([0, 0, 1], 5))
+
+        with self.assertNumQueries(0):
+            counters.record([], NOW)
+
+    def test_score_decays_by_half_life(self):
+        # Intervalos 10..13 no anel; 14 e 15 sem uso
+        counts = [4, 4, 4, 4]
+        self.assertEqual(counters.score(counts, 13, 13), (4 + 2 + 1 + 0.5, 16))
+        self.assertEqual(counters.score(counts, 13, 15), (1 + 0.5, 8))
+        self.assertEqual(counters.score(counts, 13, 17), (0, 0))
+
+    def test_refresh_ranks_recent_usage(self):
+        for _ in range(3):
+            counters.record(["antigo"], NOW - 3 * BUCKET)
+        counters.record(["novo", "antigo"], NOW)
+        counters.record(["novo"], NOW)
+        counters.record(["expirado"], NOW - 10 * BUCKET)
+
+        self.assertEqual(counters.refresh(NOW), 2)
+        self.assertEqual(
+            list(Trend.objects.values_list("position", "hashtag", "tweets")),
+            [(1, "novo", 2), (2, "antigo", 4)],
+        )
+        self.assertFalse(HashtagCounter.objects.filter(hashtag="expirado").exists())
+
+        # Sem uso recente, o ranking esvazia
+        counters.refresh(NOW + 10 * BUCKET)
+        self.assertFalse(Trend.objects.exists())
+
+
+class TrendsAPITest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user(username="alice", email="a@example.com")
+        )
+
+    def test_new_tweets_reach_trends_after_refresh(self):
+        for content in ("#Copa hoje", "#copa e #chuva", "#chuva"):
+            self.client.post("/api/tweets/", {"content": content})
+        self.client.post("/api/tweets/", {"content": "#Copa"})
+        queue.run_pending()
+        self.assertEqual(self.client.get("/api/trends/").data, [])
+
+        counters.refresh()
+        response = self.client.get("/api/trends/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(trend["hashtag"], trend["tweets"]) for trend in response.data],
+            [("copa", 3), ("chuva", 2)],
+        )
+
+    def test_refresh_is_periodic(self):
+        last = {}
+        queue.schedule_periodic(last, time.monotonic())
+        queue.schedule_periodic(last, time.monotonic())
+        self.assertEqual(queue.run_pending(), 1)
+        # Vencido de novo, mas ainda na fila: não duplica
+        queue.schedule_periodic({}, time.monotonic())
+        queue.schedule_periodic({}, time.monotonic())
+        self.assertEqual(queue.run_pending(), 1)
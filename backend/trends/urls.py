@@ -0,0 +1,11 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from .views import TrendViewSet
+
+router = DefaultRouter()
+router.register(r"trends", TrendViewSet)
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
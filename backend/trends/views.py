@@ -0,0 +1,12 @@
+from rest_framework import mixins, viewsets
+
+from .models import Trend
+from .serializers import TrendSerializer
+
+
+class TrendViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    # Top-K pré-calculado (trends.counters.refresh): no máximo TRENDS_TOP_K
+    # linhas, sem paginação
+    queryset = Trend.objects.all()
+    serializer_class = TrendSerializer
+    pagination_class = None
@@ -0,0 +1,95 @@
+"""
+Variantes assíncronas das leituras de ``TweetViewSet`` (``list``,
+``retrieve``, ``feed`` e ``comments``), com a mesma saída, e o stream SSE
+de ``tweets.live``.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
+from rest_framework.exceptions import NotAuthenticated, ParseError
+from rest_framework.response import Response
+
+from twitter.async_api import async_read_view
+from twitter.pagination import CommentPagination, FeedPagination, TweetPagination
+
+from . import live, timeline
+from .models import Tweet, TweetComment
+from .serializers import (
+    TweetCommentSerializer,
+    TweetSerializer,
+    serialize_tweet_rows,
+    tweet_rows,
+)
+from .views import TweetViewSet
+
+
+@async_read_view
+async def tweet_list(request):
+    paginator = TweetPagination()
+    page = await paginator.apaginate_queryset(
+        tweet_rows(TweetViewSet.queryset.all()), request
+    )
+    # A serialização lê os deltas de engajamento do cache (I/O síncrono)
+    data = await sync_to_async(serialize_tweet_rows)(page, request, request.user)
+    return paginator.get_paginated_response(data)
+
+
+@async_read_view
+async def tweet_detail(request, pk):
+    tweet = await TweetViewSet.queryset.filter(pk=pk).afirst()
+    if tweet is None:
+        raise Http404("No Tweet matches the given query.")
+    serializer = TweetSerializer(tweet, context={"request": request})
+    return Response(await sync_to_async(lambda: serializer.data)())
+
+
+@async_read_view
+async def feed(request):
+    sources = [
+        tweet_rows(source, "feed_at") for source in timeline.home_timeline(request.user)
+    ]
+    paginator = FeedPagination()
+    page = await paginator.apaginate_queryset(sources, request)
+    data = await sync_to_async(serialize_tweet_rows)(page, viewer=request.user)
+    return paginator.get_paginated_response(data)
+
+
+@async_read_view
+async def stream(request):
+    # Só sob ASGI: a conexão fica aberta sem ocupar uma thread
+    if not request.user.is_authenticated:
+        raise NotAuthenticated()
+    try:
+        tweet_ids = [
+            int(value)
+            for value in request.query_params.get("tweets", "").split(",")
+            if value
+        ]
+    except ValueError:
+        raise ParseError("Invalid tweets")
+    response = StreamingHttpResponse(
+        live.event_stream(request.user, tweet_ids[: settings.LIVE_MAX_TWEETS]),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    # Sem buffer em proxies (nginx)
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@async_read_view
+async def comments(request, pk):
+    # O tweet e a página de comentários não dependem um do outro
+    comments = TweetComment.objects.filter(tweet_id=pk).select_related("author")
+    paginator = CommentPagination()
+    exists, page = await asyncio.gather(
+        Tweet.objects.filter(pk=pk).aexists(),
+        paginator.apaginate_queryset(comments, request),
+    )
+    if not exists:
+        raise Http404("No Tweet matches the given query.")
+    serializer = TweetCommentSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
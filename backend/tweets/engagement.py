@@ -0,0 +1,216 @@
+"""
+Buffer write-behind dos contadores de engajamento (likes, retweets, replies).
+
+Os deltas são acumulados em memória por tweet e gravados em lote com
+``UPDATE ... SET likes = likes + n``, em vez de um ``save()`` por ação.
+As linhas de TweetLike/TweetRetweet/TweetComment continuam sendo a fonte da
+verdade: ``recount`` corrige os contadores se o processo cair antes do flush.
+
+``recount`` grava no banco (``EngagementRecount``, visto por todos os
+processos) quando começou e terminou. Deltas acumulados antes do fim do último
+``recount``, ou durante um em andamento, já podem estar nas contagens dele:
+no flush, os contadores desses tweets são recalculados das tabelas de origem
+em vez de somados, para não contar a mesma ação duas vezes.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from users.counters import subquery_count
+
+from . import live
+from .models import EngagementRecount, Tweet, TweetComment, TweetLike, TweetRetweet
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("likes", "retweets", "replies")
+# Linha única de ``EngagementRecount``
+RECOUNT_PK = 1
+
+
+class EngagementBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = defaultdict(Counter)
+        # Instante do delta mais antigo em ``_pending``
+        self._since = None
+        self._flusher = None
+
+    def add(self, tweet_id, field, delta=1):
+        if field not in FIELDS:
+            raise ValueError(f"Unknown engagement field: {field}")
+        if not settings.ENGAGEMENT_BUFFER_ENABLED:
+            self._write({tweet_id: Counter({field: delta})})
+            return
+
+        with self._lock:
+            if self._since is None:
+                self._since = timezone.now()
+            self._pending[tweet_id][field] += delta
+            size = len(self._pending)
+        self._ensure_flusher()
+        if size >= settings.ENGAGEMENT_BUFFER_MAX_TWEETS:
+            self.flush()
+
+    def pending(self, tweet_id):
+        """Deltas ainda não gravados para ``tweet_id``."""
+        with self._lock:
+            return dict(self._pending.get(tweet_id, {}))
+
+    def pending_many(self, tweet_ids):
+        """Deltas ainda não gravados, por tweet, para ``tweet_ids``."""
+        with self._lock:
+            return {
+                tweet_id: dict(self._pending[tweet_id])
+                for tweet_id in tweet_ids
+                if tweet_id in self._pending
+            }
+
+    def flush(self):
+        """Grava os deltas acumulados; devolve o número de tweets atualizados."""
+        with self._lock:
+            batch, self._pending = self._pending, defaultdict(Counter)
+            since, self._since = self._since, None
+        if not batch:
+            return 0
+        try:
+            if _recounted_since(since):
+                ids = list(batch)
+                recount(Tweet.objects.filter(id__in=ids))
+                live.publish_counts(ids, FIELDS)
+            else:
+                self._write(batch)
+        except DatabaseError:
+            logger.exception("Engagement flush failed, re-queueing %d", len(batch))
+            with self._lock:
+                for tweet_id, deltas in batch.items():
+                    self._pending[tweet_id].update(deltas)
+                if self._since is None or since < self._since:
+                    self._since = since
+            return 0
+        return len(batch)
+
+    def _write(self, batch):
+        items = [(tweet_id, deltas) for tweet_id, deltas in batch.items() if deltas]
+        size = settings.ENGAGEMENT_FLUSH_BATCH_SIZE
+        for start in range(0, len(items), size):
+            chunk = items[start : start + size]
+            updates = {}
+            for field in FIELDS:
+                whens = [
+                    When(id=tweet_id, then=Value(deltas[field]))
+                    for tweet_id, deltas in chunk
+                    if deltas[field]
+                ]
+                if whens:
+                    delta = Case(*whens, default=Value(0), output_field=IntegerField())
+                    updates[field] = Greatest(F(field) + delta, Value(0))
+            if updates:
+                ids = [tweet_id for tweet_id, _ in chunk]
+                Tweet.objects.filter(id__in=ids).update(**updates)
+                live.publish_counts(ids, FIELDS)
+
+    def _ensure_flusher(self):
+        interval = settings.ENGAGEMENT_FLUSH_INTERVAL
+        if interval <= 0 or self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(
+                target=self._run, args=(interval,), name="engagement-flush", daemon=True
+            )
+            self._flusher.start()
+        atexit.register(self.flush)
+
+    def _run(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Unexpected error in engagement flush")
+            finally:
+                # Conexões desta thread não são fechadas pelo ciclo de request
+                connections.close_all()
+
+
+def _recounted_since(since):
+    """Se um ``recount`` terminou depois de ``since`` ou ainda está rodando."""
+    marker = EngagementRecount.objects.filter(pk=RECOUNT_PK).first()
+    if marker is None:
+        return False
+    finished = marker.finished_at
+    running = finished is None or finished < marker.started_at
+    timeout = timedelta(seconds=settings.ENGAGEMENT_RECOUNT_TIMEOUT)
+    if running and timezone.now() - marker.started_at < timeout:
+        return True
+    return finished is not None and finished >= since
+
+
+buffer = EngagementBuffer()
+
+
+def record(tweet_id, field, delta=1):
+    buffer.add(tweet_id, field, delta)
+
+
+def pending(tweet_id):
+    return buffer.pending(tweet_id)
+
+
+def pending_many(tweet_ids):
+    return buffer.pending_many(tweet_ids)
+
+
+def flush():
+    return buffer.flush()
+
+
+def recount(queryset=None, batch_size=10000):
+    """
+    Recalcula likes/retweets/replies a partir das tabelas de origem.
+
+    Sem ``queryset`` (todos os tweets), marca o início e o fim em
+    ``EngagementRecount``: os deltas que os outros processos acumularam até o
+    fim são descartados no flush deles, que recalcula esses tweets. O fim é
+    marcado mesmo se o recount falhar: o flush recalcula das tabelas de
+    origem, então descartar os deltas nunca perde contagens.
+    """
+    if queryset is not None:
+        return _recount(queryset, batch_size)
+    EngagementRecount.objects.update_or_create(
+        pk=RECOUNT_PK, defaults={"started_at": timezone.now()}
+    )
+    try:
+        return _recount(Tweet.objects.all(), batch_size)
+    finally:
+        EngagementRecount.objects.filter(pk=RECOUNT_PK).update(
+            finished_at=timezone.now()
+        )
+
+
+def _recount(queryset, batch_size):
+    ids = queryset.order_by("id").values_list("id", flat=True)
+    first, last = ids.first(), ids.last()
+    if first is None:
+        return 0
+
+    updated = 0
+    for start in range(first, last + 1, batch_size):
+        updated += queryset.filter(id__gte=start, id__lt=start + batch_size).update(
+            likes=subquery_count(TweetLike, "tweet"),
+            retweets=subquery_count(TweetRetweet, "tweet"),
+            replies=subquery_count(TweetComment, "tweet"),
+        )
+    return updated
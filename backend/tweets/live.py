@@ -0,0 +1,135 @@
+"""
+Eventos do feed em tempo real, enviados por SSE em ``/api/tweets/stream/``.
+
+- ``tweet``: novo tweet de um autor seguido (ou do próprio usuário), só com
+  ``id`` e ``author``; o cliente busca os novos com ``since_id``.
+- ``counts``: contadores atuais de um tweet visível, publicados no flush do
+  buffer de engajamento (no máximo um por tweet a cada intervalo).
+- ``reset``: eventos foram descartados (cliente lento); recarregar o feed.
+
+Canais: ``author:<id>`` (tweets novos), ``tweet:<id>`` (contadores) e
+``user:<id>`` (follows do próprio usuário, para ajustar a assinatura).
+"""
+
+import asyncio
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+
+from twitter import pubsub
+from users.models import UserFollowing
+
+from .models import Tweet
+
+
+def author_channel(author_id):
+    return f"author:{author_id}"
+
+
+def tweet_channel(tweet_id):
+    return f"tweet:{tweet_id}"
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+def _publish_on_commit(channel, message):
+    transaction.on_commit(lambda: pubsub.publish(channel, message))
+
+
+def publish_tweet(tweet):
+    _publish_on_commit(
+        author_channel(tweet.author_id),
+        {"type": "tweet", "id": tweet.pk, "author": tweet.author_id},
+    )
+
+
+def publish_counts(tweet_ids, fields):
+    """Publica os contadores gravados de ``tweet_ids`` que têm assinantes."""
+    ids = [tweet_id for tweet_id in tweet_ids if pubsub.wants(tweet_channel(tweet_id))]
+    if not ids:
+        return
+    for row in Tweet.objects.filter(id__in=ids).values("id", *fields):
+        _publish_on_commit(tweet_channel(row["id"]), {"type": "counts", **row})
+
+
+def publish_follow(user_id, author_id, following=True):
+    _publish_on_commit(
+        user_channel(user_id),
+        {"type": "follow" if following else "unfollow", "author": author_id},
+    )
+
+
+def format_event(message):
+    return f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+
+
+def _track(subscription, tracked, tweet_id):
+    """
+    Acompanha os contadores de ``tweet_id``; acima de ``LIVE_MAX_TWEETS``
+    tweets, deixa de acompanhar os mais antigos.
+    """
+    channel = tweet_channel(tweet_id)
+    if channel in tracked:
+        return
+    subscription.add(channel)
+    tracked[channel] = None
+    while len(tracked) > settings.LIVE_MAX_TWEETS:
+        oldest, _ = tracked.popitem(last=False)
+        subscription.remove(oldest)
+
+
+async def event_stream(user, tweet_ids=()):
+    """
+    Eventos SSE para ``user``: tweets novos dos autores seguidos e
+    contadores de ``tweet_ids`` e dos tweets anunciados no próprio stream
+    (no máximo ``LIVE_MAX_TWEETS``, os mais recentes).
+    """
+    authors = [
+        author_id
+        async for author_id in UserFollowing.objects.filter(user=user).values_list(
+            "following_user_id", flat=True
+        )
+    ]
+    subscription = pubsub.subscribe(
+        [
+            user_channel(user.pk),
+            author_channel(user.pk),
+            *map(author_channel, authors),
+        ]
+    )
+    # Canais tweet:<id> acompanhados, do mais antigo ao mais novo
+    tracked = OrderedDict()
+    for tweet_id in sorted(tweet_ids):
+        _track(subscription, tracked, tweet_id)
+    try:
+        yield f"retry: {settings.LIVE_RETRY_MS}\n\n"
+        while True:
+            try:
+                channel, message = await asyncio.wait_for(
+                    subscription.get(), settings.LIVE_KEEPALIVE
+                )
+            except asyncio.TimeoutError:
+                # Comentário SSE: mantém a conexão aberta em proxies
+                yield ": keepalive\n\n"
+                continue
+
+            if channel is not None and channel not in subscription.channels:
+                # Já enfileirada quando o canal saiu da assinatura (unfollow)
+                continue
+            kind = message["type"]
+            if kind == "follow":
+                subscription.add(author_channel(message["author"]))
+                continue
+            if kind == "unfollow":
+                subscription.remove(author_channel(message["author"]))
+                continue
+            if kind == "tweet":
+                # O cliente vai exibir o tweet: acompanhar os contadores
+                _track(subscription, tracked, message["id"])
+            yield format_event(message)
+    finally:
+        subscription.close()
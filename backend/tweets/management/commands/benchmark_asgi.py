@@ -0,0 +1,185 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from wsgiref.util import setup_testing_defaults
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db.backends.signals import connection_created
+from django.test import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import User
+
+DEFAULT_PATHS = ["/api/tweets/feed/", "/api/tweets/", "/api/users/following/"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara a concorrência de um worker: WSGI com as views do DRF (como o "
+        "gunicorn de produção) contra ASGI com as views de leitura assíncronas. "
+        "Use sobre dados de generate_synthetic_data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Rota a medir (repetível; padrão: feed, tweets e following)",
+        )
+        parser.add_argument(
+            "--user",
+            help="Usuário autenticado (padrão: o que segue mais contas)",
+        )
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=20,
+            help="Requisições simultâneas no event loop do worker ASGI",
+        )
+        parser.add_argument(
+            "--query-latency",
+            type=float,
+            default=0,
+            help="Latência de rede simulada por consulta SQL, em ms",
+        )
+        parser.add_argument(
+            "--wsgi-threads",
+            type=int,
+            default=1,
+            help="Threads do worker WSGI (1 = worker sync do gunicorn)",
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options["user"]:
+            users = users.filter(username=options["user"])
+        user = users.order_by("-following_count").first()
+        if user is None:
+            raise CommandError("Nenhum usuário; rode generate_synthetic_data antes")
+
+        headers = {
+            "HTTP_HOST": "localhost",
+            "HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}",
+        }
+        total = options["requests"]
+        if options["query_latency"]:
+            latency = options["query_latency"] / 1000
+
+            def delay(execute, *args):
+                time.sleep(latency)
+                return execute(*args)
+
+            def install(connection, **kwargs):
+                # Conexões reabertas reaproveitam o mesmo wrapper
+                if delay not in connection.execute_wrappers:
+                    connection.execute_wrappers.append(delay)
+
+            connection_created.connect(install, weak=False)
+        self.stdout.write(
+            f"{total} requisições por rota como {user.username}; "
+            f"WSGI com {options['wsgi_threads']} thread(s), "
+            f"ASGI com {options['concurrency']} simultâneas, "
+            f"+{options['query_latency']:g} ms por consulta"
+        )
+        for path in options["paths"] or DEFAULT_PATHS:
+            with override_settings(ROOT_URLCONF="twitter.urls"):
+                wsgi = self.run_wsgi(path, headers, total, options["wsgi_threads"])
+            with override_settings(ROOT_URLCONF="twitter.urls_async"):
+                asgi = asyncio.run(
+                    self.run_asgi(path, headers, total, options["concurrency"])
+                )
+            self.stdout.write(path)
+            self.report("WSGI", *wsgi)
+            self.report("ASGI", *asgi)
+
+    def report(self, label, elapsed, latencies, statuses):
+        latencies = sorted(latencies)
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        errors = sum(status >= 400 for status in statuses)
+        self.stdout.write(
+            f"  {label}: {len(latencies) / elapsed:8.1f} req/s  "
+            f"p50 {statistics.median(latencies):7.1f} ms  p95 {p95:7.1f} ms"
+            + (self.style.ERROR(f"  {errors} erros") if errors else "")
+        )
+
+    def run_wsgi(self, path, headers, total, threads):
+        application = WSGIHandler()
+        url = urlsplit(path)
+
+        def call():
+            environ = {
+                "PATH_INFO": url.path,
+                "QUERY_STRING": url.query,
+                "REQUEST_METHOD": "GET",
+                **headers,
+            }
+            setup_testing_defaults(environ)
+            statuses = []
+            start = time.perf_counter()
+            response = application(
+                environ, lambda status, *args: statuses.append(int(status[:3]))
+            )
+            b"".join(response)
+            response.close()
+            return (time.perf_counter() - start) * 1000, statuses[0]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(lambda _: call(), range(total)))
+        elapsed = time.perf_counter() - start
+        return elapsed, [ms for ms, _ in results], [status for _, status in results]
+
+    async def run_asgi(self, path, headers, total, concurrency):
+        application = ASGIHandler()
+        url = urlsplit(path)
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": url.path,
+            "raw_path": url.path.encode(),
+            "query_string": url.query.encode(),
+            "root_path": "",
+            "headers": [
+                (name[5:].lower().replace("_", "-").encode(), value.encode())
+                for name, value in headers.items()
+            ],
+            "client": ("127.0.0.1", 0),
+            "server": ("localhost", 80),
+        }
+        slots = asyncio.Semaphore(concurrency)
+
+        async def call():
+            received = False
+
+            async def receive():
+                nonlocal received
+                if not received:
+                    received = True
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                # Cliente conectado até o fim da resposta
+                await asyncio.Event().wait()
+
+            statuses = []
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    statuses.append(message["status"])
+
+            async with slots:
+                start = time.perf_counter()
+                await application(dict(scope), receive, send)
+                return (time.perf_counter() - start) * 1000, statuses[0]
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(call() for _ in range(total)))
+        elapsed = time.perf_counter() - start
+        return elapsed, [ms for ms, _ in results], [status for _, status in results]
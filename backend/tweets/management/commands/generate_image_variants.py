@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from tweets.models import Tweet
+from users.models import User
+
+FIELDS = [(Tweet, "image"), (User, "avatar")]
+
+
+class Command(BaseCommand):
+    help = "Gera as derivadas que faltam de Tweet.image e User.avatar"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--overwrite",
+            action="store_true",
+            help="Regera também as derivadas existentes (ex.: novos tamanhos)",
+        )
+
+    def handle(self, *args, **options):
+        generated = failed = 0
+        for model, field_name in FIELDS:
+            field = model._meta.get_field(field_name)
+            names = (
+                model.objects.exclude(**{f"{field_name}__isnull": True})
+                .exclude(**{field_name: ""})
+                .values_list(field_name, flat=True)
+                .distinct()
+                .iterator()
+            )
+            for name in names:
+                # Nomes repetidos (uploads deduplicados) são processados uma vez
+                file = field.attr_class(None, field, name)
+                try:
+                    generated += len(
+                        file.generate_variants(overwrite=options["overwrite"])
+                    )
+                except OSError as exc:
+                    # Original ausente no storage ou arquivo que não é imagem
+                    failed += 1
+                    self.stderr.write(f"{name}: {exc}")
+        self.stdout.write(self.style.SUCCESS(f"{generated} derivadas geradas"))
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{failed} imagens com erro"))
@@ -0,0 +1,103 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from twitter.seeding import SocialGraphGenerator
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Popula usuários, follows, tweets, likes, retweets e comentários "
+        "sintéticos em lotes, para reproduzir o volume de produção localmente"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10000)
+        parser.add_argument(
+            "--follows-per-user",
+            type=int,
+            default=50,
+            help="Média de contas seguidas por usuário",
+        )
+        parser.add_argument(
+            "--follower-skew",
+            type=float,
+            default=1.1,
+            help="Expoente Zipf da popularidade (maior = mais concentrado)",
+        )
+        parser.add_argument("--tweets-per-user", type=int, default=20)
+        parser.add_argument(
+            "--reply-rate",
+            type=float,
+            default=0.2,
+            help="Fração dos tweets que respondem a outro (parent_tweet)",
+        )
+        parser.add_argument("--max-reply-depth", type=int, default=5)
+        parser.add_argument("--likes-per-user", type=int, default=30)
+        parser.add_argument("--retweets-per-user", type=int, default=5)
+        parser.add_argument("--comments-per-user", type=int, default=5)
+        parser.add_argument(
+            "--hashtag-rate",
+            type=float,
+            default=0.3,
+            help="Fração dos tweets com uma hashtag",
+        )
+        parser.add_argument(
+            "--hashtags", type=int, default=100, help="Hashtags distintas"
+        )
+        parser.add_argument(
+            "--mention-rate",
+            type=float,
+            default=0.1,
+            help="Fração dos tweets que mencionam outro usuário",
+        )
+        parser.add_argument(
+            "--days", type=int, default=90, help="Janela de datas dos tweets"
+        )
+        parser.add_argument(
+            "--timeline-length",
+            type=int,
+            default=None,
+            help="Entradas materializadas por timeline (padrão: TIMELINE_MAX_LENGTH)",
+        )
+        parser.add_argument("--prefix", default="synthetic")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        if User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(
+                f"Já existem usuários com o prefixo '{prefix}'; use outro --prefix"
+            )
+
+        started = time.monotonic()
+        generator = SocialGraphGenerator(
+            users=options["users"],
+            follows_per_user=options["follows_per_user"],
+            follower_skew=options["follower_skew"],
+            tweets_per_user=options["tweets_per_user"],
+            reply_rate=options["reply_rate"],
+            max_reply_depth=options["max_reply_depth"],
+            likes_per_user=options["likes_per_user"],
+            retweets_per_user=options["retweets_per_user"],
+            comments_per_user=options["comments_per_user"],
+            hashtag_rate=options["hashtag_rate"],
+            hashtags=options["hashtags"],
+            mention_rate=options["mention_rate"],
+            days=options["days"],
+            timeline_length=options["timeline_length"],
+            prefix=prefix,
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            log=self.log if options["verbosity"] > 1 else None,
+        )
+        totals = generator.run()
+
+        elapsed = time.monotonic() - started
+        summary = ", ".join(f"{key}={value}" for key, value in totals.items())
+        self.stdout.write(self.style.SUCCESS(f"{summary} em {elapsed:.1f}s"))
+
+    def log(self, message):
+        self.stdout.write(message)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from tweets import tags
+
+
+class Command(BaseCommand):
+    help = "Extrai as hashtags e menções dos tweets existentes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        indexed = tags.reindex(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{indexed} tweets indexados"))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from tweets import engagement
+
+
+class Command(BaseCommand):
+    help = "Recalcula likes, retweets e replies a partir das tabelas de origem"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        # Os deltas ainda em buffer nos workers são descartados no próximo flush
+        # deles, que recalcula esses tweets (``engagement.RECOUNT_KEY``)
+        updated = engagement.recount(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{updated} tweets recalculados"))
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from tweets import timeline
+from tweets.models import TimelineEntry
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Remove entradas antigas das timelines acima de TIMELINE_MAX_LENGTH"
+
+    def handle(self, *args, **options):
+        owner_ids = (
+            TimelineEntry.objects.values("owner_id")
+            .annotate(total=Count("id"))
+            .filter(total__gt=settings.TIMELINE_MAX_LENGTH)
+            .values_list("owner_id", flat=True)
+        )
+        removed = 0
+        for owner in User.objects.filter(id__in=owner_ids).iterator():
+            removed += timeline.trim(owner)
+        self.stdout.write(self.style.SUCCESS(f"{removed} entradas removidas"))
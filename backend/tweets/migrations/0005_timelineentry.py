@@ -0,0 +1,103 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_timelines(apps, schema_editor):
+    Tweet = apps.get_model("tweets", "Tweet")
+    TimelineEntry = apps.get_model("tweets", "TimelineEntry")
+    User = apps.get_model("users", "User")
+    UserFollowing = apps.get_model("users", "UserFollowing")
+
+    for user_id in User.objects.values_list("id", flat=True).iterator():
+        author_ids = list(
+            UserFollowing.objects.filter(user_id=user_id).values_list(
+                "following_user_id", flat=True
+            )
+        )
+        author_ids.append(user_id)
+        tweets = (
+            Tweet.objects.filter(author_id__in=author_ids)
+            .order_by("-timestamp", "-id")
+            .values_list("id", "timestamp")[: settings.TIMELINE_MAX_LENGTH]
+        )
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(owner_id=user_id, tweet_id=tweet_id, timestamp=ts)
+                for tweet_id, ts in tweets
+            ],
+            batch_size=1000,
+        )
+    Tweet.objects.update(fanned_out=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tweets", "0004_tweet_image_tweet_location_tweet_parent_tweet_and_more"),
+        ("users", "0002_userfollowing"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TimelineEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("timestamp", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name="tweet",
+            name="fanned_out",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name="tweet",
+            index=models.Index(
+                condition=models.Q(("fanned_out", False)),
+                fields=["author", "-timestamp"],
+                name="tweet_pending_fanout_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="timelineentry",
+            name="owner",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="timeline_entries",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="timelineentry",
+            name="tweet",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="timeline_entries",
+                to="tweets.tweet",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="timelineentry",
+            index=models.Index(
+                fields=["owner", "-timestamp", "-tweet"],
+                name="timeline_owner_recent_idx",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="timelineentry",
+            unique_together={("owner", "tweet")},
+        ),
+        migrations.RunPython(populate_timelines, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação
+    atomic = False
+
+    dependencies = [
+        ("tweets", "0005_timelineentry"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    # Os índices compostos são criados antes de remover os índices simples
+    # das FKs, que eles passam a cobrir
+    operations = [
+        AddIndexConcurrently(
+            model_name="tweet",
+            index=models.Index(fields=["-timestamp", "-id"], name="tweet_recent_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="tweet",
+            index=models.Index(
+                fields=["author", "-timestamp", "-id"], name="tweet_author_recent_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="tweetcomment",
+            index=models.Index(
+                fields=["tweet", "-created_at", "-id"], name="comment_tweet_recent_idx"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="tweet",
+            name="author",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="tweets",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="tweetcomment",
+            name="tweet",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="comments",
+                to="tweets.tweet",
+            ),
+        ),
+    ]
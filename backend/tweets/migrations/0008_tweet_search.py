@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:04
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação
+    atomic = False
+
+    dependencies = [
+        ("tweets", "0007_alter_tweet_image"),
+    ]
+
+    # A coluna gerada reescreve a tabela (lock exclusivo durante o ADD
+    # COLUMN); o índice GIN é criado depois, sem bloquear escritas
+    operations = [
+        migrations.AddField(
+            model_name="tweet",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.SearchVector(
+                    "content", config="portuguese"
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="tweet",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="tweet_search_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:36
+
+import django.db.models.deletion
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação
+    atomic = False
+
+    dependencies = [
+        ("tweets", "0009_hashtags_mentions"),
+    ]
+
+    # O índice composto é criado antes de remover o índice simples da FK
+    operations = [
+        AddIndexConcurrently(
+            model_name="tweet",
+            index=models.Index(
+                fields=["parent_tweet", "timestamp", "id"],
+                name="tweet_reply_thread_idx",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="tweet",
+            name="parent_tweet",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="replies_tweet",
+                to="tweets.tweet",
+            ),
+        ),
+    ]
@@ -1,25 +1,68 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 
+from twitter.images import VariantImageField
 from users.models import User
 
+# Configuração do PostgreSQL para o tsvector e as consultas da busca
+SEARCH_CONFIG = "portuguese"
+
 
 class Tweet(models.Model):
-    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="tweets")
+    # Indexado por tweet_author_recent_idx (author, -timestamp, -id)
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="tweets", db_index=False
+    )
     content = models.TextField()
-    image = models.ImageField(upload_to="tweet_images/", blank=True, null=True)
+    image = VariantImageField(
+        upload_to="tweet_images/",
+        variants={"small": 640, "large": 1280},
+        blank=True,
+        null=True,
+    )
     location = models.CharField(max_length=255, blank=True, null=True)
     timestamp = models.DateTimeField(auto_now_add=True)
     likes = models.PositiveIntegerField(default=0)
     retweets = models.PositiveIntegerField(default=0)
     replies = models.PositiveIntegerField(default=0)
+    # Indexado por tweet_reply_thread_idx (parent_tweet, timestamp, id)
     parent_tweet = models.ForeignKey(
         "self",
         on_delete=models.CASCADE,
         null=True,
         blank=True,
         related_name="replies_tweet",
+        db_index=False,
+    )
+    # False enquanto o tweet não foi distribuído nas timelines dos seguidores;
+    # esses tweets são mesclados no feed em tempo de leitura.
+    fanned_out = models.BooleanField(default=False)
+    # Coluna gerada pelo banco a partir de content (busca em tweets.search)
+    search_vector = models.GeneratedField(
+        expression=SearchVector("content", config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["-timestamp", "-id"], name="tweet_recent_idx"),
+            models.Index(
+                fields=["author", "-timestamp", "-id"], name="tweet_author_recent_idx"
+            ),
+            models.Index(
+                fields=["author", "-timestamp"],
+                condition=models.Q(fanned_out=False),
+                name="tweet_pending_fanout_idx",
+            ),
+            GinIndex(fields=["search_vector"], name="tweet_search_idx"),
+            models.Index(
+                fields=["parent_tweet", "timestamp", "id"],
+                name="tweet_reply_thread_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.content[:50]
 
@@ -36,11 +79,22 @@ class TweetLike(models.Model):
 
 
 class TweetComment(models.Model):
-    tweet = models.ForeignKey(Tweet, on_delete=models.CASCADE, related_name="comments")
+    # Indexado por comment_tweet_recent_idx (tweet, -created_at, -id)
+    tweet = models.ForeignKey(
+        Tweet, on_delete=models.CASCADE, related_name="comments", db_index=False
+    )
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["tweet", "-created_at", "-id"],
+                name="comment_tweet_recent_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.author.username} commented on {self.tweet.content[:20]}"
 
@@ -57,3 +111,87 @@ class TweetRetweet(models.Model):
 
     def __str__(self):
         return f"{self.user.username} retweeted {self.tweet.content[:20]}"
+
+
+class TimelineEntry(models.Model):
+    """Entrada materializada da timeline (home) de um usuário."""
+
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="timeline_entries"
+    )
+    tweet = models.ForeignKey(
+        Tweet, on_delete=models.CASCADE, related_name="timeline_entries"
+    )
+    # Cópia de tweet.timestamp para ordenar sem join
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("owner", "tweet")
+        indexes = [
+            models.Index(
+                fields=["owner", "-timestamp", "-tweet"],
+                name="timeline_owner_recent_idx",
+            ),
+        ]
+
+
+class Hashtag(models.Model):
+    # Normalizado por tweets.tags.normalize_hashtag (sem "#", minúsculas)
+    name = models.CharField(max_length=100, unique=True)
+
+    def __str__(self):
+        return f"#{self.name}"
+
+
+class TweetHashtag(models.Model):
+    """Hashtag citada num tweet (mantida por ``tweets.tags``)."""
+
+    tweet = models.ForeignKey(
+        Tweet, on_delete=models.CASCADE, related_name="hashtag_links"
+    )
+    # Indexado por hashtag_recent_idx (hashtag, -timestamp, -tweet)
+    hashtag = models.ForeignKey(
+        Hashtag, on_delete=models.CASCADE, related_name="tweet_links", db_index=False
+    )
+    # Cópia de tweet.timestamp para ordenar sem join
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("tweet", "hashtag")
+        indexes = [
+            models.Index(
+                fields=["hashtag", "-timestamp", "-tweet"], name="hashtag_recent_idx"
+            ),
+        ]
+
+
+class TweetMention(models.Model):
+    """Usuário mencionado num tweet (mantida por ``tweets.tags``)."""
+
+    tweet = models.ForeignKey(
+        Tweet, on_delete=models.CASCADE, related_name="mention_links"
+    )
+    # Indexado por mention_user_recent_idx (user, -timestamp, -tweet)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="mention_links", db_index=False
+    )
+    # Cópia de tweet.timestamp para ordenar sem join
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("tweet", "user")
+        indexes = [
+            models.Index(
+                fields=["user", "-timestamp", "-tweet"], name="mention_user_recent_idx"
+            ),
+        ]
+
+
+class EngagementRecount(models.Model):
+    """
+    Início e fim do último ``engagement.recount`` (uma única linha), lidos no
+    flush dos buffers de engajamento de todos os processos.
+    """
+
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True)
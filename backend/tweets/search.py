@@ -0,0 +1,85 @@
+"""
+Busca textual nos tweets (``GET /api/tweets/search/?q=...``).
+
+A consulta usa a coluna gerada ``Tweet.search_vector`` e o índice GIN
+``tweet_search_idx``. Termos muito comuns casam com milhões de tweets: só os
+``SEARCH_MAX_CANDIDATES`` mais recentes que casam são ranqueados, o que limita
+o custo da ordenação por relevância ao tamanho dessa janela.
+"""
+
+from datetime import datetime, time
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ParseError
+
+from .models import SEARCH_CONFIG, Tweet
+
+MAX_QUERY_LENGTH = 500
+
+
+def search_tweets(text, author_id=None, since=None, until=None):
+    """
+    Tweets que casam com ``text`` (sintaxe de buscador: ``"frase exata"``,
+    ``or``, ``-termo``), anotados com ``rank``; ``since``/``until`` limitam
+    ``timestamp`` (``until`` exclusivo).
+    """
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type="websearch")
+    matches = Tweet.objects.filter(search_vector=query)
+    if author_id is not None:
+        matches = matches.filter(author_id=author_id)
+    if since is not None:
+        matches = matches.filter(timestamp__gte=since)
+    if until is not None:
+        matches = matches.filter(timestamp__lt=until)
+    candidates = matches.order_by("-timestamp", "-id").values("id")[
+        : settings.SEARCH_MAX_CANDIDATES
+    ]
+    # float8: o real de ts_rank não volta exato no cursor da paginação
+    rank = Cast(SearchRank(F("search_vector"), query), output_field=FloatField())
+    return (
+        Tweet.objects.filter(id__in=candidates)
+        .select_related("author")
+        .annotate(rank=rank)
+    )
+
+
+def _datetime_param(query_params, param):
+    value = query_params.get(param)
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            # Só a data: início do dia no fuso atual
+            parsed = datetime.combine(parse_date(value), time.min)
+    except (TypeError, ValueError):
+        raise ParseError(f"Invalid {param}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_search(query_params):
+    """Argumentos de ``search_tweets`` (``q``, ``author``, ``since``, ``until``)."""
+    text = query_params.get("q", "").strip()
+    if not text:
+        raise ParseError("Missing q")
+    if len(text) > MAX_QUERY_LENGTH:
+        raise ParseError("q is too long")
+    author_id = query_params.get("author")
+    if author_id is not None:
+        try:
+            author_id = int(author_id)
+        except ValueError:
+            raise ParseError("Invalid author")
+    return {
+        "text": text,
+        "author_id": author_id,
+        "since": _datetime_param(query_params, "since"),
+        "until": _datetime_param(query_params, "until"),
+    }
@@ -1,12 +1,18 @@
+from django.db.models import CharField, Value
+from django.utils import timezone
 from rest_framework import serializers
 
+from twitter.images import ImageVariantsField, variant_urls
+from users.models import User
 from users.serializers import UserSerializer
 
-from .models import Tweet, TweetComment
+from . import engagement, tags
+from .models import Tweet, TweetComment, TweetLike, TweetRetweet
 
 
 class TweetSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
+    image_variants = ImageVariantsField(source="image")
 
     class Meta:
         model = Tweet
@@ -14,6 +20,7 @@ class TweetSerializer(serializers.ModelSerializer):
             "id",
             "content",
             "image",
+            "image_variants",
             "location",
             "timestamp",
             "likes",
@@ -23,6 +30,26 @@ class TweetSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "timestamp", "likes", "retweets", "replies", "author"]
 
+    def create(self, validated_data):
+        tweet = super().create(validated_data)
+        tags.index_tweets([tweet])
+        return tweet
+
+    def update(self, instance, validated_data):
+        previous = tags.extract(instance.content)
+        tweet = super().update(instance, validated_data)
+        # Só reescreve as ligações se as hashtags ou menções mudaram
+        if tags.extract(tweet.content) != previous:
+            tags.index_tweets([tweet], replace=True)
+        return tweet
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Somar os deltas de engajamento ainda não gravados no banco
+        for field, delta in engagement.pending(instance.pk).items():
+            data[field] = max(data[field] + delta, 0)
+        return data
+
 
 class TweetCommentSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
@@ -31,3 +58,115 @@ class TweetCommentSerializer(serializers.ModelSerializer):
         model = TweetComment
         fields = ["id", "content", "author", "created_at"]
         read_only_fields = ["id", "author", "created_at"]
+
+
+def _file_url(model, field_name, request):
+    """Mesma saída de ``serializers.ImageField`` para o nome do arquivo."""
+    storage = model._meta.get_field(field_name).storage
+
+    def to_representation(name):
+        if not name:
+            return None
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+
+    return to_representation
+
+
+def _identity(value):
+    return value
+
+
+AUTHOR_FIELDS = UserSerializer.Meta.fields
+TWEET_FIELDS = [name for name in TweetSerializer.Meta.fields if name != "author"]
+
+# Campos calculados a partir de outra coluna (URLs das derivadas das imagens)
+DERIVED = {"image_variants": "image", "avatar_variants": "avatar"}
+
+
+def _columns(fields, prefix=""):
+    return list(dict.fromkeys(prefix + DERIVED.get(name, name) for name in fields))
+
+
+def tweet_rows(queryset, *extra):
+    """Reduz ``queryset`` às colunas lidas por ``serialize_tweet_rows``."""
+    return queryset.values(
+        *_columns(TWEET_FIELDS), *_columns(AUTHOR_FIELDS, "author__"), *extra
+    )
+
+
+VIEWER_FIELDS = ("liked_by_me", "retweeted_by_me")
+
+
+def viewer_state(viewer, tweet_ids):
+    """
+    Campos de ``VIEWER_FIELDS`` verdadeiros para ``viewer`` em cada tweet de
+    ``tweet_ids``: ``{tweet_id: {"liked_by_me", ...}}``. Curtidas e retweets
+    vêm numa só consulta (índices únicos ``(user, tweet)``).
+    """
+    if not viewer.is_authenticated or not tweet_ids:
+        return {}
+    likes = TweetLike.objects.filter(user=viewer, tweet_id__in=tweet_ids).values_list(
+        "tweet_id", Value("liked_by_me", output_field=CharField())
+    )
+    retweets = TweetRetweet.objects.filter(
+        user=viewer, tweet_id__in=tweet_ids
+    ).values_list("tweet_id", Value("retweeted_by_me", output_field=CharField()))
+    state = {}
+    for tweet_id, field in likes.union(retweets, all=True):
+        state.setdefault(tweet_id, set()).add(field)
+    return state
+
+
+def serialize_tweet_rows(rows, request=None, viewer=None):
+    """
+    Caminho rápido de ``TweetSerializer(many=True)`` para listagens.
+
+    Recebe linhas de ``tweet_rows`` e monta dicts simples, sem instanciar
+    modelos nem serializers por linha. A saída é idêntica à do serializer
+    (mesmos campos, ordem e formatos), inclusive os deltas de engajamento
+    ainda não gravados.
+
+    Com ``viewer``, cada tweet ganha também ``liked_by_me`` e
+    ``retweeted_by_me`` (falsos para anônimos), de ``viewer_state``.
+    """
+    converters = {
+        "image": _file_url(Tweet, "image", request),
+        "avatar": _file_url(User, "avatar", request),
+        "image_variants": variant_urls(Tweet._meta.get_field("image"), request),
+        "avatar_variants": variant_urls(User._meta.get_field("avatar"), request),
+        # Fuso resolvido uma vez, não a cada linha
+        "timestamp": serializers.DateTimeField(
+            default_timezone=timezone.get_current_timezone()
+        ).to_representation,
+    }
+    tweet_fields = [
+        (name, DERIVED.get(name, name), converters.get(name, _identity))
+        for name in TWEET_FIELDS
+    ]
+    author_fields = [
+        (name, f"author__{DERIVED.get(name, name)}", converters.get(name, _identity))
+        for name in AUTHOR_FIELDS
+    ]
+    ids = [row["id"] for row in rows]
+    pending = engagement.pending_many(ids)
+    state = viewer_state(viewer, ids) if viewer is not None else None
+
+    data = []
+    for row in rows:
+        tweet = {
+            name: None if row[column] is None else convert(row[column])
+            for name, column, convert in tweet_fields
+        }
+        tweet["author"] = {
+            name: None if row[column] is None else convert(row[column])
+            for name, column, convert in author_fields
+        }
+        for field, delta in pending.get(row["id"], {}).items():
+            tweet[field] = max(tweet[field] + delta, 0)
+        if state is not None:
+            flags = state.get(row["id"], ())
+            for field in VIEWER_FIELDS:
+                tweet[field] = field in flags
+        data.append(tweet)
+    return data
@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users import counters, profile_cache
+
+from .models import Tweet
+
+
+def _adjust_author(tweet, delta):
+    counters.increment(tweet.author_id, "tweets_count", delta)
+    profile_cache.invalidate(tweet.author_id)
+    # Mantém coerente a instância já carregada (ex.: request.user)
+    if Tweet.author.is_cached(tweet):
+        tweet.author.tweets_count = max(tweet.author.tweets_count + delta, 0)
+
+
+@receiver(post_save, sender=Tweet)
+def tweet_created(sender, instance, created, **kwargs):
+    if created:
+        _adjust_author(instance, 1)
+
+
+@receiver(post_delete, sender=Tweet)
+def tweet_deleted(sender, instance, **kwargs):
+    _adjust_author(instance, -1)
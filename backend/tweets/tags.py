@@ -0,0 +1,121 @@
+"""
+Hashtags e menções dos tweets.
+
+Extraídas de ``Tweet.content`` quando ``TweetSerializer`` grava o tweet e
+guardadas em tabelas de ligação (``TweetHashtag``, ``TweetMention``) com uma
+cópia do timestamp: os tweets de uma hashtag e as menções de um usuário são
+lidos em ordem pelo índice da ligação, sem varrer o conteúdo dos tweets.
+"""
+
+import re
+
+from django.db import transaction
+from django.db.models import F
+
+from users.models import User
+
+from .models import Hashtag, Tweet, TweetHashtag, TweetMention
+
+# "#" ou "@" no início de uma palavra; "#123" não é hashtag e "a@b.com" não é
+# menção
+HASHTAG_RE = re.compile(r"(?<![\w#&])#(?!\d+\b)(\w+)")
+MENTION_RE = re.compile(r"(?<![\w@.])@(\w+)")
+MAX_HASHTAG_LENGTH = Hashtag._meta.get_field("name").max_length
+
+
+def normalize_hashtag(name):
+    return name.lstrip("#").lower()
+
+
+def extract(content):
+    """Hashtags (normalizadas) e usernames citados em ``content``, sem repetir."""
+    hashtags = [
+        normalize_hashtag(name)
+        for name in HASHTAG_RE.findall(content)
+        if len(name) <= MAX_HASHTAG_LENGTH
+    ]
+    return list(dict.fromkeys(hashtags)), list(
+        dict.fromkeys(MENTION_RE.findall(content))
+    )
+
+
+def index_tweets(tweets, replace=False):
+    """
+    Grava em lote as hashtags e menções de ``tweets`` (com ``content`` e
+    ``timestamp``). ``replace`` remove antes as ligações existentes (conteúdo
+    editado, reindexação). Menções casam o username exato.
+    """
+    extracted = [(tweet, *extract(tweet.content)) for tweet in tweets]
+    if replace:
+        ids = [tweet.pk for tweet in tweets]
+        TweetHashtag.objects.filter(tweet_id__in=ids).delete()
+        TweetMention.objects.filter(tweet_id__in=ids).delete()
+
+    names = {name for _, hashtags, _ in extracted for name in hashtags}
+    usernames = {name for _, _, mentions in extracted for name in mentions}
+    hashtag_ids, user_ids = {}, {}
+    if names:
+        Hashtag.objects.bulk_create(
+            [Hashtag(name=name) for name in names], ignore_conflicts=True
+        )
+        hashtag_ids = dict(
+            Hashtag.objects.filter(name__in=names).values_list("name", "id")
+        )
+    if usernames:
+        user_ids = dict(
+            User.objects.filter(username__in=usernames).values_list("username", "id")
+        )
+
+    TweetHashtag.objects.bulk_create(
+        [
+            TweetHashtag(
+                tweet=tweet, hashtag_id=hashtag_ids[name], timestamp=tweet.timestamp
+            )
+            for tweet, hashtags, _ in extracted
+            for name in hashtags
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    TweetMention.objects.bulk_create(
+        [
+            TweetMention(tweet=tweet, user_id=user_ids[name], timestamp=tweet.timestamp)
+            for tweet, _, mentions in extracted
+            for name in mentions
+            if name in user_ids
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def reindex(queryset=None, batch_size=5000):
+    """Extrai de novo as hashtags e menções de ``queryset``, em lotes por id."""
+    if queryset is None:
+        queryset = Tweet.objects.all()
+    tweets = queryset.order_by("id").only("id", "content", "timestamp")
+    indexed = last = 0
+    while batch := list(tweets.filter(id__gt=last)[:batch_size]):
+        with transaction.atomic():
+            index_tweets(batch, replace=True)
+        indexed += len(batch)
+        last = batch[-1].pk
+    return indexed
+
+
+def hashtag_tweets(name):
+    """Tweets com a hashtag ``name``, paginados por ``tagged_at``."""
+    return (
+        Tweet.objects.filter(hashtag_links__hashtag__name=normalize_hashtag(name))
+        .annotate(tagged_at=F("hashtag_links__timestamp"))
+        .select_related("author")
+    )
+
+
+def mention_tweets(user_id):
+    """Tweets que mencionam o usuário, paginados por ``tagged_at``."""
+    return (
+        Tweet.objects.filter(mention_links__user_id=user_id)
+        .annotate(tagged_at=F("mention_links__timestamp"))
+        .select_related("author")
+    )
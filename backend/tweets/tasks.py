@@ -0,0 +1,27 @@
+"""Tarefas da fila (``jobs.queue``) tiradas das requisições de tweets/follows."""
+
+from jobs.queue import task
+from users.models import User, UserFollowing
+
+from . import timeline
+from .models import Tweet
+
+
+@task(priority=10)
+def fan_out(tweet_id):
+    # Até a distribuição o tweet segue com fanned_out=False e é mesclado no
+    # feed em tempo de leitura
+    tweet = Tweet.objects.select_related("author").filter(pk=tweet_id).first()
+    if tweet is None or tweet.fanned_out:
+        return
+    timeline.fan_out(tweet)
+
+
+@task(priority=5)
+def backfill(user_id, author_id):
+    # Unfollow antes da tarefa rodar: nada a copiar
+    if not UserFollowing.objects.filter(
+        user_id=user_id, following_user_id=author_id
+    ).exists():
+        return
+    timeline.backfill(User(pk=user_id), User(pk=author_id))
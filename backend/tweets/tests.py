@@ -1,11 +1,40 @@
-from django.test import TestCase
+import asyncio
+import json
+import tempfile
+from base64 import b64encode
+from collections import Counter
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from users.models import User
+from jobs import queue
+from twitter import pubsub
+from users.models import User, UserFollowing
 
-from .models import Tweet
+from . import engagement, live, tags, threads
+from .models import (
+    EngagementRecount,
+    TimelineEntry,
+    Tweet,
+    TweetHashtag,
+    TweetLike,
+    TweetRetweet,
+)
+from .serializers import TweetSerializer, serialize_tweet_rows, tweet_rows
 
 
 class TweetModelTest(TestCase):
@@ -47,3 +76,785 @@ class TweetAPITest(TestCase):
         data = {"content": "Another test tweet"}
         response = self.client.post("/api/tweets/", data)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+class TimelineTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="Reader", email="reader@example.com", password="password123"
+        )
+        self.author = User.objects.create_user(
+            username="Author", email="author@example.com", password="password123"
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+    def post_as(self, user, content):
+        client = APIClient()
+        refresh = RefreshToken.for_user(user)
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+        return client.post("/api/tweets/", {"content": content})
+
+    def feed_contents(self):
+        response = self.client.get("/api/tweets/feed/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [tweet["content"] for tweet in response.data["results"]]
+
+    def test_create_fans_out_to_followers(self):
+        UserFollowing.objects.create(user=self.user, following_user=self.author)
+        self.post_as(self.author, "hello followers")
+        self.post_as(self.user, "my own tweet")
+        # Antes da distribuição (fila) o feed mescla os tweets na leitura
+        self.assertEqual(self.feed_contents(), ["my own tweet", "hello followers"])
+
+        self.assertEqual(queue.run_pending(), 2)
+        self.assertEqual(TimelineEntry.objects.filter(owner=self.user).count(), 2)
+        self.assertEqual(self.feed_contents(), ["my own tweet", "hello followers"])
+
+    def test_follow_backfills_and_unfollow_trims(self):
+        self.post_as(self.author, "before follow")
+        queue.run_pending()
+        self.assertEqual(self.feed_contents(), [])
+
+        self.client.post(f"/api/users/{self.author.id}/follow/")
+        self.assertEqual(queue.run_pending(), 1)
+        self.assertEqual(self.feed_contents(), ["before follow"])
+
+        self.client.delete(f"/api/users/{self.author.id}/unfollow/")
+        self.assertEqual(self.feed_contents(), [])
+        self.assertFalse(TimelineEntry.objects.filter(owner=self.user).exists())
+
+    def test_high_fanout_author_is_merged_on_read(self):
+        # Pela API, para o followers_count do autor contar o seguidor
+        self.client.post(f"/api/users/{self.author.id}/follow/")
+        queue.run_pending()
+        with self.settings(TIMELINE_FANOUT_MAX_FOLLOWERS=0):
+            self.post_as(self.author, "celebrity tweet")
+            self.assertEqual(queue.run_pending(), 1)
+
+        # A distribuição rodou, mas só o autor recebeu a entrada
+        tweet = Tweet.objects.get(content="celebrity tweet")
+        self.assertFalse(tweet.fanned_out)
+        self.assertTrue(
+            TimelineEntry.objects.filter(owner=self.author, tweet=tweet).exists()
+        )
+        self.assertFalse(TimelineEntry.objects.filter(owner=self.user).exists())
+        self.assertEqual(self.feed_contents(), ["celebrity tweet"])
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="TestUser", email="test@example.com", password="password123"
+        )
+        self.tweets = [
+            Tweet.objects.create(author=self.user, content=f"tweet {i}")
+            for i in range(5)
+        ]
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+    def ids(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [tweet["id"] for tweet in response.data["results"]]
+
+    def test_next_and_previous_cursors(self):
+        newest_first = [tweet.id for tweet in reversed(self.tweets)]
+
+        first = self.client.get("/api/tweets/", {"count": 2})
+        self.assertEqual(self.ids(first), newest_first[:2])
+        self.assertIsNone(first.data["previous"])
+
+        second = self.client.get(first.data["next"])
+        self.assertEqual(self.ids(second), newest_first[2:4])
+
+        back = self.client.get(second.data["previous"])
+        self.assertEqual(self.ids(back), newest_first[:2])
+
+        last = self.client.get(second.data["next"])
+        self.assertEqual(self.ids(last), newest_first[4:])
+        self.assertIsNone(last.data["next"])
+
+    def test_since_id_and_max_id(self):
+        response = self.client.get("/api/tweets/", {"since_id": self.tweets[2].id})
+        self.assertEqual(self.ids(response), [self.tweets[4].id, self.tweets[3].id])
+
+        response = self.client.get("/api/tweets/", {"max_id": self.tweets[1].id})
+        self.assertEqual(self.ids(response), [self.tweets[1].id, self.tweets[0].id])
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/tweets/", {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_malformed_cursor_positions(self):
+        now = timezone.now().isoformat()
+        cases = [
+            ("/api/tweets/", "p=garbage&i=1"),
+            ("/api/tweets/", f"p={now}&i={2**63}"),
+            ("/api/tweets/", f"p={now}&i=-1"),
+            ("/api/tweets/", "p=2024-01-01T00:00:00&i=1"),
+            ("/api/tweets/feed/", "p=garbage&i=1"),
+            ("/api/tweets/search/", "p=nan&i=1"),
+            ("/api/tweets/search/", "p=garbage&i=1"),
+        ]
+        for path, querystring in cases:
+            cursor = b64encode(querystring.replace("+", "%2B").encode()).decode()
+            with self.subTest(path=path, cursor=querystring):
+                response = self.client.get(path, {"q": "tweet", "cursor": cursor})
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(ENGAGEMENT_BUFFER_ENABLED=True, ENGAGEMENT_FLUSH_INTERVAL=0)
+class EngagementBufferTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="TestUser", email="test@example.com", password="password123"
+        )
+        self.tweet = Tweet.objects.create(author=self.user, content="viral")
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+        self.addCleanup(engagement.flush)
+
+    def test_deltas_are_buffered_and_flushed_in_batch(self):
+        self.client.post(f"/api/tweets/{self.tweet.id}/like/")
+        self.client.post(f"/api/tweets/{self.tweet.id}/retweet/")
+        self.client.post(f"/api/tweets/{self.tweet.id}/comment/", {"content": "hi"})
+
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.likes, 0)
+        response = self.client.get(f"/api/tweets/{self.tweet.id}/")
+        self.assertEqual(response.data["likes"], 1)
+        self.assertEqual(response.data["retweets"], 1)
+        self.assertEqual(response.data["replies"], 1)
+
+        # Marcador de recount e o UPDATE em lote
+        with self.assertNumQueries(2):
+            self.assertEqual(engagement.flush(), 1)
+        self.tweet.refresh_from_db()
+        self.assertEqual(
+            (self.tweet.likes, self.tweet.retweets, self.tweet.replies), (1, 1, 1)
+        )
+        self.assertEqual(engagement.pending(self.tweet.id), {})
+
+    def test_unlike_cancels_pending_like(self):
+        self.client.post(f"/api/tweets/{self.tweet.id}/like/")
+        self.client.delete(f"/api/tweets/{self.tweet.id}/unlike/")
+        engagement.flush()
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.likes, 0)
+
+    @override_settings(ENGAGEMENT_BUFFER_ENABLED=False)
+    def test_disabled_buffer_writes_immediately(self):
+        self.client.post(f"/api/tweets/{self.tweet.id}/like/")
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.likes, 1)
+
+    def test_recount_repairs_lost_deltas(self):
+        TweetLike.objects.create(user=self.user, tweet=self.tweet)
+        Tweet.objects.filter(pk=self.tweet.pk).update(likes=5, replies=3)
+
+        call_command("recount_engagement", stdout=StringIO())
+        self.tweet.refresh_from_db()
+        self.assertEqual((self.tweet.likes, self.tweet.replies), (1, 0))
+
+    def test_recount_discards_deltas_buffered_in_other_processes(self):
+        # Like gravado, com o delta ainda no buffer de um worker
+        worker = engagement.EngagementBuffer()
+        TweetLike.objects.create(user=self.user, tweet=self.tweet)
+        worker.add(self.tweet.pk, "likes")
+
+        call_command("recount_engagement", stdout=StringIO())
+        worker.flush()
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.likes, 1)
+
+        # Deltas posteriores ao recount voltam a ser somados
+        other = User.objects.create_user(username="other", email="o@example.com")
+        TweetLike.objects.create(user=other, tweet=self.tweet)
+        worker.add(self.tweet.pk, "likes")
+        with self.assertNumQueries(2):
+            worker.flush()
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.likes, 2)
+
+    def test_failed_recount_still_marks_the_end(self):
+        with patch.object(engagement, "_recount", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                engagement.recount()
+        marker = EngagementRecount.objects.get()
+        self.assertGreaterEqual(marker.finished_at, marker.started_at)
+
+        # Sem recount em andamento, deltas novos voltam a ser somados
+        worker = engagement.EngagementBuffer()
+        worker.add(self.tweet.pk, "likes")
+        worker.flush()
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.likes, 1)
+
+    def test_abandoned_recount_expires(self):
+        # Processo morto no meio do recount: sem fim marcado
+        EngagementRecount.objects.create(
+            started_at=timezone.now() - timedelta(hours=2), finished_at=None
+        )
+        self.assertFalse(engagement._recounted_since(timezone.now()))
+        with self.settings(ENGAGEMENT_RECOUNT_TIMEOUT=3 * 3600):
+            self.assertTrue(engagement._recounted_since(timezone.now()))
+
+
+@override_settings(ENGAGEMENT_BUFFER_ENABLED=False, ROOT_URLCONF="twitter.urls_async")
+class LiveEventsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="TestUser", email="test@example.com", password="password123"
+        )
+        self.author = User.objects.create_user(
+            username="Author", email="author@example.com", password="password123"
+        )
+        UserFollowing.objects.create(user=self.user, following_user=self.author)
+        self.tweet = Tweet.objects.create(author=self.author, content="visible")
+        refresh = RefreshToken.for_user(self.user)
+        self.auth = f"Bearer {refresh.access_token}"
+
+    def act(self, user, method, path, data=None):
+        client = APIClient()
+        client.force_authenticate(user)
+        # Os eventos são publicados no commit
+        with self.captureOnCommitCallbacks(execute=True):
+            return getattr(client, method)(path, data)
+
+    async def next_event(self, events):
+        chunk = await asyncio.wait_for(anext(events), 5)
+        event, data = chunk.decode().strip().split("\n")
+        return event.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+    async def test_stream_pushes_tweets_and_counts(self):
+        act = sync_to_async(self.act)
+        response = await self.async_client.get(
+            f"/api/tweets/stream/?tweets={self.tweet.pk}",
+            headers={"authorization": self.auth},
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = aiter(response.streaming_content)
+        self.assertTrue((await anext(events)).startswith(b"retry:"))
+
+        await act(self.user, "post", f"/api/tweets/{self.tweet.pk}/like/")
+        self.assertEqual(
+            await self.next_event(events),
+            (
+                "counts",
+                {
+                    "type": "counts",
+                    "id": self.tweet.pk,
+                    "likes": 1,
+                    "retweets": 0,
+                    "replies": 0,
+                },
+            ),
+        )
+
+        created = await act(self.author, "post", "/api/tweets/", {"content": "new"})
+        new_id = created.data["id"]
+        self.assertEqual(
+            await self.next_event(events),
+            ("tweet", {"type": "tweet", "id": new_id, "author": self.author.pk}),
+        )
+        # Tweets anunciados no stream passam a ter os contadores acompanhados
+        await act(self.author, "post", f"/api/tweets/{new_id}/retweet/")
+        event, data = await self.next_event(events)
+        self.assertEqual((event, data["id"], data["retweets"]), ("counts", new_id, 1))
+
+        # Após o unfollow, só chegam os tweets do próprio usuário
+        await act(self.user, "delete", f"/api/users/{self.author.pk}/unfollow/")
+        await act(self.author, "post", "/api/tweets/", {"content": "hidden"})
+        own = await act(self.user, "post", "/api/tweets/", {"content": "mine"})
+        self.assertEqual((await self.next_event(events))[1]["id"], own.data["id"])
+
+        # Cliente desconectado: a espera é cancelada e a assinatura encerrada
+        waiting = asyncio.ensure_future(anext(events))
+        await asyncio.sleep(0.05)
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+        self.assertFalse(pubsub.hub.has_subscribers(f"author:{self.user.pk}"))
+
+    @override_settings(LIVE_MAX_TWEETS=2)
+    async def test_tracked_tweets_are_bounded(self):
+        events = live.event_stream(self.user, [self.tweet.pk])
+        self.assertTrue((await anext(events)).startswith("retry:"))
+
+        announced = list(range(self.tweet.pk + 1, self.tweet.pk + 6))
+        for tweet_id in announced:
+            pubsub.publish(
+                live.author_channel(self.author.pk),
+                {"type": "tweet", "id": tweet_id, "author": self.author.pk},
+            )
+            chunk = await asyncio.wait_for(anext(events), 5)
+            self.assertIn(f'"id": {tweet_id}', chunk)
+
+        # Só os dois mais recentes seguem assinados
+        subscribed = [
+            tweet_id
+            for tweet_id in [self.tweet.pk, *announced]
+            if pubsub.hub.has_subscribers(live.tweet_channel(tweet_id))
+        ]
+        self.assertEqual(subscribed, announced[-2:])
+        await events.aclose()
+        self.assertFalse(pubsub.hub.has_subscribers(live.tweet_channel(announced[-1])))
+
+    def test_stream_requires_authentication(self):
+        response = self.client.get("/api/tweets/stream/")
+        self.assertEqual(response.status_code, 401)
+
+    def test_nothing_is_queried_without_subscribers(self):
+        # Sem assinantes de tweet:<id>, o flush não relê os contadores
+        with self.assertNumQueries(1):
+            engagement.buffer._write({self.tweet.pk: Counter(likes=1)})
+
+
+@override_settings(ENGAGEMENT_BUFFER_ENABLED=True, ENGAGEMENT_FLUSH_INTERVAL=0)
+class FastSerializationTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="TestUser",
+            email="testuser@example.com",
+            password="password123",
+            avatar="avatars/me.png",
+        )
+        other = User.objects.create_user(
+            username="Other", email="other@example.com", bio=None
+        )
+        Tweet.objects.create(author=self.user, content="plain")
+        Tweet.objects.create(
+            author=other,
+            content="with image ✓",
+            image="tweet_images/photo.jpg",
+            location="Recife",
+        )
+        liked = Tweet.objects.create(author=self.user, content="liked", likes=3)
+        engagement.record(liked.pk, "likes", 2)
+        engagement.record(liked.pk, "replies", -1)
+        self.addCleanup(engagement.flush)
+        self.queryset = Tweet.objects.select_related("author").order_by("-id")
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_output_is_identical_to_serializer(self):
+        request = RequestFactory().get("/api/tweets/")
+        for context in ({}, {"request": request}):
+            expected = TweetSerializer(self.queryset, many=True, context=context)
+            rows = list(tweet_rows(self.queryset))
+            fast = serialize_tweet_rows(rows, context.get("request"))
+            self.assertEqual(self.render(fast), self.render(expected.data))
+
+    def test_list_endpoint_uses_rows(self):
+        response = APIClient().get("/api/tweets/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["likes"], 5)
+        self.assertEqual(
+            response.data["results"][1]["image"],
+            "http://testserver/media/tweet_images/photo.jpg",
+        )
+        self.assertEqual(
+            response.data["results"][1]["image_variants"]["small"],
+            "http://testserver/media/tweet_images/photo_small.webp",
+        )
+        self.assertIsNone(response.data["results"][0]["image_variants"])
+
+
+class ViewerStateTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="TestUser", email="testuser@example.com", password="password123"
+        )
+        self.tweets = [
+            Tweet.objects.create(author=self.user, content=f"tweet {i}")
+            for i in range(3)
+        ]
+        TweetLike.objects.create(user=self.user, tweet=self.tweets[0])
+        TweetLike.objects.create(user=self.user, tweet=self.tweets[1])
+        TweetRetweet.objects.create(user=self.user, tweet=self.tweets[1])
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def flags(self, response):
+        return {
+            tweet["content"]: (tweet["liked_by_me"], tweet["retweeted_by_me"])
+            for tweet in response.data["results"]
+        }
+
+    def test_flags_in_lists(self):
+        expected = {
+            "tweet 0": (True, False),
+            "tweet 1": (True, True),
+            "tweet 2": (False, False),
+        }
+        for url in ("/api/tweets/", f"/api/users/{self.user.pk}/tweets/"):
+            response = self.client.get(url)
+            self.assertEqual(self.flags(response), expected)
+
+    def test_one_query_per_page(self):
+        rows = list(tweet_rows(Tweet.objects.order_by("-id")))
+        with self.assertNumQueries(1):
+            serialize_tweet_rows(rows, viewer=self.user)
+
+    def test_anonymous_and_without_viewer(self):
+        response = APIClient().get("/api/tweets/")
+        self.assertEqual(set(self.flags(response).values()), {(False, False)})
+
+        rows = list(tweet_rows(Tweet.objects.all()))
+        with self.assertNumQueries(0):
+            data = serialize_tweet_rows(rows)
+        self.assertNotIn("liked_by_me", data[0])
+
+
+def image_bytes(size, color="red", format="PNG"):
+    output = BytesIO()
+    Image.new("RGB", size, color).save(output, format)
+    return output.getvalue()
+
+
+class ImageVariantsTest(TestCase):
+    def setUp(self):
+        self.media = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(MEDIA_ROOT=self.media))
+        self.user = User.objects.create_user(
+            username="TestUser", email="test@example.com", password="password123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post_image(self, name, data):
+        response = self.client.post(
+            "/api/tweets/",
+            {"content": "foto", "image": SimpleUploadedFile(name, data)},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        queue.run_pending()
+        return Tweet.objects.get(pk=response.data["id"])
+
+    def test_upload_generates_webp_variants(self):
+        tweet = self.post_image("photo.PNG", image_bytes((2000, 1000)))
+        self.assertRegex(tweet.image.name, r"^tweet_images/[0-9a-f]{32}\.png$")
+        sizes = {}
+        for label, name in tweet.image.variant_names().items():
+            with default_storage.open(name) as file, Image.open(file) as image:
+                self.assertEqual(image.format, "WEBP")
+                sizes[label] = image.size
+        self.assertEqual(sizes, {"small": (640, 320), "large": (1280, 640)})
+
+        data = self.client.get(f"/api/tweets/{tweet.pk}/").data
+        root = tweet.image.name.removesuffix(".png")
+        self.assertEqual(
+            data["image_variants"],
+            {
+                "small": f"http://testserver/media/{root}_small.webp",
+                "large": f"http://testserver/media/{root}_large.webp",
+            },
+        )
+
+    def test_identical_uploads_share_files(self):
+        data = image_bytes((300, 200), "blue")
+        first = self.post_image("a.png", data)
+        second = self.post_image("b.png", data)
+        other = self.post_image("a.png", image_bytes((300, 200), "green"))
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertNotEqual(first.image.name, other.image.name)
+        # Dois originais, cada um com duas derivadas
+        _, files = default_storage.listdir("tweet_images")
+        self.assertEqual(len(files), 6)
+
+    def test_avatar_variants_are_square(self):
+        self.user.avatar.save(
+            "me.jpg", ContentFile(image_bytes((500, 300), format="JPEG"))
+        )
+        queue.run_pending()
+        with default_storage.open(self.user.avatar.variant_names()["small"]) as file:
+            self.assertEqual(Image.open(file).size, (96, 96))
+
+    def test_command_generates_missing_variants(self):
+        # Imagem gravada antes do pipeline: só o original
+        name = default_storage.save(
+            "tweet_images/old.png", ContentFile(image_bytes((800, 800)))
+        )
+        tweet = Tweet.objects.create(author=self.user, content="antigo", image=name)
+        Tweet.objects.create(author=self.user, content="sem arquivo", image="x.png")
+        self.assertFalse(default_storage.exists(tweet.image.variant_names()["small"]))
+
+        out, err = StringIO(), StringIO()
+        call_command("generate_image_variants", stdout=out, stderr=err)
+        self.assertIn("2 derivadas geradas", out.getvalue())
+        self.assertIn("x.png", err.getvalue())
+        for name in tweet.image.variant_names().values():
+            self.assertTrue(default_storage.exists(name))
+
+        out = StringIO()
+        call_command("generate_image_variants", stdout=out, stderr=StringIO())
+        self.assertIn("0 derivadas geradas", out.getvalue())
+
+
+class SearchTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user(
+            username="Author", email="author@example.com"
+        )
+        self.other = User.objects.create_user(username="Other", email="o@example.com")
+
+    def tweet(self, content, author=None, **fields):
+        tweet = Tweet.objects.create(author=author or self.author, content=content)
+        if fields:
+            Tweet.objects.filter(pk=tweet.pk).update(**fields)
+        return tweet
+
+    def search(self, **params):
+        response = self.client.get("/api/tweets/search/", params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def contents(self, **params):
+        return [tweet["content"] for tweet in self.search(**params).data["results"]]
+
+    def test_ranked_and_stemmed(self):
+        self.tweet("Correndo na praia")
+        self.tweet("Correr, correr e correr de novo")
+        self.tweet("Nada a ver")
+        self.assertEqual(
+            self.contents(q="correr"),
+            ["Correr, correr e correr de novo", "Correndo na praia"],
+        )
+        # Sintaxe de buscador: frase e exclusão
+        self.assertEqual(self.contents(q='"na praia"'), ["Correndo na praia"])
+        self.assertEqual(
+            self.contents(q="correr -praia"), ["Correr, correr e correr de novo"]
+        )
+
+    def test_edited_content_is_reindexed(self):
+        tweet = self.tweet("primeira versão")
+        tweet.content = "texto editado"
+        tweet.save()
+        self.assertEqual(self.contents(q="primeira"), [])
+        self.assertEqual(self.contents(q="editado"), ["texto editado"])
+
+    def test_author_and_date_filters(self):
+        now = timezone.now()
+        self.tweet("café antigo", timestamp=now - timedelta(days=10))
+        self.tweet("café novo")
+        self.tweet("café de outro", author=self.other)
+
+        self.assertEqual(
+            self.contents(q="café", author=self.other.pk), ["café de outro"]
+        )
+        since = (now - timedelta(days=1)).date().isoformat()
+        self.assertCountEqual(
+            self.contents(q="café", since=since), ["café novo", "café de outro"]
+        )
+        self.assertEqual(
+            self.contents(q="café", until=since, author=self.author.pk), ["café antigo"]
+        )
+
+    def test_keyset_pages_cover_ties_once(self):
+        # Mesmo rank em todos: a ordem desempata por id
+        ids = [self.tweet(f"bolo {n}").pk for n in range(5)]
+        self.tweet("bolo bolo bolo")
+        seen, url = [], "/api/tweets/search/?q=bolo&count=2"
+        while url:
+            response = self.client.get(url)
+            seen += [tweet["id"] for tweet in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(len(seen), 6)
+        self.assertEqual(seen[1:], sorted(ids, reverse=True))
+
+    def test_invalid_parameters(self):
+        for params in (
+            {},
+            {"q": " "},
+            {"q": "a", "since": "ontem"},
+            {"q": "a", "author": "x"},
+        ):
+            response = self.client.get("/api/tweets/search/", params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+
+class ThreadTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="TestUser", email="testuser@example.com", password="password123"
+        )
+        self.tweets = {}
+        for name, parent in [
+            ("root", None),
+            ("a", "root"),
+            ("b", "root"),
+            ("c", "root"),
+            ("a1", "a"),
+            ("a2", "a1"),
+            ("a3", "a2"),
+        ]:
+            self.tweets[name] = Tweet.objects.create(
+                author=self.user, content=name, parent_tweet=self.tweets.get(parent)
+            )
+        self.client = APIClient()
+
+    def tree(self, node):
+        return {
+            "content": node["content"],
+            "more": node["more_children"],
+            "children": [self.tree(child) for child in node["children"]],
+        }
+
+    @override_settings(THREAD_MAX_DEPTH=2, THREAD_MAX_REPLIES=2)
+    def test_tree_with_limits(self):
+        response = self.client.get(f"/api/tweets/{self.tweets['root'].pk}/thread/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["ancestors"], [])
+        self.assertFalse(response.data["more_ancestors"])
+        self.assertFalse(response.data["truncated"])
+        self.assertEqual(
+            self.tree(response.data["tweet"]),
+            {
+                "content": "root",
+                "more": True,
+                "children": [
+                    {
+                        "content": "a",
+                        "more": False,
+                        "children": [{"content": "a1", "more": True, "children": []}],
+                    },
+                    {"content": "b", "more": False, "children": []},
+                ],
+            },
+        )
+        self.assertIn("liked_by_me", response.data["tweet"])
+
+    def test_ancestors(self):
+        response = self.client.get(
+            f"/api/tweets/{self.tweets['a2'].pk}/thread/", {"depth": 0}
+        )
+        contents = [tweet["content"] for tweet in response.data["ancestors"]]
+        self.assertEqual(contents, ["root", "a", "a1"])
+        self.assertEqual(
+            self.tree(response.data["tweet"]),
+            {"content": "a2", "more": True, "children": []},
+        )
+
+        with override_settings(THREAD_MAX_ANCESTORS=2):
+            response = self.client.get(f"/api/tweets/{self.tweets['a2'].pk}/thread/")
+        contents = [tweet["content"] for tweet in response.data["ancestors"]]
+        self.assertEqual(contents, ["a", "a1"])
+        self.assertTrue(response.data["more_ancestors"])
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            data = threads.get_thread(self.tweets["a1"].pk, depth=8, replies=10)
+        self.assertEqual(len(data["ancestors"]), 2)
+        self.assertEqual(data["tweet"]["children"][0]["content"], "a2")
+
+    @override_settings(THREAD_MAX_TWEETS=3)
+    def test_truncated(self):
+        response = self.client.get(f"/api/tweets/{self.tweets['root'].pk}/thread/")
+        self.assertTrue(response.data["truncated"])
+
+    def test_errors(self):
+        response = self.client.get("/api/tweets/999999/thread/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(
+            f"/api/tweets/{self.tweets['root'].pk}/thread/", {"depth": "x"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TagsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="alice", email="a@example.com")
+        self.bob = User.objects.create_user(username="bob", email="b@example.com")
+        self.client.force_authenticate(self.user)
+
+    def post(self, content):
+        response = self.client.post("/api/tweets/", {"content": content})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["id"]
+
+    def ids(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [tweet["id"] for tweet in response.data["results"]]
+
+    def test_extract(self):
+        self.assertEqual(
+            tags.extract("#Django e #django, #2024 &#39; a@b.com @bob @bob x#y #São"),
+            (["django", "são"], ["bob"]),
+        )
+
+    def test_lists_tweets_by_hashtag_and_mention(self):
+        first = self.post("Olá #Python, @bob!")
+        second = self.post("#python de novo, @ninguem")
+        self.post("sem tags")
+
+        self.assertEqual(self.ids("/api/tweets/tags/PYTHON/"), [second, first])
+        self.assertEqual(self.ids(f"/api/users/{self.bob.pk}/mentions/"), [first])
+        self.assertEqual(self.ids("/api/tweets/tags/outra/"), [])
+
+        response = self.client.get("/api/tweets/tags/python/", {"count": 1})
+        self.assertEqual(self.ids(response.data["next"]), [first])
+
+    def test_edited_content_replaces_links(self):
+        tweet = self.post("#antes @bob")
+        self.client.patch(f"/api/tweets/{tweet}/", {"content": "#depois"})
+        self.assertEqual(self.ids("/api/tweets/tags/antes/"), [])
+        self.assertEqual(self.ids("/api/tweets/tags/depois/"), [tweet])
+        self.assertEqual(self.ids(f"/api/users/{self.bob.pk}/mentions/"), [])
+
+    def test_backfill_command(self):
+        # Gravados sem o serializer, como os tweets anteriores às ligações
+        tweets = [
+            Tweet.objects.create(author=self.bob, content=f"#legado {n} @alice")
+            for n in range(3)
+        ]
+        out = StringIO()
+        call_command("index_tags", batch_size=2, stdout=out)
+        self.assertIn("3 tweets indexados", out.getvalue())
+        expected = [tweet.pk for tweet in reversed(tweets)]
+        self.assertEqual(self.ids("/api/tweets/tags/legado/"), expected)
+        self.assertEqual(self.ids(f"/api/users/{self.user.pk}/mentions/"), expected)
+        # Reindexar não duplica
+        tags.reindex()
+        self.assertEqual(TweetHashtag.objects.count(), 3)
+
+
+class SyntheticDataCommandTest(TestCase):
+    def test_generates_consistent_graph(self):
+        call_command(
+            "generate_synthetic_data",
+            users=50,
+            follows_per_user=5,
+            tweets_per_user=4,
+            reply_rate=0.5,
+            max_reply_depth=2,
+            prefix="gen",
+            stdout=StringIO(),
+        )
+        users = User.objects.filter(username__startswith="gen")
+        self.assertEqual(users.count(), 50)
+        self.assertTrue(Tweet.objects.filter(parent_tweet__isnull=False).exists())
+        self.assertTrue(TweetHashtag.objects.exists())
+        self.assertFalse(
+            Tweet.objects.filter(
+                parent_tweet__parent_tweet__parent_tweet__isnull=False
+            ).exists()
+        )
+
+        top = users.order_by("-followers_count").first()
+        self.assertEqual(
+            top.followers_count,
+            UserFollowing.objects.filter(following_user=top).count(),
+        )
+        self.assertEqual(
+            TimelineEntry.objects.filter(owner=top, tweet__author=top).count(),
+            top.tweets_count,
+        )
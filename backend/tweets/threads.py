@@ -0,0 +1,151 @@
+"""
+Conversas (``GET /api/tweets/{id}/thread/``).
+
+Os ancestrais de um tweet (a cadeia de ``parent_tweet`` até a raiz) e a árvore
+das suas respostas vêm numa única consulta, com CTEs recursivas, em vez de uma
+consulta por nível. A árvore é limitada em profundidade, em respostas por tweet
+(as mais antigas primeiro, lidas em ordem de ``tweet_reply_thread_idx``) e no
+total de tweets, e é montada em memória: conversas virais carregam em tempo
+limitado.
+"""
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models.expressions import RawSQL
+from rest_framework.exceptions import ParseError
+
+from .models import Tweet
+from .serializers import serialize_tweet_rows, tweet_rows
+
+# Por tweet, uma resposta além do limite (ou, no último nível, só uma) indica
+# que há mais respostas; essas linhas extras não são devolvidas. A recursão
+# anda nível a nível, então o LIMIT final corta a árvore pelos níveis mais
+# profundos.
+THREAD_SQL = """
+WITH RECURSIVE ancestors (id, parent_id, depth) AS (
+        SELECT id, parent_tweet_id, 0 FROM {table} WHERE id = %s
+    UNION ALL
+        SELECT t.id, t.parent_tweet_id, a.depth + 1
+        FROM ancestors a JOIN {table} t ON t.id = a.parent_id
+        WHERE a.depth < %s
+), descendants (id, depth, position) AS (
+        SELECT id, 0, 1::bigint FROM {table} WHERE id = %s
+    UNION ALL
+        SELECT r.id, d.depth + 1, r.position
+        FROM descendants d CROSS JOIN LATERAL (
+            SELECT t.id, row_number() OVER (ORDER BY t.timestamp, t.id) AS position
+            FROM {table} t
+            WHERE t.parent_tweet_id = d.id
+            ORDER BY t.timestamp, t.id
+            LIMIT %s
+        ) r
+        WHERE d.position <= %s AND (d.depth < %s OR (d.depth = %s AND r.position = 1))
+)
+SELECT id FROM ancestors
+UNION ALL
+(SELECT id FROM descendants LIMIT %s)
+"""
+
+
+def _limit_param(query_params, param, maximum):
+    value = query_params.get(param)
+    if value is None:
+        return maximum
+    try:
+        value = int(value)
+    except ValueError:
+        raise ParseError(f"Invalid {param}")
+    return min(max(value, 0 if param == "depth" else 1), maximum)
+
+
+def parse_limits(query_params):
+    """Argumentos ``depth`` e ``replies`` de ``get_thread``, até os máximos."""
+    return {
+        "depth": _limit_param(query_params, "depth", settings.THREAD_MAX_DEPTH),
+        "replies": _limit_param(query_params, "replies", settings.THREAD_MAX_REPLIES),
+    }
+
+
+def thread_rows(tweet_id, depth, replies):
+    """Linhas de ``tweet_rows`` (com ``parent_tweet_id``) da conversa."""
+    sql = THREAD_SQL.format(table=Tweet._meta.db_table)
+    params = (
+        tweet_id,
+        settings.THREAD_MAX_ANCESTORS,
+        tweet_id,
+        replies + 1,
+        replies,
+        depth,
+        depth,
+        settings.THREAD_MAX_TWEETS + 1,
+    )
+    queryset = Tweet.objects.filter(id__in=RawSQL(sql, params))
+    return list(tweet_rows(queryset, "parent_tweet_id"))
+
+
+def get_thread(tweet_id, depth, replies, request=None):
+    """
+    Conversa de ``tweet_id``, ou ``None`` se o tweet não existe::
+
+        {"ancestors": [...], "more_ancestors": bool,
+         "tweet": {..., "children": [...], "more_children": bool},
+         "truncated": bool}
+
+    ``ancestors`` começa pela raiz da conversa. Cada tweet da árvore traz as
+    suas respostas em ``children`` e ``more_children`` quando há respostas
+    além dos limites; ``truncated`` indica que o total de tweets chegou a
+    ``THREAD_MAX_TWEETS`` e níveis mais profundos podem estar incompletos.
+    """
+    rows = {row["id"]: row for row in thread_rows(tweet_id, depth, replies)}
+    if tweet_id not in rows:
+        return None
+
+    ancestors = []
+    parent_id = rows[tweet_id]["parent_tweet_id"]
+    while parent_id in rows and len(ancestors) < settings.THREAD_MAX_ANCESTORS:
+        ancestors.append(rows[parent_id])
+        parent_id = rows[parent_id]["parent_tweet_id"]
+    ancestors.reverse()
+
+    children = defaultdict(list)
+    for row in rows.values():
+        children[row["parent_tweet_id"]].append(row)
+
+    # Nível a nível, sem as linhas extras que só indicam mais respostas
+    tree, more, level = [rows[tweet_id]], set(), [rows[tweet_id]]
+    descendants = 0
+    for current_depth in range(depth + 1):
+        next_level = []
+        for row in level:
+            found = sorted(
+                children.get(row["id"], ()), key=lambda r: (r["timestamp"], r["id"])
+            )
+            descendants += len(found)
+            if len(found) > replies or (found and current_depth == depth):
+                more.add(row["id"])
+            if current_depth < depth:
+                next_level.extend(found[:replies])
+        tree.extend(next_level)
+        level = next_level
+
+    serialized = dict(
+        zip(
+            [row["id"] for row in ancestors + tree],
+            serialize_tweet_rows(
+                ancestors + tree, request, getattr(request, "user", None)
+            ),
+        )
+    )
+    for row in tree:
+        node = serialized[row["id"]]
+        node["children"] = []
+        node["more_children"] = row["id"] in more
+        if row["id"] != tweet_id:
+            serialized[row["parent_tweet_id"]]["children"].append(node)
+    return {
+        "ancestors": [serialized[row["id"]] for row in ancestors],
+        "more_ancestors": parent_id is not None,
+        "tweet": serialized[tweet_id],
+        "truncated": descendants >= settings.THREAD_MAX_TWEETS,
+    }
@@ -0,0 +1,104 @@
+"""
+Timelines materializadas (fan-out on write).
+
+Cada tweet criado é copiado para a timeline do autor e dos seus seguidores.
+Autores com muitos seguidores não são distribuídos: seus tweets ficam com
+``fanned_out=False`` e são mesclados no feed em tempo de leitura.
+"""
+
+from django.conf import settings
+from django.db.models import F, Q
+
+from users.models import User, UserFollowing
+
+from .models import TimelineEntry, Tweet
+
+
+def fan_out(tweet):
+    """Distribui um tweet recém-criado nas timelines do autor e seguidores."""
+    # Conta muito seguida: mesclada na leitura, só o autor recebe a entrada
+    high_fanout = tweet.author.followers_count > settings.TIMELINE_FANOUT_MAX_FOLLOWERS
+    follower_ids = []
+    if not high_fanout:
+        follower_ids = UserFollowing.objects.filter(
+            following_user_id=tweet.author_id
+        ).values_list("user_id", flat=True)
+
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(owner_id=owner_id, tweet=tweet, timestamp=tweet.timestamp)
+            for owner_id in [tweet.author_id, *follower_ids]
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    if not high_fanout:
+        Tweet.objects.filter(pk=tweet.pk).update(fanned_out=True)
+        tweet.fanned_out = True
+
+
+def backfill(user, author):
+    """Copia os tweets recentes de ``author`` para a timeline de ``user``."""
+    tweets = (
+        Tweet.objects.filter(author=author, fanned_out=True)
+        .order_by("-timestamp", "-id")
+        .values_list("id", "timestamp")[: settings.TIMELINE_MAX_LENGTH]
+    )
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(owner=user, tweet_id=tweet_id, timestamp=timestamp)
+            for tweet_id, timestamp in tweets
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    trim(user)
+
+
+def remove_author(user, author):
+    """Remove da timeline de ``user`` os tweets de ``author``."""
+    # owner_id = ... AND tweet_id IN (...): um DELETE sobre o índice da timeline,
+    # em vez de ``id IN (subconsulta com JOIN)``
+    tweets = Tweet.objects.filter(author=author).values("id")
+    TimelineEntry.objects.filter(owner=user, tweet_id__in=tweets).delete()
+
+
+def trim(owner):
+    """Mantém apenas as ``TIMELINE_MAX_LENGTH`` entradas mais recentes."""
+    entries = TimelineEntry.objects.filter(owner=owner)
+    # Primeira entrada excedente: ela e as mais antigas são removidas por um
+    # intervalo de timeline_owner_recent_idx
+    cutoff = (
+        entries.order_by("-timestamp", "-tweet_id")
+        .values_list("timestamp", "tweet_id")[settings.TIMELINE_MAX_LENGTH :]
+        .first()
+    )
+    if cutoff is None:
+        return 0
+    timestamp, tweet_id = cutoff
+    stale = Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, tweet_id__lte=tweet_id)
+    return entries.filter(stale).delete()[0]
+
+
+def home_timeline(user):
+    """
+    Fontes do feed de ``user``, paginadas juntas por ``feed_at``: a timeline
+    materializada e os tweets ainda não distribuídos (próprios ou de contas
+    muito seguidas). Cada fonte é lida em ordem pelo seu próprio índice.
+    """
+    stored = Tweet.objects.filter(timeline_entries__owner=user).annotate(
+        feed_at=F("timeline_entries__timestamp")
+    )
+    # IN (seguidos UNION ALL o próprio usuário) em vez de OR: cada autor vira
+    # uma busca no índice parcial tweet_pending_fanout_idx
+    authors = (
+        UserFollowing.objects.filter(user=user)
+        .values_list("following_user_id", flat=True)
+        .union(User.objects.filter(pk=user.pk).values_list("id", flat=True), all=True)
+    )
+    pending = (
+        Tweet.objects.filter(author_id__in=authors, fanned_out=False)
+        .exclude(timeline_entries__owner=user)
+        .annotate(feed_at=F("timestamp"))
+    )
+    return [source.select_related("author") for source in (stored, pending)]
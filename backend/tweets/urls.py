@@ -1,6 +1,7 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from . import async_views
 from .views import TweetViewSet
 
 router = DefaultRouter()
@@ -9,3 +10,12 @@ router.register(r"tweets", TweetViewSet)
 urlpatterns = [
     path("", include(router.urls)),
 ]
+
+# Leituras assíncronas, montadas antes do router em twitter/urls_async.py
+async_urlpatterns = [
+    path("tweets/", async_views.tweet_list),
+    path("tweets/feed/", async_views.feed),
+    path("tweets/stream/", async_views.stream),
+    path("tweets/<int:pk>/", async_views.tweet_detail),
+    path("tweets/<int:pk>/comments/", async_views.comments),
+]
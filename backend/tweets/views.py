@@ -1,39 +1,98 @@
+from django.http import Http404
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from users.models import UserFollowing
+from jobs.queue import enqueue
+from trends import tasks as trend_tasks
+from twitter.pagination import (
+    CommentPagination,
+    FeedPagination,
+    SearchPagination,
+    TagPagination,
+    TweetPagination,
+)
 
+from . import engagement, live, tags, tasks, threads, timeline
 from .models import Tweet, TweetLike, TweetRetweet
-from .serializers import TweetCommentSerializer, TweetSerializer
+from .search import parse_search, search_tweets
+from .serializers import (
+    TweetCommentSerializer,
+    TweetSerializer,
+    serialize_tweet_rows,
+    tweet_rows,
+)
 
 
 class TweetViewSet(viewsets.ModelViewSet):
-    queryset = Tweet.objects.all().order_by("-timestamp")
+    queryset = Tweet.objects.select_related("author").order_by("-timestamp")
     serializer_class = TweetSerializer
+    pagination_class = TweetPagination
+    throttle_scopes = {
+        "create": "tweet",
+        "like": "engagement",
+        "unlike": "engagement",
+        "retweet": "engagement",
+        "unretweet": "engagement",
+        "comment": "comment",
+    }
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(tweet_rows(queryset))
+        return self.get_paginated_response(
+            serialize_tweet_rows(page, request, request.user)
+        )
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        tweet = serializer.save(author=self.request.user)
+        enqueue(tasks.fan_out, tweet.pk)
+        hashtags, _ = tags.extract(tweet.content)
+        if hashtags:
+            enqueue(trend_tasks.count_hashtags, hashtags, tweet.timestamp.timestamp())
+        live.publish_tweet(tweet)
 
     @action(detail=False, methods=["get"])
     def feed(self, request):
-        following = UserFollowing.objects.filter(user=request.user)
-        following_users = [f.following_user for f in following]
+        # Timeline materializada: tweets próprios + usuários seguidos
+        sources = [
+            tweet_rows(source, "feed_at")
+            for source in timeline.home_timeline(request.user)
+        ]
+        paginator = FeedPagination()
+        page = paginator.paginate_queryset(sources, request, view=self)
+        return paginator.get_paginated_response(
+            serialize_tweet_rows(page, viewer=request.user)
+        )
 
-        # Incluir o próprio usuário logado + usuários seguidos
-        all_users = following_users + [request.user]
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        # ?q=<texto>[&author=<id>][&since=<data>][&until=<data>]
+        queryset = search_tweets(**parse_search(request.query_params))
+        paginator = SearchPagination()
+        page = paginator.paginate_queryset(
+            tweet_rows(queryset, "rank"), request, view=self
+        )
+        return paginator.get_paginated_response(
+            serialize_tweet_rows(page, request, request.user)
+        )
 
-        tweets = Tweet.objects.filter(author__in=all_users).order_by("-timestamp")
-        serializer = TweetSerializer(tweets, many=True)
-        return Response(serializer.data)
+    @action(detail=False, methods=["get"], url_path=r"tags/(?P<tag>[^/.]+)")
+    def tag(self, request, tag=None):
+        paginator = TagPagination()
+        page = paginator.paginate_queryset(
+            tweet_rows(tags.hashtag_tweets(tag), "tagged_at"), request, view=self
+        )
+        return paginator.get_paginated_response(
+            serialize_tweet_rows(page, request, request.user)
+        )
 
     @action(detail=True, methods=["post"])
     def like(self, request, pk=None):
         tweet = self.get_object()
         like, created = TweetLike.objects.get_or_create(user=request.user, tweet=tweet)
         if created:
-            tweet.likes += 1
-            tweet.save()
+            engagement.record(tweet.pk, "likes", 1)
             return Response({"message": "Tweet liked"})
         return Response({"message": "Tweet already liked"})
 
@@ -43,12 +102,25 @@ class TweetViewSet(viewsets.ModelViewSet):
         try:
             like = TweetLike.objects.get(user=request.user, tweet=tweet)
             like.delete()
-            tweet.likes -= 1
-            tweet.save()
+            engagement.record(tweet.pk, "likes", -1)
             return Response({"message": "Tweet unliked"})
         except TweetLike.DoesNotExist:
             return Response({"error": "Tweet not liked"}, status=400)
 
+    @action(detail=True, methods=["get"])
+    def thread(self, request, pk=None):
+        # ?depth=<níveis de respostas>&replies=<respostas por tweet>
+        try:
+            tweet_id = int(pk)
+        except ValueError:
+            raise Http404("No Tweet matches the given query.")
+        data = threads.get_thread(
+            tweet_id, **threads.parse_limits(request.query_params), request=request
+        )
+        if data is None:
+            raise Http404("No Tweet matches the given query.")
+        return Response(data)
+
     # tweets/views.py - Adicionar
     @action(detail=True, methods=["post"])
     def comment(self, request, pk=None):
@@ -57,17 +129,18 @@ class TweetViewSet(viewsets.ModelViewSet):
         if serializer.is_valid():
             serializer.save(author=request.user, tweet=tweet)
             # Atualizar contador de replies
-            tweet.replies += 1
-            tweet.save()
+            engagement.record(tweet.pk, "replies", 1)
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
 
     @action(detail=True, methods=["get"])
     def comments(self, request, pk=None):
         tweet = self.get_object()
-        comments = tweet.comments.all().order_by("-created_at")
-        serializer = TweetCommentSerializer(comments, many=True)
-        return Response(serializer.data)
+        comments = tweet.comments.select_related("author")
+        paginator = CommentPagination()
+        page = paginator.paginate_queryset(comments, request, view=self)
+        serializer = TweetCommentSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     @action(detail=True, methods=["post"])
     def retweet(self, request, pk=None):
@@ -76,8 +149,7 @@ class TweetViewSet(viewsets.ModelViewSet):
             user=request.user, tweet=original_tweet
         )
         if created:
-            original_tweet.retweets += 1
-            original_tweet.save()
+            engagement.record(original_tweet.pk, "retweets", 1)
             return Response({"message": "Tweet retweeted"})
         return Response({"message": "Tweet already retweeted"})
 
@@ -87,8 +159,7 @@ class TweetViewSet(viewsets.ModelViewSet):
         try:
             retweet = TweetRetweet.objects.get(user=request.user, tweet=tweet)
             retweet.delete()
-            tweet.retweets -= 1
-            tweet.save()
+            engagement.record(tweet.pk, "retweets", -1)
             return Response({"message": "Retweet removed"})
         except TweetRetweet.DoesNotExist:
             return Response({"error": "Tweet not retweeted"}, status=400)
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "twitter.settings")
+# Views de leitura assíncronas (twitter/urls_async.py)
+os.environ.setdefault("ASYNC_READ_VIEWS", "true")
 
 application = get_asgi_application()
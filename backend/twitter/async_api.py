@@ -0,0 +1,80 @@
+"""
+Base das views de leitura assíncronas (``tweets/async_views.py`` e
+``users/async_views.py``), montadas por ``twitter/urls_async.py`` quando a
+aplicação roda sob ASGI.
+
+O DRF só tem views síncronas: aqui a requisição é embrulhada num ``Request``
+do DRF (mesma autenticação, paginação e tratamento de erros) e a resposta é
+renderizada com o mesmo renderer JSON, de modo que a saída é idêntica à das
+views síncronas. Métodos de escrita seguem para a view do DRF.
+"""
+
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.urls import resolve
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+from .renderers import FastJSONRenderer
+
+READ_METHODS = ("GET", "HEAD")
+
+# Rotas síncronas, usadas para os métodos que não são de leitura
+FALLBACK_URLCONF = "twitter.urls"
+
+
+async def _authenticate(request):
+    # Autenticadores do DRF fazem I/O síncrono (ex.: busca do usuário do JWT)
+    await sync_to_async(lambda: request.user)()
+
+
+def _render(response, request):
+    if not isinstance(response, Response):
+        # Respostas prontas (ex.: streaming) seguem como estão
+        return response
+    renderer = FastJSONRenderer()
+    response.accepted_renderer = renderer
+    response.accepted_media_type = renderer.media_type
+    response.renderer_context = {"request": request, "response": response}
+    return response.render()
+
+
+async def _fallback(request, *args, **kwargs):
+    match = resolve(request.path_info, urlconf=FALLBACK_URLCONF)
+    return await sync_to_async(match.func)(request, *match.args, **match.kwargs)
+
+
+def async_read_view(view):
+    """
+    Transforma ``view(request, *args, **kwargs)`` (corrotina que devolve um
+    ``Response`` do DRF ou uma resposta do Django) numa view Django
+    assíncrona para GET/HEAD.
+    """
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in READ_METHODS:
+            return await _fallback(request, *args, **kwargs)
+
+        drf_request = Request(
+            request,
+            authenticators=[
+                auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+            ],
+        )
+        try:
+            await _authenticate(drf_request)
+            response = await view(drf_request, *args, **kwargs)
+        except Exception as exc:
+            # Mesmas respostas de erro do DRF (404, 401, cursor inválido...)
+            response = exception_handler(exc, {"request": drf_request})
+            if response is None:
+                raise
+        return _render(response, drf_request)
+
+    # Como nas views do DRF: a autenticação por sessão aplica o CSRF
+    wrapper.csrf_exempt = True
+    return wrapper
@@ -0,0 +1,162 @@
+"""
+Várias chamadas da API numa única requisição (``POST /api/batch/``).
+
+Corpo::
+
+    {"requests": [{"method": "GET", "path": "/api/users/me/"},
+                  {"method": "POST", "path": "/api/tweets/", "body": {...}}]}
+
+Cada item é resolvido pelo URLconf e entregue direto à view, com o usuário
+já autenticado pela requisição externa (sem repetir a autenticação nem os
+middlewares). A resposta traz ``{"status", "body"}`` de cada item, na ordem.
+
+Itens de escrita rodam na ordem, um de cada vez. Leituras consecutivas rodam
+juntas em até ``BATCH_MAX_WORKERS`` threads, cada uma com a sua conexão —
+exceto dentro de uma transação (``ATOMIC_REQUESTS``, testes), em que outras
+conexões não veriam o que ela ainda não gravou.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.core.handlers.exception import response_for_exception
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connection, connections
+from django.urls import Resolver404, get_resolver
+from rest_framework.exceptions import ParseError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE")
+READ_METHODS = ("GET",)
+
+
+def _parse(data):
+    items = data.get("requests") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ParseError("Expected a non-empty list in 'requests'")
+    if len(items) > settings.BATCH_MAX_REQUESTS:
+        raise ParseError(f"At most {settings.BATCH_MAX_REQUESTS} requests per batch")
+    parsed = []
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get("path"), str):
+            raise ParseError("Each request needs a 'path'")
+        method = str(item.get("method", "GET")).upper()
+        if method not in METHODS:
+            raise ParseError(f"Unsupported method: {method}")
+        if not item["path"].startswith("/api/"):
+            raise ParseError(f"Invalid path: {item['path']}")
+        parsed.append((method, item["path"], item.get("body")))
+    return parsed
+
+
+def _subrequest(request, method, path, body):
+    """``WSGIRequest`` de um item, com os cabeçalhos da requisição externa."""
+    url = urlsplit(path)
+    content = b"" if body is None else json.dumps(body).encode()
+    # REMOTE_ADDR: os limites por IP (twitter.throttling) valem em cada item
+    environ = {
+        key: value
+        for key, value in request.META.items()
+        if key.startswith("HTTP_")
+        or key in ("SERVER_NAME", "SERVER_PORT", "REMOTE_ADDR")
+    }
+    environ.update(
+        {
+            "REQUEST_METHOD": method,
+            "SCRIPT_NAME": "",
+            "PATH_INFO": url.path,
+            "QUERY_STRING": url.query,
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(content)),
+            "wsgi.input": BytesIO(content),
+            "wsgi.url_scheme": request.scheme,
+        }
+    )
+    subrequest = WSGIRequest(environ)
+    # Autenticação compartilhada: o DRF usa este usuário em vez de repetir
+    # os autenticadores (ver rest_framework.request.Request)
+    subrequest._force_auth_user = request.user
+    subrequest._force_auth_token = request.auth
+    subrequest.user = request.user
+    return subrequest
+
+
+def _body(response):
+    if isinstance(response, Response):
+        return response.data
+    if not response.content:
+        return None
+    if response.get("Content-Type", "").startswith("application/json"):
+        return json.loads(response.content)
+    return response.content.decode(response.charset)
+
+
+def _dispatch(request, method, path, body):
+    resolver = get_resolver(getattr(request, "urlconf", None))
+    try:
+        match = resolver.resolve(urlsplit(path).path)
+    except Resolver404:
+        return {"status": 404, "body": {"error": "Not found"}}
+    if getattr(match.func, "view_class", None) is BatchView:
+        return {"status": 400, "body": {"error": "Nested batch requests"}}
+
+    subrequest = _subrequest(request, method, path, body)
+    view = match.func
+    if iscoroutinefunction(view):
+        # Views assíncronas de ``twitter.urls_async``
+        view = async_to_sync(view)
+    try:
+        response = view(subrequest, *match.args, **match.kwargs)
+    except Exception as exc:
+        response = response_for_exception(subrequest, exc)
+    if response.streaming:
+        return {"status": 400, "body": {"error": "Streaming response"}}
+    return {"status": response.status_code, "body": _body(response)}
+
+
+def _dispatch_in_thread(request, method, path, body):
+    try:
+        return _dispatch(request, method, path, body)
+    finally:
+        # Conexões destas threads não são fechadas pelo ciclo de request
+        connections.close_all()
+
+
+def run_batch(request, items):
+    """Respostas de ``items`` (``(método, caminho, corpo)``), na ordem."""
+    workers = settings.BATCH_MAX_WORKERS
+    if connection.in_atomic_block:
+        workers = 1
+    results, reads = [], []
+
+    def run_reads():
+        if len(reads) > 1 and workers > 1:
+            with ThreadPoolExecutor(min(workers, len(reads))) as executor:
+                results.extend(
+                    executor.map(
+                        lambda item: _dispatch_in_thread(request, *item), reads
+                    )
+                )
+        else:
+            results.extend(_dispatch(request, *item) for item in reads)
+        reads.clear()
+
+    for item in items:
+        if item[0] in READ_METHODS:
+            reads.append(item)
+            continue
+        run_reads()
+        results.append(_dispatch(request, *item))
+    run_reads()
+    return results
+
+
+class BatchView(APIView):
+    def post(self, request):
+        items = _parse(request.data)
+        return Response({"responses": run_batch(request, items)})
@@ -0,0 +1,173 @@
+"""
+Imagens enviadas (``Tweet.image``, ``User.avatar``) com derivadas.
+
+Cada upload é gravado com o hash do conteúdo no nome: o mesmo arquivo
+enviado de novo reaproveita o original e as derivadas já armazenados. As
+derivadas (WebP redimensionadas, uma por tamanho do campo) são geradas pela
+fila de tarefas logo após o upload, ao lado do original, com nome calculável
+a partir dele, de modo que os serializers montam as URLs sem consultar o
+storage. Imagens anteriores ao pipeline ganham derivadas com
+``generate_image_variants``.
+"""
+
+import hashlib
+import logging
+import posixpath
+from io import BytesIO
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.db import models
+from django.db.models.fields.files import ImageFieldFile
+from PIL import Image, ImageOps
+from rest_framework import serializers
+
+from jobs.queue import enqueue, task
+
+logger = logging.getLogger(__name__)
+
+VARIANT_FORMAT = "WEBP"
+VARIANT_EXTENSION = ".webp"
+VARIANT_QUALITY = 80
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+def variant_name(name, label):
+    """Nome da derivada ``label`` do arquivo ``name`` (ex.: ``a/x_small.webp``)."""
+    root, _ = posixpath.splitext(name)
+    return f"{root}_{label}{VARIANT_EXTENSION}"
+
+
+def render_variant(image, size, crop=False):
+    """Bytes WebP de ``image`` reduzida para caber em ``size`` px (ou cortada)."""
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    if crop:
+        # Avatares: quadrado central
+        image = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+    else:
+        # Nunca amplia: imagens menores só mudam de formato
+        image = image.copy()
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+    output = BytesIO()
+    image.save(output, VARIANT_FORMAT, quality=VARIANT_QUALITY, method=4)
+    return output.getvalue()
+
+
+class VariantImageFieldFile(ImageFieldFile):
+    def save(self, name, content, save=True):
+        # Nome pelo conteúdo: uploads idênticos apontam para o mesmo arquivo
+        _, extension = posixpath.splitext(name)
+        filename = f"{content_hash(content)[:32]}{extension.lower()}"
+        stored = self.field.generate_filename(self.instance, filename)
+        if self.storage.exists(stored):
+            self.name = stored
+            setattr(self.instance, self.field.attname, self.name)
+            self._committed = True
+            self._dimensions_cache = None
+        else:
+            # ``upload_to`` é aplicado por ``FieldFile.save``
+            super().save(filename, content, save=False)
+        # Fora da requisição: até a tarefa rodar o cliente usa o original
+        enqueue(
+            generate_variants, self.field.model._meta.label, self.field.name, self.name
+        )
+        if save:
+            self.instance.save()
+
+    save.alters_data = True
+
+    def variant_names(self):
+        return {label: variant_name(self.name, label) for label in self.field.variants}
+
+    def generate_variants(self, overwrite=False):
+        """Gera as derivadas que faltam; devolve os nomes gravados."""
+        missing = {
+            label: name
+            for label, name in self.variant_names().items()
+            if overwrite or not self.storage.exists(name)
+        }
+        if not missing:
+            return []
+        self.open("rb")
+        try:
+            with Image.open(self) as image:
+                image.load()
+                rendered = {
+                    name: render_variant(
+                        image, self.field.variants[label], self.field.crop
+                    )
+                    for label, name in missing.items()
+                }
+        finally:
+            self.close()
+
+        saved = []
+        for name, data in rendered.items():
+            if overwrite and self.storage.exists(name):
+                self.storage.delete(name)
+            # Nome determinístico: o storage não pode renomear
+            saved_name = self.storage.save(name, ContentFile(data))
+            if saved_name != name:
+                logger.warning("Variant stored as %s instead of %s", saved_name, name)
+            saved.append(saved_name)
+        return saved
+
+
+@task()
+def generate_variants(model, field_name, name):
+    field = apps.get_model(model)._meta.get_field(field_name)
+    field.attr_class(None, field, name).generate_variants()
+
+
+class VariantImageField(models.ImageField):
+    """
+    ``ImageField`` com nome pelo hash do conteúdo e derivadas WebP.
+
+    ``variants`` mapeia rótulo para o lado máximo em px; com ``crop`` as
+    derivadas são quadradas (avatares).
+    """
+
+    attr_class = VariantImageFieldFile
+
+    def __init__(self, *args, variants=None, crop=False, **kwargs):
+        self.variants = variants or {}
+        self.crop = crop
+        super().__init__(*args, **kwargs)
+
+    # ``variants`` e ``crop`` não afetam o banco e ficam fora das migrações
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """URLs das derivadas (``{"small": url, ...}``) de um ``VariantImageField``."""
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        to_url = variant_urls(value.field, self.context.get("request"))
+        return to_url(value.name)
+
+
+def variant_urls(field, request=None):
+    """Função que leva o nome do original às URLs das derivadas de ``field``."""
+    storage = field.storage
+
+    def to_representation(name):
+        if not name:
+            return None
+        urls = {}
+        for label in field.variants:
+            url = storage.url(variant_name(name, label))
+            urls[label] = request.build_absolute_uri(url) if request else url
+        return urls
+
+    return to_representation
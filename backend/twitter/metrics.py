@@ -0,0 +1,252 @@
+"""
+Métricas por view (``MetricsMiddleware``) no formato texto do Prometheus, em
+``GET /metrics/``.
+
+Cada requisição soma, na view que a atendeu (``TweetViewSet.like``,
+``UserViewSet.tweets``...): contagem por status, histogramas de latência, de
+consultas SQL e do tamanho da resposta, e o tempo total no banco. A
+agregação é em memória, por processo, com um lock curto por requisição; com
+vários workers, cada scrape lê o processo que o atendeu.
+
+As consultas são contadas por um ``execute_wrapper`` instalado em todas as
+conexões, que soma no registro da requisição corrente (``ContextVar``); assim
+entram também as consultas das views assíncronas, feitas em outra thread via
+``sync_to_async``.
+
+Sem ``METRICS_TOKEN`` (``Authorization: Bearer <token>``) a rota só responde
+com ``DEBUG``.
+"""
+
+import bisect
+import hmac
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseNotFound
+
+PREFIX = "twitter_http"
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# [consultas, segundos] da requisição corrente
+_queries = ContextVar("metrics_queries", default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    totals = _queries.get()
+    if totals is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        totals[0] += 1
+        totals[1] += time.perf_counter() - start
+
+
+def _instrument(connection):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+@receiver(connection_created)
+def _connection_created(sender, connection, **kwargs):
+    _instrument(connection)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # Última posição: acima do maior limite (+Inf)
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            cumulative += count
+            yield f"{name}_bucket", {**labels, "le": str(bound)}, cumulative
+        yield f"{name}_sum", labels, self.sum
+        yield f"{name}_count", labels, cumulative
+
+
+class ViewStats:
+    __slots__ = ("statuses", "duration", "queries", "size", "db_seconds")
+
+    def __init__(self):
+        self.statuses = Counter()
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.db_seconds = 0.0
+
+
+METRICS = (
+    ("requests_total", "counter", "Requisições por view, método e status."),
+    ("request_duration_seconds", "histogram", "Latência das requisições."),
+    ("request_queries", "histogram", "Consultas SQL por requisição."),
+    ("request_db_seconds_total", "counter", "Tempo total das consultas SQL."),
+    ("response_size_bytes", "histogram", "Tamanho do corpo das respostas."),
+)
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def observe(self, view, method, status, seconds, queries, db_seconds, size):
+        with self._lock:
+            stats = self._views.get((view, method))
+            if stats is None:
+                stats = self._views[(view, method)] = ViewStats()
+            stats.statuses[status] += 1
+            stats.duration.observe(seconds)
+            stats.queries.observe(queries)
+            stats.db_seconds += db_seconds
+            if size is not None:
+                stats.size.observe(size)
+
+    def clear(self):
+        with self._lock:
+            self._views.clear()
+
+    def samples(self):
+        """``{métrica: [(nome, labels, valor)]}``, sem segurar o lock ao formatar."""
+        series = {name: [] for name, _, _ in METRICS}
+        with self._lock:
+            for (view, method), stats in sorted(self._views.items()):
+                labels = {"view": view, "method": method}
+                for status, count in sorted(stats.statuses.items()):
+                    series["requests_total"].append(
+                        (
+                            f"{PREFIX}_requests_total",
+                            {**labels, "status": str(status)},
+                            count,
+                        )
+                    )
+                for name, histogram in (
+                    ("request_duration_seconds", stats.duration),
+                    ("request_queries", stats.queries),
+                    ("response_size_bytes", stats.size),
+                ):
+                    series[name] += histogram.samples(f"{PREFIX}_{name}", labels)
+                series["request_db_seconds_total"].append(
+                    (f"{PREFIX}_request_db_seconds_total", labels, stats.db_seconds)
+                )
+        return series
+
+    def render(self):
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)."""
+        series = self.samples()
+        lines = []
+        for name, kind, help_text in METRICS:
+            lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+            for sample, labels, value in series[name]:
+                rendered = ",".join(
+                    f'{key}="{_escape(label)}"' for key, label in labels.items()
+                )
+                lines.append(f"{sample}{{{rendered}}} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def _escape(value):
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def view_label(request):
+    """Nome da view que atendeu ``request``: ``Classe.action`` no DRF."""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        # Sem rota (404): um único rótulo, e não um por caminho
+        return "unmatched"
+    view = match.func
+    cls = getattr(view, "cls", None) or getattr(view, "view_class", None)
+    if cls is None:
+        return f"{view.__module__}.{view.__name__}"
+    actions = getattr(view, "actions", None)
+    if actions:
+        method = request.method.lower()
+        return f"{cls.__name__}.{actions.get(method, method)}"
+    return cls.__name__
+
+
+class MetricsMiddleware:
+    """Registra latência, consultas, tamanho e status de cada requisição."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Conexões abertas antes deste módulo ser importado
+        for connection in connections.all(initialized_only=True):
+            _instrument(connection)
+        totals, start = [0, 0.0], time.perf_counter()
+        token = _queries.set(totals)
+        try:
+            response = self.get_response(request)
+        finally:
+            _queries.reset(token)
+        return self.finish(request, response, start, totals)
+
+    async def __acall__(self, request):
+        totals, start = [0, 0.0], time.perf_counter()
+        token = _queries.set(totals)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _queries.reset(token)
+        return self.finish(request, response, start, totals)
+
+    def finish(self, request, response, start, totals):
+        # Respostas em streaming (SSE): só até o início do envio
+        size = None if response.streaming else len(response.content)
+        registry.observe(
+            view_label(request),
+            request.method,
+            response.status_code,
+            time.perf_counter() - start,
+            totals[0],
+            totals[1],
+            size,
+        )
+        return response
+
+
+def metrics_view(request):
+    token = settings.METRICS_TOKEN
+    if token:
+        # Em bytes: com ``str``, compare_digest rejeita não-ASCII com TypeError
+        header = request.headers.get("Authorization", "").encode()
+        if not hmac.compare_digest(header, f"Bearer {token}".encode()):
+            return HttpResponse(status=401)
+    elif not settings.DEBUG:
+        return HttpResponseNotFound()
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,7 +1,10 @@
+import hashlib
 import logging
 import traceback
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
 from django.utils.deprecation import MiddlewareMixin
 
 logger = logging.getLogger(__name__)
@@ -26,3 +29,48 @@ class ErrorHandlingMiddleware(MiddlewareMixin):
 
         # Para outras requisições, deixar o Django lidar
         return None
+
+
+class ETagMiddleware:
+    """
+    ETag forte (hash do corpo) nas respostas GET/HEAD da API e 304 Not
+    Modified quando o ``If-None-Match`` do cliente confere.
+
+    O corpo ainda é renderizado, mas o polling do frontend (feed, ``me``,
+    ``following``) não retransmite nada quando a resposta não mudou.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if (
+            request.method not in ("GET", "HEAD")
+            or not request.path.startswith("/api/")
+            or response.status_code != 200
+            or response.streaming
+        ):
+            return response
+
+        # A resposta depende do usuário autenticado: caches compartilhados
+        # não podem servir a representação de um usuário a outro
+        patch_vary_headers(response, ["Authorization"])
+        if not response.has_header("ETag"):
+            digest = hashlib.blake2b(response.content, digest_size=16).hexdigest()
+            response.headers["ETag"] = f'"{digest}"'
+        return get_conditional_response(
+            request, etag=response.headers["ETag"], response=response
+        )
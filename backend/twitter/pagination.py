@@ -0,0 +1,280 @@
+import asyncio
+import math
+from base64 import b64decode, b64encode
+from collections import namedtuple
+from datetime import datetime
+from urllib import parse
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+Cursor = namedtuple("Cursor", ["position", "pk", "reverse"])
+# Maior id aceito num cursor (bigint do PostgreSQL)
+MAX_PK = 2**63 - 1
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por chave (position_field, id) em ordem decrescente.
+
+    Evita OFFSET: cada página é um índice percorrido a partir do cursor.
+    Aceita ``since_id`` (mais novos que o item) e ``max_id`` (até o item,
+    inclusive), no estilo da API do Twitter.
+    """
+
+    position_field = "timestamp"
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "count"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        sources = self.prepare(queryset, request)
+        since = self.get_anchor(sources, request, "since_id")
+        until = self.get_anchor(sources, request, "max_id")
+        results = []
+        for source in sources:
+            results += self.fetch(source, since, until)
+        return self.finish(results)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` com o ORM assíncrono (views de ``async_views``)."""
+        sources = self.prepare(queryset, request)
+        since, until = await asyncio.gather(
+            self.aget_anchor(sources, request, "since_id"),
+            self.aget_anchor(sources, request, "max_id"),
+        )
+        pages = await asyncio.gather(
+            *(self.afetch(source, since, until) for source in sources)
+        )
+        return self.finish([item for page in pages for item in page])
+
+    def prepare(self, queryset, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+        # Uma lista de querysets é paginada como uma única listagem: cada
+        # fonte é lida pelo seu índice e os resultados são mesclados
+        return queryset if isinstance(queryset, (list, tuple)) else [queryset]
+
+    def finish(self, results):
+        reverse = self.cursor is not None and self.cursor.reverse
+        results.sort(key=self.get_sort_key, reverse=not reverse)
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    def fetch(self, queryset, since=None, until=None):
+        return list(self.get_page_queryset(queryset, since, until))
+
+    async def afetch(self, queryset, since=None, until=None):
+        return [item async for item in self.get_page_queryset(queryset, since, until)]
+
+    def get_page_queryset(self, queryset, since=None, until=None):
+        if since is not None:
+            queryset = queryset.filter(self.newer_than(since))
+        if until is not None:
+            queryset = queryset.exclude(self.newer_than(until))
+
+        position = self.position_field
+        if self.cursor is None:
+            queryset = queryset.order_by(f"-{position}", "-id")
+        elif self.cursor.reverse:
+            queryset = queryset.filter(self.newer_than(self.cursor))
+            queryset = queryset.order_by(position, "id")
+        else:
+            queryset = queryset.filter(self.older_than(self.cursor))
+            queryset = queryset.order_by(f"-{position}", "-id")
+        return queryset[: self.page_size + 1]
+
+    def get_sort_key(self, item):
+        # Instâncias de modelo ou linhas de ``values()``
+        if isinstance(item, dict):
+            return item[self.position_field], item["id"]
+        return getattr(item, self.position_field), item.pk
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_anchor(self, sources, request, param):
+        pk = self.get_anchor_pk(request, param)
+        if pk is None:
+            return None
+        for queryset in sources:
+            row = self.get_anchor_queryset(queryset, pk).first()
+            if row is not None:
+                return Cursor(position=row[0], pk=row[1], reverse=False)
+        raise NotFound(f"Invalid {param}")
+
+    async def aget_anchor(self, sources, request, param):
+        pk = self.get_anchor_pk(request, param)
+        if pk is None:
+            return None
+        for queryset in sources:
+            row = await self.get_anchor_queryset(queryset, pk).afirst()
+            if row is not None:
+                return Cursor(position=row[0], pk=row[1], reverse=False)
+        raise NotFound(f"Invalid {param}")
+
+    def get_anchor_pk(self, request, param):
+        value = request.query_params.get(param)
+        if value is None:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise NotFound(f"Invalid {param}")
+
+    def get_anchor_queryset(self, queryset, pk):
+        return queryset.filter(pk=pk).values_list(self.position_field, "pk")
+
+    # O limite ``<=`` redundante permite ao índice começar no cursor, em vez
+    # de filtrar a listagem inteira
+    def older_than(self, cursor):
+        position = self.position_field
+        return Q(**{f"{position}__lte": cursor.position}) & (
+            Q(**{f"{position}__lt": cursor.position}) | Q(id__lt=cursor.pk)
+        )
+
+    def newer_than(self, cursor):
+        position = self.position_field
+        return Q(**{f"{position}__gte": cursor.position}) & (
+            Q(**{f"{position}__gt": cursor.position}) | Q(id__gt=cursor.pk)
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            querystring = b64decode(encoded.encode("ascii")).decode("ascii")
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            pk = int(tokens["i"][0])
+            if not 0 <= pk <= MAX_PK:
+                raise ValueError(pk)
+            return Cursor(
+                position=self.parse_position(tokens["p"][0]),
+                pk=pk,
+                reverse=bool(int(tokens.get("r", ["0"])[0])),
+            )
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def parse_position(self, value):
+        """Posição do cursor (``encode_cursor``); ``ValueError`` se inválida."""
+        position = datetime.fromisoformat(value)
+        if position.tzinfo is None:
+            raise ValueError(value)
+        return position
+
+    def encode_cursor(self, cursor):
+        position = cursor.position
+        if hasattr(position, "isoformat"):
+            position = position.isoformat()
+        tokens = {"p": position, "i": cursor.pk}
+        if cursor.reverse:
+            tokens["r"] = "1"
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = b64encode(querystring.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_cursor_for(self, item, reverse):
+        position, pk = self.get_sort_key(item)
+        return Cursor(position=position, pk=pk, reverse=reverse)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_cursor_for(self.page[-1], reverse=False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # Página vazia após um cursor: voltar ao início da listagem
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.get_cursor_for(self.page[0], reverse=True))
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class TweetPagination(KeysetPagination):
+    position_field = "timestamp"
+
+
+class CommentPagination(KeysetPagination):
+    position_field = "created_at"
+
+
+class FeedPagination(KeysetPagination):
+    """Feed mesclado de ``tweets.timeline.home_timeline``."""
+
+    position_field = "feed_at"
+
+
+class SearchPagination(KeysetPagination):
+    """Resultados de ``tweets.search``, por relevância."""
+
+    position_field = "rank"
+
+    def parse_position(self, value):
+        position = float(value)
+        if not math.isfinite(position):
+            raise ValueError(value)
+        return position
+
+
+class TagPagination(KeysetPagination):
+    """Tweets de uma hashtag ou que mencionam um usuário (``tweets.tags``)."""
+
+    position_field = "tagged_at"
+
+
+class FollowPagination(KeysetPagination):
+    """Listas de seguidores/seguidos, ordenadas pela data do follow."""
+
+    position_field = "followed_at"
+
+
+class SuggestionPagination(LimitOffsetPagination):
+    """
+    Ranking de ``users.suggestions``: uma lista curta já em memória, então
+    ``offset`` não custa nada no banco.
+    """
+
+    default_limit = 5
+    max_limit = 50
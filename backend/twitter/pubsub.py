@@ -0,0 +1,199 @@
+"""
+Pub/sub dos eventos em tempo real (SSE de ``tweets.live``).
+
+``publish`` pode ser chamado de qualquer thread (views síncronas, flush do
+buffer de engajamento); ``subscribe`` é usado por views assíncronas. O
+``Hub`` do processo entrega cada mensagem na fila dos assinantes do canal,
+no event loop de cada um.
+
+O broker (``PUBSUB_BROKER``) leva as mensagens até os hubs: ``LocalBroker``
+entrega direto no hub do próprio processo (um worker, desenvolvimento e
+testes); ``RedisBroker`` usa o PUBLISH/SUBSCRIBE do Redis, de modo que um
+evento publicado num worker chega aos assinantes de todos.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Mensagem entregue no lugar das descartadas quando a fila de um assinante
+# lento enche: o cliente deve recarregar o estado
+RESET = {"type": "reset"}
+
+
+class Subscription:
+    def __init__(self, hub, loop, maxsize):
+        self.hub = hub
+        self.loop = loop
+        self.channels = set()
+        self.queue = asyncio.Queue(maxsize)
+
+    def add(self, *channels):
+        self.hub.register(self, channels)
+
+    def remove(self, *channels):
+        self.hub.unregister(self, channels)
+
+    def close(self):
+        self.hub.unregister(self, list(self.channels))
+
+    async def get(self):
+        """Próxima mensagem, como ``(canal, mensagem)``."""
+        return await self.queue.get()
+
+    def deliver(self, channel, message):
+        # Sempre no event loop do assinante
+        try:
+            self.queue.put_nowait((channel, message))
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait((None, RESET))
+
+
+class Hub:
+    """Assinantes por canal, dentro de um processo."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, channels=(), maxsize=None):
+        subscription = Subscription(
+            self,
+            asyncio.get_running_loop(),
+            maxsize or settings.PUBSUB_QUEUE_SIZE,
+        )
+        subscription.add(*channels)
+        return subscription
+
+    def register(self, subscription, channels):
+        with self._lock:
+            for channel in channels:
+                self._subscribers[channel].add(subscription)
+                subscription.channels.add(channel)
+
+    def unregister(self, subscription, channels):
+        with self._lock:
+            for channel in channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[channel]
+                subscription.channels.discard(channel)
+
+    def has_subscribers(self, channel):
+        return channel in self._subscribers
+
+    def dispatch(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.deliver, channel, message
+                )
+            except RuntimeError:
+                # Event loop já encerrado: o assinante some no ``close``
+                pass
+
+
+class LocalBroker:
+    """Entrega apenas aos assinantes do próprio processo."""
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    def start(self):
+        pass
+
+    def wants(self, channel):
+        return self.hub.has_subscribers(channel)
+
+    def publish(self, channel, message):
+        self.hub.dispatch(channel, message)
+
+
+class RedisBroker:
+    """
+    PUBLISH/SUBSCRIBE do Redis (``PUBSUB_URL``; requer o pacote redis).
+
+    Cada processo assina todos os canais com um único PSUBSCRIBE, lido numa
+    thread própria, e o hub filtra pelos assinantes locais.
+    """
+
+    prefix = "pubsub:"
+
+    def __init__(self, hub):
+        import redis
+
+        self.hub = hub
+        self.client = redis.Redis.from_url(settings.PUBSUB_URL)
+        self._lock = threading.Lock()
+        self._listener = None
+
+    def start(self):
+        with self._lock:
+            if self._listener is None:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(**{f"{self.prefix}*": self._handle})
+                self._listener = pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def wants(self, channel):
+        # Assinantes de outros processos não são conhecidos aqui
+        return True
+
+    def publish(self, channel, message):
+        self.client.publish(f"{self.prefix}{channel}", json.dumps(message))
+
+    def _handle(self, message):
+        channel = message["channel"].decode().removeprefix(self.prefix)
+        self.hub.dispatch(channel, json.loads(message["data"]))
+
+
+hub = Hub()
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(settings.PUBSUB_BROKER)(hub)
+    return _broker
+
+
+@receiver(setting_changed)
+def _reset_broker(setting, **kwargs):
+    global _broker
+    if setting in ("PUBSUB_BROKER", "PUBSUB_URL"):
+        _broker = None
+
+
+def subscribe(channels=()):
+    """Nova assinatura no event loop atual; feche com ``close()``."""
+    get_broker().start()
+    return hub.subscribe(channels)
+
+
+def wants(channel):
+    """Se pode haver assinantes de ``channel`` (evita montar mensagens à toa)."""
+    return get_broker().wants(channel)
+
+
+def publish(channel, message):
+    """Publica ``message`` (dict serializável em JSON) em ``channel``."""
+    try:
+        get_broker().publish(channel, message)
+    except Exception:
+        # Eventos em tempo real são best-effort: não derrubam a requisição
+        logger.exception("Failed to publish to %s", channel)
@@ -1,7 +1,47 @@
+from html import escape
+
+import orjson
 from rest_framework.renderers import JSONRenderer
 from rest_framework.utils import json
 
 
+def _dumps(data, encoder, option=0):
+    """
+    Codifica ``data`` direto para bytes com orjson; ``None`` se o orjson não
+    aceitar algum valor.
+    """
+    try:
+        # Datetimes passam pelo encoder do DRF: "Z" no lugar de "+00:00"
+        return orjson.dumps(
+            data,
+            default=encoder().default,
+            option=option | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+    except orjson.JSONEncodeError:
+        return None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer que codifica com orjson direto para bytes.
+
+    A saída é a mesma do JSONRenderer compacto do DRF; tipos que o orjson não
+    aceita (ex.: inteiros acima de 64 bits) voltam para o encoder padrão.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if not self.get_indent(accepted_media_type, renderer_context or {}):
+            ret = _dumps(data, self.encoder_class)
+            if ret is not None:
+                # Mesmo escape do DRF para U+2028/U+2029 (JSON embutido em JS)
+                return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                    b"\xe2\x80\xa9", b"\\u2029"
+                )
+        return super().render(data, accepted_media_type, renderer_context)
+
+
 class SafeBrowsableAPIRenderer(JSONRenderer):
     """
     Renderer personalizado que evita o erro 'Request' object has no attribute 'copy'
@@ -25,9 +65,15 @@ class SafeBrowsableAPIRenderer(JSONRenderer):
             )
 
         # Renderizar como JSON
-        json_data = json.dumps(data, indent=2, ensure_ascii=False)
+        encoded = _dumps(data, self.encoder_class, orjson.OPT_INDENT_2)
+        if encoded is not None:
+            json_data = encoded.decode("utf-8")
+        else:
+            json_data = json.dumps(
+                data, cls=self.encoder_class, indent=2, ensure_ascii=False
+            )
 
-        # Criar HTML básico com o JSON
+        # Criar HTML básico com o JSON (escapado: o conteúdo vem dos usuários)
         html_content = f"""
         <!DOCTYPE html>
         <html>
@@ -46,7 +92,7 @@ class SafeBrowsableAPIRenderer(JSONRenderer):
         </head>
         <body>
             <h1>API Response</h1>
-            <pre>{json_data}</pre>
+            <pre>{escape(json_data, quote=False)}</pre>
         </body>
         </html>
         """
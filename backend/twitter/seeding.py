@@ -0,0 +1,369 @@
+"""
+Geração de um grafo social sintético para testes de desempenho.
+
+Os seguidores seguem uma distribuição de lei de potência (Zipf): poucas
+contas concentram a maior parte dos follows e do engajamento, como em
+produção. Tudo é inserido em lotes com ``bulk_create``; em memória ficam só
+arrays compactos de ids, então o gerador escala para milhões de linhas.
+"""
+
+import random
+from array import array
+from bisect import bisect
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from itertools import accumulate
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from tweets import engagement, tags
+from tweets.models import (
+    TimelineEntry,
+    Tweet,
+    TweetComment,
+    TweetLike,
+    TweetRetweet,
+)
+from users import counters
+from users.models import User, UserFollowing
+
+SEED_PASSWORD = "password123"
+
+
+def zipf_weights(count, exponent):
+    return [1 / (rank**exponent) for rank in range(1, count + 1)]
+
+
+@contextmanager
+def explicit_timestamps(model, *field_names):
+    """Permite gravar valores próprios em campos ``auto_now_add``."""
+    fields = [model._meta.get_field(name) for name in field_names]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class SocialGraphGenerator:
+    def __init__(
+        self,
+        users=2000,
+        follows_per_user=20,
+        follower_skew=1.1,
+        tweets_per_user=3,
+        reply_rate=0.2,
+        max_reply_depth=4,
+        likes_per_user=10,
+        retweets_per_user=2,
+        comments_per_user=2,
+        hashtag_rate=0.3,
+        hashtags=100,
+        mention_rate=0.1,
+        days=30,
+        timeline_length=None,
+        prefix="seed",
+        seed=0,
+        batch_size=5000,
+        log=None,
+    ):
+        self.users = users
+        self.follows_per_user = follows_per_user
+        self.follower_skew = follower_skew
+        self.tweets_per_user = tweets_per_user
+        self.reply_rate = reply_rate
+        self.max_reply_depth = max_reply_depth
+        self.likes_per_user = likes_per_user
+        self.retweets_per_user = retweets_per_user
+        self.comments_per_user = comments_per_user
+        self.hashtag_rate = hashtag_rate
+        self.mention_rate = mention_rate
+        # Hashtags também concentradas em poucos assuntos
+        self.cum_hashtags = list(accumulate(zipf_weights(hashtags, 1.0)))
+        self.days = days
+        self.timeline_length = timeline_length or settings.TIMELINE_MAX_LENGTH
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+        self.rng = random.Random(seed)
+
+        self.user_ids = array("q")
+        # Tweets agrupados por autor: tweet_ids[offset[i] : offset[i] + count[i]]
+        self.tweet_ids = array("q")
+        self.tweet_times = array("d")
+        self.tweet_depths = array("B")
+        self.author_offsets = array("q")
+        self.author_counts = array("l")
+        self.flushed_authors = 0
+        self.totals = {}
+
+    def run(self):
+        self.create_users()
+        self.create_follows()
+        self.create_tweets()
+        if self.tweet_ids:
+            self.log("Extraindo hashtags e menções...")
+            tags.reindex(
+                Tweet.objects.filter(
+                    id__gte=min(self.tweet_ids), id__lte=max(self.tweet_ids)
+                ),
+                batch_size=self.batch_size,
+            )
+        self.create_engagement()
+        self.log("Recalculando contadores...")
+        counters.recount(
+            User.objects.filter(id__gte=self.user_ids[0], id__lte=self.user_ids[-1]),
+            batch_size=self.batch_size,
+        )
+        if self.tweet_ids:
+            engagement.recount(
+                Tweet.objects.filter(
+                    id__gte=min(self.tweet_ids), id__lte=max(self.tweet_ids)
+                ),
+                batch_size=self.batch_size,
+            )
+            self.fill_timelines()
+        return self.totals
+
+    def pick_user(self, limit=None):
+        """Índice de um usuário sorteado pela popularidade (Zipf)."""
+        limit = limit or len(self.cum_popularity)
+        point = self.rng.random() * self.cum_popularity[limit - 1]
+        return min(bisect(self.cum_popularity, point), limit - 1)
+
+    def pick_tweet(self, authors=None):
+        """Índice (em ``tweet_ids``) de um tweet de um autor popular."""
+        for _ in range(10):
+            author = self.pick_user(authors)
+            if self.author_counts[author]:
+                offset = self.author_offsets[author]
+                return offset + self.rng.randrange(self.author_counts[author])
+        return None
+
+    def create_users(self):
+        password = make_password(SEED_PASSWORD)
+        for start in range(0, self.users, self.batch_size):
+            batch = User.objects.bulk_create(
+                [
+                    User(
+                        username=f"{self.prefix}{i}",
+                        email=f"{self.prefix}{i}@example.com",
+                        password=password,
+                        first_name=f"First{i}",
+                        last_name=f"Last{i}",
+                        bio=f"Synthetic user {i}",
+                    )
+                    for i in range(start, min(start + self.batch_size, self.users))
+                ]
+            )
+            self.user_ids.extend(user.id for user in batch)
+            self.log(f"Usuários: {len(self.user_ids)}/{self.users}")
+        # O usuário de índice 0 é o mais seguido, o último o menos seguido
+        popularity = zipf_weights(len(self.user_ids), self.follower_skew)
+        self.cum_popularity = list(accumulate(popularity))
+        self.totals["users"] = len(self.user_ids)
+
+    def create_follows(self):
+        rows, total = [], 0
+        for index, user_id in enumerate(self.user_ids):
+            k = self.rng.randint(1, self.follows_per_user * 2)
+            targets = {self.pick_user() for _ in range(k)}
+            rows += [
+                UserFollowing(user_id=user_id, following_user_id=self.user_ids[t])
+                for t in targets
+                if t != index
+            ]
+            if len(rows) >= self.batch_size:
+                total += self._flush(UserFollowing, rows, "Follows")
+        self.totals["follows"] = total + self._flush(UserFollowing, rows, "Follows")
+
+    def create_tweets(self):
+        now = timezone.now().timestamp()
+        start = now - timedelta(days=self.days).total_seconds()
+        rows, depths = [], []
+        # Lotes menores que o total permitem respostas desde o início
+        expected = self.users * self.tweets_per_user
+        tweet_batch = min(self.batch_size, max(expected // 20, 100))
+
+        def flush(authors):
+            with explicit_timestamps(Tweet, "timestamp"):
+                created = Tweet.objects.bulk_create(rows)
+            for tweet, depth in zip(created, depths):
+                self.tweet_ids.append(tweet.id)
+                self.tweet_times.append(tweet.timestamp.timestamp())
+                self.tweet_depths.append(depth)
+            self.flushed_authors = authors
+            self.log(f"Tweets: {len(self.tweet_ids)}")
+            rows.clear()
+            depths.clear()
+
+        for index, user_id in enumerate(self.user_ids):
+            self.author_offsets.append(len(self.tweet_ids) + len(rows))
+            count = self.rng.randint(0, self.tweets_per_user * 2)
+            self.author_counts.append(count)
+            for n in range(count):
+                parent, depth = None, 0
+                ts = start + self.rng.random() * (now - start)
+                # Respostas só apontam para tweets de lotes já gravados
+                if self.flushed_authors and self.rng.random() < self.reply_rate:
+                    candidate = self.pick_tweet(authors=self.flushed_authors)
+                    if (
+                        candidate is not None
+                        and self.tweet_depths[candidate] < self.max_reply_depth
+                    ):
+                        parent = self.tweet_ids[candidate]
+                        depth = self.tweet_depths[candidate] + 1
+                        parent_ts = self.tweet_times[candidate]
+                        ts = parent_ts + self.rng.random() * (now - parent_ts)
+                rows.append(
+                    Tweet(
+                        author_id=user_id,
+                        content=self.tweet_content(n, index),
+                        parent_tweet_id=parent,
+                        timestamp=datetime.fromtimestamp(ts, tz=dt_timezone.utc),
+                        fanned_out=True,
+                    )
+                )
+                depths.append(depth)
+            if len(rows) >= tweet_batch:
+                flush(index + 1)
+        if rows:
+            flush(len(self.user_ids))
+        self.totals["tweets"] = len(self.tweet_ids)
+        self.totals["replies"] = sum(1 for depth in self.tweet_depths if depth)
+
+    def tweet_content(self, n, index):
+        content = f"Tweet {n} from {self.prefix}{index}"
+        if self.cum_hashtags and self.rng.random() < self.hashtag_rate:
+            point = self.rng.random() * self.cum_hashtags[-1]
+            content += f" #topic{bisect(self.cum_hashtags, point)}"
+        if self.rng.random() < self.mention_rate:
+            content += f" @{self.prefix}{self.pick_user()}"
+        return content
+
+    def create_engagement(self):
+        if not self.tweet_ids:
+            return
+        batches = {
+            TweetLike: [],
+            TweetRetweet: [],
+            TweetComment: [],
+        }
+        totals = dict.fromkeys(batches, 0)
+        for user_id in self.user_ids:
+            batches[TweetLike] += [
+                TweetLike(user_id=user_id, tweet_id=tweet)
+                for tweet in self._sample_tweets(self.likes_per_user)
+            ]
+            batches[TweetRetweet] += [
+                TweetRetweet(user_id=user_id, tweet_id=tweet)
+                for tweet in self._sample_tweets(self.retweets_per_user)
+            ]
+            batches[TweetComment] += [
+                TweetComment(author_id=user_id, tweet_id=tweet, content="Nice tweet!")
+                for tweet in self._sample_tweets(self.comments_per_user, distinct=False)
+            ]
+            for model, rows in batches.items():
+                if len(rows) >= self.batch_size:
+                    totals[model] += self._flush(model, rows, model.__name__)
+        for model, rows in batches.items():
+            totals[model] += self._flush(model, rows, model.__name__)
+        self.totals["likes"] = totals[TweetLike]
+        self.totals["retweets"] = totals[TweetRetweet]
+        self.totals["comments"] = totals[TweetComment]
+
+    def _sample_tweets(self, mean, distinct=True):
+        picks = (self.pick_tweet() for _ in range(self.rng.randint(0, mean * 2)))
+        ids = [self.tweet_ids[i] for i in picks if i is not None]
+        return set(ids) if distinct else ids
+
+    def _flush(self, model, rows, label):
+        model.objects.bulk_create(rows)
+        count = len(rows)
+        rows.clear()
+        self.log(f"{label}: +{count}")
+        return count
+
+    def fill_timelines(self):
+        """
+        Materializa as ``timeline_length`` entradas mais recentes de cada
+        usuário, com a mesma regra de ``tweets.timeline.fan_out``.
+        """
+        self.log("Materializando timelines...")
+        limit = settings.TIMELINE_FANOUT_MAX_FOLLOWERS
+        users = User._meta.db_table
+        sql = f"""
+            INSERT INTO {TimelineEntry._meta.db_table} (owner_id, tweet_id, timestamp)
+            SELECT u.id, recent.id, recent.timestamp
+            FROM {users} u
+            CROSS JOIN LATERAL (
+                SELECT t.id, t.timestamp
+                FROM (
+                    SELECT f.following_user_id AS id
+                    FROM {UserFollowing._meta.db_table} f
+                    JOIN {users} a ON a.id = f.following_user_id
+                    WHERE f.user_id = u.id AND a.followers_count <= %s
+                    UNION ALL
+                    SELECT u.id
+                ) author
+                -- Os N mais recentes de cada autor, via tweet_author_recent_idx
+                CROSS JOIN LATERAL (
+                    SELECT id, timestamp
+                    FROM {Tweet._meta.db_table}
+                    WHERE author_id = author.id
+                    ORDER BY timestamp DESC, id DESC
+                    LIMIT %s
+                ) t
+                ORDER BY t.timestamp DESC, t.id DESC
+                LIMIT %s
+            ) recent
+            WHERE u.id >= %s AND u.id < %s
+            ON CONFLICT DO NOTHING
+        """  # nosec B608 - só nomes de tabela são interpolados
+        step = max(self.batch_size // max(self.timeline_length, 1), 1)
+        for start in range(self.user_ids[0], self.user_ids[-1] + 1, step):
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    sql,
+                    [
+                        limit,
+                        self.timeline_length,
+                        self.timeline_length,
+                        start,
+                        start + step,
+                    ],
+                )
+        celebrities = list(
+            User.objects.filter(
+                id__gte=self.user_ids[0],
+                id__lte=self.user_ids[-1],
+                followers_count__gt=limit,
+            ).values_list("id", flat=True)
+        )
+        if celebrities:
+            Tweet.objects.filter(
+                id__gte=min(self.tweet_ids),
+                id__lte=max(self.tweet_ids),
+                author_id__in=celebrities,
+            ).update(fanned_out=False)
+
+
+def seed_social_graph(**options):
+    """
+    Popula usuários, follows, tweets, likes, retweets e comentários.
+
+    Retorna os totais criados e os ids de usuários e tweets.
+    """
+    generator = SocialGraphGenerator(**options)
+    totals = generator.run()
+    return {
+        **totals,
+        "user_ids": list(generator.user_ids),
+        "tweet_ids": list(generator.tweet_ids),
+    }
@@ -43,23 +43,29 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "cloudinary",
     "cloudinary_storage",
     "django_extensions",
     "rest_framework",
     "users",
     "tweets",
+    "jobs",
+    "trends",
     "rest_framework.authtoken",
     "rest_framework_simplejwt",
     "corsheaders",
 ]
 
 MIDDLEWARE = [
+    # Primeiro: a latência medida inclui os demais middlewares
+    "twitter.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "twitter.middleware.ETagMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
@@ -67,7 +73,15 @@ MIDDLEWARE = [
     "twitter.middleware.ErrorHandlingMiddleware",
 ]
 
-ROOT_URLCONF = "twitter.urls"
+# GET /metrics/ (twitter.metrics) exige "Authorization: Bearer <token>"; sem
+# token, a rota só responde com DEBUG
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# Sob ASGI (twitter/asgi.py) as leituras mais frequentes usam views
+# assíncronas com o ORM assíncrono; sob WSGI, as views do DRF
+ASYNC_READ_VIEWS = os.environ.get("ASYNC_READ_VIEWS", "false").lower() == "true"
+
+ROOT_URLCONF = "twitter.urls_async" if ASYNC_READ_VIEWS else "twitter.urls"
 
 TEMPLATES = [
     {
@@ -95,7 +109,10 @@ if IS_RENDER:
 
     DATABASES = {
         "default": dj_database_url.config(
-            default=os.environ.get("DATABASE_URL"), conn_max_age=600
+            default=os.environ.get("DATABASE_URL"),
+            # Conexões persistentes não são reaproveitadas sob ASGI (cada
+            # requisição roda em outra thread)
+            conn_max_age=0 if ASYNC_READ_VIEWS else 600,
         )
     }
 else:
@@ -244,20 +261,30 @@ INTERNAL_IPS = ["127.0.0.1"]
 
 # Django REST Framework
 REST_FRAMEWORK = {
+    # Sem BasicAuthentication: ela calcula o hash PBKDF2 da senha a cada
+    # requisição. O JWT (primeiro: falhas respondem 401) lê o usuário de
+    # users.auth_cache
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.BasicAuthentication",
+        "users.authentication.CachedJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
     ],
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "twitter.renderers.FastJSONRenderer",
         "twitter.renderers.SafeBrowsableAPIRenderer",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
+    # Token buckets por escopo (THROTTLE_RATES)
+    "DEFAULT_THROTTLE_CLASSES": [
+        "twitter.throttling.UserTokenBucketThrottle",
+        "twitter.throttling.IPTokenBucketThrottle",
+    ],
+    # Proxies confiáveis na frente da aplicação (o Render tem um): o IP do
+    # cliente vem do X-Forwarded-For depois deles
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", 0)),
 }
 
 # Simple JWT
@@ -269,6 +296,147 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# Timeline materializada (fan-out on write)
+# Número máximo de tweets guardados por timeline
+TIMELINE_MAX_LENGTH = int(os.environ.get("TIMELINE_MAX_LENGTH", 800))
+# Acima deste número de seguidores os tweets são mesclados na leitura
+TIMELINE_FANOUT_MAX_FOLLOWERS = int(
+    os.environ.get("TIMELINE_FANOUT_MAX_FOLLOWERS", 10000)
+)
+
+# Contadores de engajamento (likes/retweets/replies) com escrita em lote
+ENGAGEMENT_BUFFER_ENABLED = (
+    os.environ.get("ENGAGEMENT_BUFFER_ENABLED", "true").lower() == "true"
+)
+# Intervalo (segundos) do flush periódico; 0 desativa a thread de flush
+ENGAGEMENT_FLUSH_INTERVAL = float(os.environ.get("ENGAGEMENT_FLUSH_INTERVAL", 2))
+# Flush imediato quando o buffer atinge este número de tweets
+ENGAGEMENT_BUFFER_MAX_TWEETS = 5000
+ENGAGEMENT_FLUSH_BATCH_SIZE = 500
+# Segundos após os quais um recount iniciado e não terminado (processo morto)
+# deixa de valer como em andamento
+ENGAGEMENT_RECOUNT_TIMEOUT = 3600
+
+# Cache: memória local do processo por padrão. Para compartilhar entre
+# workers, defina CACHE_URL (redis://... requer o pacote redis;
+# memcached://host:porta requer pymemcache)
+CACHE_URL = os.environ.get("CACHE_URL", "")
+if CACHE_URL.startswith(("redis://", "rediss://")):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        }
+    }
+elif CACHE_URL.startswith("memcached://"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+            "LOCATION": CACHE_URL.removeprefix("memcached://"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+    }
+
+# Perfis em cache (retrieve, me e stats), em segundos
+PROFILE_CACHE_TIMEOUT = int(os.environ.get("PROFILE_CACHE_TIMEOUT", 300))
+# Usuário autenticado por JWT em cache (users.auth_cache), em segundos
+AUTH_CACHE_TIMEOUT = int(os.environ.get("AUTH_CACHE_TIMEOUT", 60))
+# Tempo máximo que uma requisição espera outra calcular o mesmo perfil
+PROFILE_CACHE_LOCK_TIMEOUT = 5
+PROFILE_CACHE_LOCK_POLL = 0.05
+
+# Eventos em tempo real (SSE em /api/tweets/stream/, só sob ASGI). O broker
+# local entrega apenas no próprio processo; com Redis em CACHE_URL os eventos
+# chegam aos assinantes de todos os workers
+if CACHE_URL.startswith(("redis://", "rediss://")):
+    PUBSUB_BROKER = "twitter.pubsub.RedisBroker"
+else:
+    PUBSUB_BROKER = "twitter.pubsub.LocalBroker"
+PUBSUB_URL = CACHE_URL
+
+# Limites de requisições (twitter.throttling): "N/período" por usuário e/ou
+# por IP, por escopo das views. Com CACHE_URL os baldes são compartilhados
+# entre os workers; sem ele, ficam em memória por processo
+THROTTLE_RATES = {
+    # Login, cadastro e troca de senha calculam o hash da senha
+    "login": {"ip": "10/min"},
+    "register": {"ip": "10/hour"},
+    "password": {"user": "5/min", "ip": "10/min"},
+    "tweet": {"user": "30/min"},
+    "engagement": {"user": "120/min"},
+    "comment": {"user": "30/min"},
+    "follow": {"user": "60/min"},
+}
+if CACHE_URL:
+    THROTTLE_STORE = "twitter.throttling.CacheStore"
+else:
+    THROTTLE_STORE = "twitter.throttling.LocalStore"
+# Baldes guardados por processo no LocalStore
+THROTTLE_MAX_KEYS = 100_000
+# Mensagens pendentes por conexão antes de descartar e enviar "reset"
+PUBSUB_QUEUE_SIZE = 100
+# Segundos entre keepalives, reconexão do cliente (ms) e tweets com contadores
+# acompanhados por stream (além deles, saem os mais antigos)
+LIVE_KEEPALIVE = 15
+LIVE_RETRY_MS = 5000
+LIVE_MAX_TWEETS = 200
+
+# Registros lidos por ida ao banco na exportação do arquivo do usuário
+ARCHIVE_CHUNK_SIZE = 2000
+
+# Sugestões de quem seguir (users.suggestions): tamanho do ranking em cache,
+# contas seguidas consideradas e validade (s) do cache
+SUGGESTIONS_MAX = 50
+SUGGESTIONS_MAX_FRIENDS = 200
+SUGGESTIONS_CACHE_TIMEOUT = 3600
+
+# POST /api/batch/ (twitter.batch): itens por requisição e threads para as
+# leituras consecutivas
+BATCH_MAX_REQUESTS = 20
+BATCH_MAX_WORKERS = int(os.environ.get("BATCH_MAX_WORKERS", 4))
+
+# Busca: quantos dos tweets mais recentes que casam com a consulta são
+# ordenados por relevância (custo de termos muito comuns)
+SEARCH_MAX_CANDIDATES = 1000
+
+# Conversas (tweets.threads): limites de profundidade, de respostas por tweet
+# (os parâmetros depth e replies só podem reduzi-los), de ancestrais e de
+# tweets carregados por requisição
+THREAD_MAX_DEPTH = 8
+THREAD_MAX_REPLIES = 10
+THREAD_MAX_ANCESTORS = 50
+THREAD_MAX_TWEETS = 500
+
+# Assuntos do momento (trends.counters): contagens por hashtag em intervalos
+# de TRENDS_BUCKET_SECONDS, numa janela de TRENDS_BUCKETS intervalos (24h)
+TRENDS_BUCKET_SECONDS = 900
+TRENDS_BUCKETS = 96
+# Idade (s) em que uma contagem passa a valer a metade
+TRENDS_HALF_LIFE = 2 * 3600
+TRENDS_TOP_K = 20
+# Intervalo (s) entre os recálculos do ranking pelo worker
+TRENDS_REFRESH_INTERVAL = int(os.environ.get("TRENDS_REFRESH_INTERVAL", 60))
+
+# Fila de tarefas no banco (jobs.queue), executada por ``manage.py run_jobs``.
+# Sem worker (ex.: um único serviço), JOBS_EAGER=true executa as tarefas na
+# própria requisição
+JOBS_EAGER = os.environ.get("JOBS_EAGER", "false").lower() == "true"
+JOBS_MAX_ATTEMPTS = 3
+# Espera (s) antes da 2ª tentativa; dobra a cada nova falha
+JOBS_RETRY_DELAY = 10
+# Em execução há mais tempo (s): worker encerrado, a tarefa volta para a fila
+JOBS_TIMEOUT = 600
+# Espera máxima (s) do worker ocioso por um NOTIFY antes de consultar a fila
+JOBS_POLL_INTERVAL = 5
+# Tarefas concluídas são apagadas depois deste tempo (s)
+JOBS_RETENTION = 7 * 24 * 3600
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 AUTH_USER_MODEL = "users.User"
 
@@ -0,0 +1,489 @@
+import base64
+import json
+import os
+import time
+from collections import namedtuple
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.models import Count
+from django.test import RequestFactory, TestCase, override_settings, tag
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import BasicAuthentication
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from tweets import engagement
+from tweets.models import Tweet
+from tweets.serializers import TweetSerializer, serialize_tweet_rows, tweet_rows
+from users.authentication import CachedJWTAuthentication
+from users.models import User
+
+from .seeding import SEED_PASSWORD, seed_social_graph
+
+# Limites por endpoint: consultas SQL, tempo (ms) e tamanho da resposta (bytes)
+Budget = namedtuple("Budget", ["queries", "ms", "bytes"])
+
+# Limites de tempo (``ms`` e speedups) só com PERF_TIMINGS=1: sob coverage ou
+# em runners compartilhados (CI) o relógio não é confiável
+TIMINGS = os.environ.get("PERF_TIMINGS") == "1"
+
+# Ordem importa: ações de escrita dependem das anteriores (ex.: like -> unlike)
+ENDPOINTS = [
+    ("tweets-list", "get", "/api/tweets/", None, Budget(3, 300, 24_000)),
+    (
+        "tweets-create",
+        "post",
+        "/api/tweets/",
+        {"content": "bench"},
+        Budget(6, 300, 2_000),
+    ),
+    ("tweets-detail", "get", "/api/tweets/{tweet}/", None, Budget(2, 200, 2_000)),
+    (
+        "tweets-update",
+        "put",
+        "/api/tweets/{own_tweet}/",
+        {"content": "edited"},
+        Budget(3, 200, 2_000),
+    ),
+    (
+        "tweets-partial-update",
+        "patch",
+        "/api/tweets/{own_tweet}/",
+        {"location": "Recife"},
+        Budget(3, 200, 2_000),
+    ),
+    ("tweets-feed", "get", "/api/tweets/feed/", None, Budget(3, 300, 24_000)),
+    (
+        "tweets-thread",
+        "get",
+        "/api/tweets/{thread}/thread/",
+        None,
+        Budget(2, 300, 60_000),
+    ),
+    (
+        "tweets-search",
+        "get",
+        "/api/tweets/search/",
+        {"q": "from {me_username}"},
+        Budget(2, 300, 24_000),
+    ),
+    (
+        "tweets-tag",
+        "get",
+        "/api/tweets/tags/topic0/",
+        None,
+        Budget(2, 300, 24_000),
+    ),
+    ("trends", "get", "/api/trends/", None, Budget(1, 200, 5_000)),
+    ("tweets-like", "post", "/api/tweets/{tweet}/like/", None, Budget(6, 200, 500)),
+    (
+        "tweets-unlike",
+        "delete",
+        "/api/tweets/{tweet}/unlike/",
+        None,
+        Budget(4, 200, 500),
+    ),
+    (
+        "tweets-retweet",
+        "post",
+        "/api/tweets/{tweet}/retweet/",
+        None,
+        Budget(6, 200, 500),
+    ),
+    (
+        "tweets-unretweet",
+        "delete",
+        "/api/tweets/{tweet}/unretweet/",
+        None,
+        Budget(4, 200, 500),
+    ),
+    (
+        "tweets-comment",
+        "post",
+        "/api/tweets/{tweet}/comment/",
+        {"content": "hi"},
+        Budget(3, 200, 1_000),
+    ),
+    (
+        "tweets-comments",
+        "get",
+        "/api/tweets/{tweet}/comments/",
+        None,
+        Budget(2, 300, 24_000),
+    ),
+    (
+        "tweets-destroy",
+        "delete",
+        "/api/tweets/{own_tweet}/",
+        None,
+        Budget(12, 300, 500),
+    ),
+    ("users-list", "get", "/api/users/", None, Budget(4, 300, 24_000)),
+    (
+        "users-create",
+        "post",
+        "/api/users/",
+        {"username": "bench_new", "email": "bench_new@example.com"},
+        Budget(4, 300, 1_000),
+    ),
+    ("users-detail", "get", "/api/users/{user}/", None, Budget(2, 200, 1_000)),
+    (
+        "users-partial-update",
+        "patch",
+        "/api/users/{me}/",
+        {"bio": "Benchmarking"},
+        Budget(3, 200, 1_000),
+    ),
+    (
+        "users-update-profile",
+        "patch",
+        "/api/users/update_profile/",
+        {"first_name": "Bench"},
+        Budget(3, 200, 1_000),
+    ),
+    ("users-me", "get", "/api/users/me/", None, Budget(1, 200, 1_000)),
+    ("users-stats", "get", "/api/users/{user}/stats/", None, Budget(1, 200, 500)),
+    ("users-tweets", "get", "/api/users/{user}/tweets/", None, Budget(3, 300, 24_000)),
+    (
+        "users-mentions",
+        "get",
+        "/api/users/{user}/mentions/",
+        None,
+        Budget(3, 300, 24_000),
+    ),
+    ("users-follow", "post", "/api/users/{other}/follow/", None, Budget(12, 300, 500)),
+    (
+        "users-unfollow",
+        "delete",
+        "/api/users/{other}/unfollow/",
+        None,
+        Budget(8, 300, 500),
+    ),
+    (
+        "users-archive",
+        "get",
+        "/api/users/{me}/archive/",
+        None,
+        Budget(8, 500, 200_000),
+    ),
+    ("users-following", "get", "/api/users/following/", None, Budget(2, 300, 24_000)),
+    ("users-followers", "get", "/api/users/followers/", None, Budget(2, 300, 24_000)),
+    (
+        "users-suggestions",
+        "get",
+        "/api/users/suggestions/",
+        None,
+        Budget(5, 300, 10_000),
+    ),
+    (
+        "users-register",
+        "post",
+        "/api/users/register/",
+        {
+            "username": "bench_reg",
+            "email": "bench_reg@example.com",
+            "password": "Bench-pass-123",
+        },
+        Budget(8, 3_000, 2_000),
+    ),
+    (
+        "users-login",
+        "post",
+        "/api/users/login/",
+        {"username": "{me_username}", "password": SEED_PASSWORD},
+        Budget(4, 3_000, 2_000),
+    ),
+    (
+        "users-token-refresh",
+        "post",
+        "/api/users/token/refresh/",
+        {"refresh": "{refresh}"},
+        Budget(1, 200, 1_000),
+    ),
+    (
+        "users-change-password",
+        "post",
+        "/api/users/change_password/",
+        {"old_password": SEED_PASSWORD, "new_password": "Bench-pass-456"},
+        Budget(3, 3_000, 500),
+    ),
+    (
+        "users-destroy",
+        "delete",
+        "/api/users/{created_user}/",
+        None,
+        Budget(20, 500, 500),
+    ),
+]
+
+
+def read_content(response):
+    """Corpo da resposta; respostas em streaming são consumidas por inteiro."""
+    if response.streaming:
+        return b"".join(response.streaming_content)
+    return response.content
+
+
+@override_settings(ENGAGEMENT_BUFFER_ENABLED=True, ENGAGEMENT_FLUSH_INTERVAL=0)
+class SeededAPITestCase(TestCase):
+    """Cliente autenticado sobre um grafo social semeado."""
+
+    @classmethod
+    def setUpTestData(cls):
+        graph = seed_social_graph(users=2000, follows_per_user=10, tweets_per_user=2)
+        # Em produção o autovacuum mantém as estatísticas; sem elas o planner
+        # escolhe planos para tabelas vazias
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        # Usuário que segue mais contas: feed mais caro
+        cls.me = User.objects.order_by("-following_count", "id").first()
+        # Conta mais seguida: perfil e listas mais caros
+        cls.celebrity = User.objects.get(id=graph["user_ids"][0])
+        cls.other = (
+            User.objects.exclude(followers__user=cls.me)
+            .exclude(id=cls.me.id)
+            .order_by("-followers_count")
+            .first()
+        )
+        # Tweet com mais engajamento que o usuário ainda não curtiu
+        cls.tweet = (
+            Tweet.objects.exclude(likes_tweet__user=cls.me)
+            .exclude(retweets_tweet__user=cls.me)
+            .order_by("-likes")
+            .first()
+        )
+        # Conversa com mais respostas diretas
+        cls.thread = (
+            Tweet.objects.filter(parent_tweet__isnull=True)
+            .annotate(thread_replies=Count("replies_tweet"))
+            .order_by("-thread_replies", "id")
+            .first()
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.refresh = RefreshToken.for_user(self.me)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {self.refresh.access_token}"
+        )
+        self.addCleanup(engagement.flush)
+
+    def placeholders(self):
+        values = {
+            "tweet": self.tweet.id,
+            "thread": self.thread.id,
+            "user": self.celebrity.id,
+            "me": self.me.id,
+            "me_username": self.me.username,
+            "other": self.other.id,
+            "refresh": str(self.refresh),
+        }
+        own = Tweet.objects.filter(author=self.me).order_by("-id").first()
+        if own is not None:
+            values["own_tweet"] = own.id
+        created = User.objects.filter(username="bench_new").first()
+        if created is not None:
+            values["created_user"] = created.id
+        return values
+
+    def resolve(self, path, data):
+        values = self.placeholders()
+        path = path.format(**values)
+        if data is not None:
+            data = {key: str(value).format(**values) for key, value in data.items()}
+        return path, data
+
+
+@tag("performance")
+class EndpointBudgetTest(SeededAPITestCase):
+    """
+    Mede consultas SQL, tempo e tamanho da resposta de cada rota da API
+    sobre um grafo social semeado, e falha quando um limite é excedido.
+
+    Defina ``PERF_REPORT=<arquivo>.json`` para salvar as medições.
+    """
+
+    def measure(self, method, path, data):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = getattr(self.client, method)(path, data)
+            content = read_content(response)
+            elapsed = (time.perf_counter() - start) * 1000
+        return response, len(queries), elapsed, len(content)
+
+    def test_endpoint_budgets(self):
+        report, failures = [], []
+        for name, method, path, data, budget in ENDPOINTS:
+            path, data = self.resolve(path, data)
+            response, queries, ms, size = self.measure(method, path, data)
+            report.append(
+                {
+                    "endpoint": name,
+                    "status": response.status_code,
+                    "queries": queries,
+                    "ms": round(ms, 2),
+                    "bytes": size,
+                }
+            )
+            if response.status_code >= 400:
+                failures.append(f"{name}: HTTP {response.status_code}")
+            metrics = [("queries", queries), ("bytes", size)]
+            if TIMINGS:
+                metrics.append(("ms", ms))
+            for metric, value in metrics:
+                limit = getattr(budget, metric)
+                if value > limit:
+                    failures.append(f"{name}: {metric} {value:.0f} > {limit}")
+
+        if self.report_path:
+            with open(self.report_path, "w") as report_file:
+                json.dump(report, report_file, indent=2)
+        self.assertFalse(failures, "\n".join(failures))
+
+    @property
+    def report_path(self):
+        return os.environ.get("PERF_REPORT")
+
+
+@tag("performance")
+@override_settings(ROOT_URLCONF="twitter.urls_async")
+class AsyncEndpointBudgetTest(EndpointBudgetTest):
+    """Os mesmos limites com as views de leitura assíncronas (ASGI)."""
+
+    @property
+    def report_path(self):
+        path = os.environ.get("PERF_REPORT")
+        if path:
+            root, ext = os.path.splitext(path)
+            return f"{root}-async{ext}"
+        return None
+
+
+@tag("performance")
+class SerializationBenchmarkTest(TestCase):
+    """
+    Compara ``TweetSerializer(many=True)`` com o caminho rápido por
+    ``values()`` (consulta + serialização + JSON) em uma página de 10k tweets.
+    """
+
+    TWEETS = 10_000
+    MIN_SPEEDUP = 1.5
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_social_graph(
+            users=1000,
+            follows_per_user=5,
+            tweets_per_user=cls.TWEETS // 1000,
+            likes_per_user=0,
+            retweets_per_user=0,
+            comments_per_user=0,
+        )
+        ids = list(Tweet.objects.values_list("id", flat=True))
+        Tweet.objects.filter(id__in=ids[::10]).update(
+            image="tweet_images/photo.jpg", location="Recife"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def best_of(self, runs, function):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            output = function()
+            timings.append(time.perf_counter() - start)
+        return min(timings), output
+
+    def queryset(self):
+        queryset = Tweet.objects.select_related("author").order_by("-timestamp", "-id")
+        return queryset[: self.TWEETS]
+
+    def serializer(self):
+        queryset = self.queryset()
+        return JSONRenderer().render(TweetSerializer(queryset, many=True).data)
+
+    def rows(self):
+        return JSONRenderer().render(serialize_tweet_rows(tweet_rows(self.queryset())))
+
+    def test_rows_path_matches_serializer(self):
+        self.assertEqual(self.rows(), self.serializer())
+
+    @skipUnless(TIMINGS, "medição de tempo: defina PERF_TIMINGS=1")
+    def test_rows_path_throughput(self):
+        slow, expected = self.best_of(3, self.serializer)
+        fast, output = self.best_of(3, self.rows)
+        self.assertEqual(output, expected)
+
+        count = len(json.loads(output))
+        speedup = slow / fast
+        message = (
+            f"{count} tweets: TweetSerializer {count / slow:,.0f}/s, "
+            f"values() {count / fast:,.0f}/s ({speedup:.1f}x)"
+        )
+        if os.environ.get("PERF_REPORT"):
+            print(message)
+        self.assertGreaterEqual(speedup, self.MIN_SPEEDUP, message)
+
+
+@tag("performance")
+class AuthBenchmarkTest(TestCase):
+    """
+    Custo da autenticação por requisição: ``JWTAuthentication`` (busca do
+    usuário no banco) contra ``CachedJWTAuthentication`` (``users.auth_cache``),
+    e ``BasicAuthentication`` (hash PBKDF2 da senha) como referência.
+    """
+
+    REQUESTS = 500
+    MIN_SPEEDUP = 1.5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="bench", email="bench@example.com", password=SEED_PASSWORD
+        )
+
+    def per_request(self, authenticator, request, runs):
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            for _ in range(runs):
+                user, _ = authenticator.authenticate(request)
+            timings.append(time.perf_counter() - start)
+        self.assertEqual(user.pk, self.user.pk)
+        return min(timings) / runs
+
+    def jwt_request(self):
+        token = RefreshToken.for_user(self.user).access_token
+        return Request(RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}"))
+
+    def test_cached_auth_skips_database(self):
+        jwt = self.jwt_request()
+        CachedJWTAuthentication().authenticate(jwt)
+        with self.assertNumQueries(0):
+            user, _ = CachedJWTAuthentication().authenticate(jwt)
+        self.assertEqual(user.pk, self.user.pk)
+
+    @skipUnless(TIMINGS, "medição de tempo: defina PERF_TIMINGS=1")
+    def test_auth_overhead(self):
+        jwt = self.jwt_request()
+        credentials = base64.b64encode(f"bench:{SEED_PASSWORD}".encode()).decode()
+        basic = Request(
+            RequestFactory().get("/", HTTP_AUTHORIZATION=f"Basic {credentials}")
+        )
+
+        uncached = self.per_request(JWTAuthentication(), jwt, self.REQUESTS)
+        cached = self.per_request(CachedJWTAuthentication(), jwt, self.REQUESTS)
+        hashed = self.per_request(BasicAuthentication(), basic, 3)
+        speedup = uncached / cached
+        message = (
+            f"auth per request: JWT {uncached * 1e6:,.0f}µs, "
+            f"cached JWT {cached * 1e6:,.0f}µs ({speedup:.1f}x), "
+            f"Basic {hashed * 1e6:,.0f}µs"
+        )
+        if os.environ.get("PERF_REPORT"):
+            print(message)
+        self.assertGreaterEqual(speedup, self.MIN_SPEEDUP, message)
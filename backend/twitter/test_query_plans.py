@@ -0,0 +1,118 @@
+import json
+
+from django.db import connection
+from django.test import override_settings, tag
+from django.test.utils import CaptureQueriesContext
+
+from tweets.models import (
+    TimelineEntry,
+    Tweet,
+    TweetComment,
+    TweetHashtag,
+    TweetLike,
+    TweetMention,
+    TweetRetweet,
+)
+from users.models import User, UserFollowing
+
+from .test_performance import ENDPOINTS, SeededAPITestCase, read_content
+
+# Tabelas que crescem com o uso: nunca devem ser lidas por inteiro
+LARGE_TABLES = {
+    model._meta.db_table
+    for model in (
+        User,
+        UserFollowing,
+        Tweet,
+        TimelineEntry,
+        TweetLike,
+        TweetRetweet,
+        TweetComment,
+        TweetHashtag,
+        TweetMention,
+    )
+}
+# Ordenar mais linhas que isso em memória indica um índice faltando
+MAX_SORT_ROWS = 1000
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+
+def plan_problems(node):
+    """Leituras completas e Sorts grandes em um plan de ``EXPLAIN (FORMAT JSON)``."""
+    problems = []
+    relation = node.get("Relation Name")
+    if node["Node Type"] == "Seq Scan" and relation in LARGE_TABLES:
+        problems.append(f"Seq Scan on {relation}")
+    # Índice percorrido do início ao fim, filtrando linha a linha
+    if "Index Scan" in node["Node Type"] and relation in LARGE_TABLES:
+        if "Filter" in node and "Index Cond" not in node:
+            problems.append(f"Filtered full {node['Node Type']} on {relation}")
+    if node["Node Type"] == "Sort" and node["Plan Rows"] > MAX_SORT_ROWS:
+        keys = ", ".join(node.get("Sort Key", []))
+        problems.append(f"Sort of {node['Plan Rows']} rows by {keys}")
+    for child in node.get("Plans", []):
+        problems += plan_problems(child)
+    return problems
+
+
+@tag("performance")
+class QueryPlanTest(SeededAPITestCase):
+    """
+    Roda ``EXPLAIN`` em cada SQL emitido pelas rotas da API (e pela segunda
+    página das listagens) e falha em Seq Scan ou Sort grande sobre as tabelas
+    que crescem com o uso.
+
+    O planner roda com ``enable_seqscan = off``: assim ele só escolhe Seq Scan
+    quando nenhum índice atende o filtro, independentemente do tamanho do
+    banco semeado.
+    """
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off")
+            try:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+                plan = cursor.fetchone()[0]
+            finally:
+                cursor.execute("RESET enable_seqscan")
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]["Plan"]
+
+    def request(self, name, method, path, data):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(path, data)
+            read_content(response)
+        self.assertLess(response.status_code, 400, name)
+        statements = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].lstrip().upper().startswith(EXPLAINABLE)
+        ]
+        return response, statements
+
+    def test_query_plans(self):
+        failures = []
+        for name, method, path, data, _ in ENDPOINTS:
+            path, data = self.resolve(path, data)
+            response, statements = self.request(name, method, path, data)
+            if method == "get" and isinstance(getattr(response, "data", None), dict):
+                next_page = response.data.get("next")
+            else:
+                next_page = None
+            if next_page:
+                _, more = self.request(name, "get", next_page, None)
+                statements += more
+
+            for sql in statements:
+                failures += [
+                    f"{name}: {problem}\n    {sql}"
+                    for problem in plan_problems(self.explain(sql))
+                ]
+        self.assertFalse(failures, "\n".join(failures))
+
+
+@tag("performance")
+@override_settings(ROOT_URLCONF="twitter.urls_async")
+class AsyncQueryPlanTest(QueryPlanTest):
+    """Os mesmos planos com as views de leitura assíncronas (ASGI)."""
@@ -0,0 +1,394 @@
+import asyncio
+import threading
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+from asgiref.sync import iscoroutinefunction
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from tweets import timeline
+from tweets.models import Tweet
+from users.models import User
+
+from . import batch, metrics, pubsub, throttling
+from .renderers import FastJSONRenderer, SafeBrowsableAPIRenderer
+
+
+class FastJSONRendererTest(TestCase):
+    def test_output_matches_drf_renderer(self):
+        data = {
+            "id": 1,
+            "content": "olá   <b>",
+            "timestamp": datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=dt_timezone.utc),
+            "lazy": gettext_lazy("Not found."),
+            "amount": Decimal("1.50"),
+            "nested": [{"a": None, "b": True}],
+            "huge": 2**70,
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_browsable_renderer_escapes_html(self):
+        html = SafeBrowsableAPIRenderer().render({"content": "<script>x</script>"})
+        self.assertIn(b"&lt;script&gt;", html)
+        self.assertNotIn(b"<script>", html)
+
+
+class ETagMiddlewareTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="TestUser", email="testuser@example.com", password="password123"
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+    def test_unchanged_response_is_not_modified(self):
+        response = self.client.get("/api/users/me/")
+        etag = response.headers["ETag"]
+        self.assertFalse(etag.startswith("W/"))
+        self.assertIn("Authorization", response.headers["Vary"])
+
+        cached = self.client.get("/api/users/me/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b"")
+
+        Tweet.objects.create(author=self.user, content="hello")
+        changed = self.client.get("/api/users/me/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers["ETag"], etag)
+
+    def test_writes_are_not_conditional(self):
+        response = self.client.post("/api/tweets/", {"content": "hello"})
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.has_header("ETag"))
+
+
+@override_settings(METRICS_TOKEN="secret")
+class MetricsTest(TestCase):
+    def setUp(self):
+        metrics.registry.clear()
+        self.user = User.objects.create_user(username="alice", email="a@example.com")
+        self.tweet = Tweet.objects.create(author=self.user, content="hello")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def scrape(self):
+        response = self.client.get("/metrics/", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        samples = {}
+        for line in response.content.decode().splitlines():
+            if not line.startswith("#"):
+                name, value = line.rsplit(" ", 1)
+                samples[name] = float(value)
+        return samples
+
+    def test_requests_are_recorded_per_action(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/api/tweets/")
+        # Antes das próximas requisições, que limpam ``connection.queries``
+        num_queries = len(queries.captured_queries)
+        self.client.post(f"/api/tweets/{self.tweet.pk}/like/")
+        self.client.post(f"/api/tweets/{self.tweet.pk}/like/")
+        self.client.get("/api/missing/")
+
+        samples = self.scrape()
+        view = 'view="TweetViewSet.list",method="GET"'
+        self.assertEqual(
+            samples[f'twitter_http_requests_total{{{view},status="200"}}'], 1
+        )
+        self.assertEqual(
+            samples[f"twitter_http_request_queries_sum{{{view}}}"],
+            num_queries,
+        )
+        self.assertEqual(
+            samples[
+                f'twitter_http_request_duration_seconds_bucket{{{view},le="+Inf"}}'
+            ],
+            1,
+        )
+        self.assertGreater(
+            samples[f"twitter_http_request_db_seconds_total{{{view}}}"], 0
+        )
+        self.assertGreater(
+            samples[f"twitter_http_response_size_bytes_sum{{{view}}}"], 0
+        )
+        like = 'view="TweetViewSet.like",method="POST",status="200"'
+        self.assertEqual(samples[f"twitter_http_requests_total{{{like}}}"], 2)
+        missing = 'view="unmatched",method="GET",status="404"'
+        self.assertEqual(samples[f"twitter_http_requests_total{{{missing}}}"], 1)
+
+    @override_settings(ROOT_URLCONF="twitter.urls_async")
+    def test_async_views_count_queries(self):
+        self.client.get("/api/tweets/")
+        samples = self.scrape()
+        view = 'view="tweets.async_views.tweet_list",method="GET"'
+        self.assertGreater(samples[f"twitter_http_request_queries_sum{{{view}}}"], 0)
+
+    def test_access(self):
+        response = self.client.get("/metrics/", HTTP_AUTHORIZATION="Bearer wrong")
+        self.assertEqual(response.status_code, 401)
+        response = self.client.get("/metrics/", HTTP_AUTHORIZATION="Bearer sécret")
+        self.assertEqual(response.status_code, 401)
+        with override_settings(METRICS_TOKEN="", DEBUG=False):
+            self.assertEqual(self.client.get("/metrics/").status_code, 404)
+
+
+class AsyncReadViewsTest(TestCase):
+    """Views de ``twitter.urls_async`` (ASGI) contra as views do DRF."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="TestUser", email="testuser@example.com", password="password123"
+        )
+        self.other = User.objects.create_user(
+            username="OtherUser", email="otheruser@example.com", password="password123"
+        )
+        self.user.following.create(following_user=self.other)
+        self.other.following.create(following_user=self.user)
+        self.tweet = Tweet.objects.create(author=self.other, content="hello")
+        timeline.fan_out(self.tweet)
+        self.tweet.comments.create(author=self.user, content="reply")
+        self.auth = f"Bearer {RefreshToken.for_user(self.user).access_token}"
+        self.client.credentials(HTTP_AUTHORIZATION=self.auth)
+
+    def get(self, urlconf, path):
+        cache.clear()
+        with override_settings(ROOT_URLCONF=urlconf):
+            response = self.client.get(path)
+            # Resolvida sob a mesma urlconf da requisição
+            response.view = response.resolver_match.func
+        return response
+
+    def test_output_matches_sync_views(self):
+        tweet, other = self.tweet.pk, self.other.pk
+        for path in [
+            "/api/tweets/",
+            f"/api/tweets/?count=1&max_id={tweet}",
+            "/api/tweets/?cursor=invalid",
+            "/api/tweets/feed/",
+            f"/api/tweets/{tweet}/",
+            f"/api/tweets/{tweet}/comments/",
+            "/api/tweets/999999/comments/",
+            f"/api/users/{other}/",
+            f"/api/users/{other}/stats/",
+            "/api/users/999999/",
+            "/api/users/following/",
+            "/api/users/followers/",
+        ]:
+            with self.subTest(path=path):
+                expected = self.get("twitter.urls", path)
+                response = self.get("twitter.urls_async", path)
+                self.assertTrue(iscoroutinefunction(response.view))
+                self.assertEqual(response.status_code, expected.status_code)
+                self.assertEqual(response.content, expected.content)
+
+    @override_settings(ROOT_URLCONF="twitter.urls_async")
+    def test_writes_fall_through_to_drf(self):
+        response = self.client.post("/api/tweets/", {"content": "async"})
+        self.assertEqual(response.status_code, 201)
+        response = self.client.patch(
+            f"/api/users/{self.user.pk}/", {"bio": "new"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["bio"], "new")
+
+    @override_settings(ROOT_URLCONF="twitter.urls_async")
+    async def test_concurrent_requests(self):
+        responses = await asyncio.gather(
+            *(
+                self.async_client.get(path, headers={"authorization": self.auth})
+                for path in ["/api/tweets/feed/", "/api/users/following/"] * 3
+            )
+        )
+        self.assertEqual([r.status_code for r in responses], [200] * 6)
+        self.assertEqual(responses[0].json()["results"][0]["id"], self.tweet.pk)
+
+
+class BatchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="alice", email="a@example.com")
+        self.other = User.objects.create_user(username="bob", email="b@example.com")
+        self.user.following.create(following_user=self.other)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}"
+        )
+
+    def batch(self, *requests):
+        response = self.client.post(
+            "/api/batch/", {"requests": list(requests)}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()["responses"]
+
+    def test_reads_match_separate_requests(self):
+        paths = [
+            "/api/users/me/",
+            f"/api/users/{self.user.pk}/stats/",
+            "/api/users/following/?count=1",
+            "/api/tweets/feed/",
+            "/api/users/999999/",
+        ]
+        for urlconf in ("twitter.urls", "twitter.urls_async"):
+            with self.subTest(urlconf=urlconf), override_settings(ROOT_URLCONF=urlconf):
+                responses = self.batch(*({"path": path} for path in paths))
+                for path, response in zip(paths, responses):
+                    expected = self.client.get(path)
+                    self.assertEqual(response["status"], expected.status_code, path)
+                    self.assertEqual(response["body"], expected.json(), path)
+
+    def test_writes_run_in_order(self):
+        tweet, feed = self.batch(
+            {"method": "POST", "path": "/api/tweets/", "body": {"content": "batch"}},
+            {"path": "/api/tweets/feed/"},
+        )
+        self.assertEqual(tweet["status"], 201)
+        self.assertEqual(tweet["body"]["author"]["username"], "alice")
+        self.assertEqual(feed["body"]["results"][0]["id"], tweet["body"]["id"])
+
+    def test_authentication_is_shared(self):
+        self.client.credentials()
+        (me,) = self.batch({"path": "/api/users/me/"})
+        self.assertEqual(me["status"], 401)
+
+    def test_errors(self):
+        missing, nested = self.batch(
+            {"path": "/api/missing/"},
+            {"method": "POST", "path": "/api/batch/", "body": {"requests": []}},
+        )
+        self.assertEqual(missing["status"], 404)
+        self.assertEqual(nested["status"], 400)
+        for data in (
+            {},
+            {"requests": []},
+            {"requests": [{"path": "/admin/"}]},
+            {"requests": [{"path": "/api/users/me/", "method": "TRACE"}]},
+            {"requests": [{"path": "/api/users/me/"}] * 21},
+        ):
+            response = self.client.post("/api/batch/", data, format="json")
+            self.assertEqual(response.status_code, 400, data)
+
+
+class BatchConcurrencyTest(TransactionTestCase):
+    def test_consecutive_reads_run_in_threads(self):
+        user = User.objects.create_user(username="alice", email="a@example.com")
+        client = APIClient()
+        client.force_authenticate(user)
+        threads = []
+        dispatch = batch._dispatch
+
+        def record(*args):
+            threads.append(threading.current_thread().name)
+            return dispatch(*args)
+
+        requests = [{"path": "/api/users/me/"}] * 3 + [
+            {"method": "PATCH", "path": f"/api/users/{user.pk}/", "body": {"bio": "x"}},
+            {"path": "/api/tweets/"},
+        ]
+        with patch.object(batch, "_dispatch", record):
+            response = client.post("/api/batch/", {"requests": requests}, format="json")
+        statuses = [item["status"] for item in response.json()["responses"]]
+        self.assertEqual(statuses, [200] * 5)
+        main = threading.current_thread().name
+        self.assertNotIn(main, threads[:3])
+        self.assertEqual(threads[3:], [main, main])
+
+
+class ThrottlingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="alice", email="a@example.com", password="password123"
+        )
+        self.tweet = Tweet.objects.create(author=self.user, content="hello")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_token_bucket(self):
+        capacity, refill = throttling.parse_rate("2/min")
+        self.assertEqual((capacity, refill), (2, 2 / 60))
+        state, wait = throttling.take(None, capacity, refill, 0)
+        state, wait = throttling.take(state, capacity, refill, 0)
+        self.assertEqual(wait, 0)
+        state, wait = throttling.take(state, capacity, refill, 0)
+        self.assertAlmostEqual(wait, 30)
+        # Meio token reposto em 15s; o balde não passa da capacidade
+        self.assertAlmostEqual(throttling.take(state, capacity, refill, 15)[1], 15)
+        self.assertEqual(throttling.take(state, capacity, refill, 600)[0][0], 1)
+
+    @override_settings(THROTTLE_RATES={"engagement": {"user": "2/min"}})
+    def test_user_limit_per_action(self):
+        for store in ("twitter.throttling.LocalStore", "twitter.throttling.CacheStore"):
+            with self.subTest(store=store), override_settings(THROTTLE_STORE=store):
+                like = f"/api/tweets/{self.tweet.pk}/like/"
+                self.assertEqual(self.client.post(like).status_code, 200)
+                self.assertEqual(
+                    self.client.delete(f"{like[:-5]}unlike/").status_code, 200
+                )
+                response = self.client.post(like)
+                self.assertEqual(response.status_code, 429)
+                self.assertEqual(response["Retry-After"], "30")
+                # Outras actions e outros usuários não são afetados
+                self.assertEqual(self.client.get("/api/tweets/").status_code, 200)
+                other = User.objects.create_user(
+                    username=f"bob{store[-10:]}", email="b@example.com"
+                )
+                self.client.force_authenticate(other)
+                self.assertEqual(self.client.post(like).status_code, 200)
+                self.client.force_authenticate(self.user)
+
+    @override_settings(THROTTLE_RATES={"login": {"ip": "2/min"}})
+    def test_login_limit_per_ip(self):
+        client = APIClient(REMOTE_ADDR="10.0.0.1")
+        credentials = {"username": "alice", "password": "wrong"}
+        for path in ("/api/users/login/", "/api/token/"):
+            self.assertEqual(client.post(path, credentials).status_code, 401)
+        response = client.post("/api/token/", credentials)
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+
+        client = APIClient(REMOTE_ADDR="10.0.0.2")
+        credentials["password"] = "password123"
+        self.assertEqual(client.post("/api/users/login/", credentials).status_code, 200)
+
+    @override_settings(THROTTLE_RATES={"comment": {"user": "1/min"}})
+    def test_batch_items_are_throttled(self):
+        comment = {
+            "method": "POST",
+            "path": f"/api/tweets/{self.tweet.pk}/comment/",
+            "body": {"content": "hi"},
+        }
+        response = self.client.post(
+            "/api/batch/", {"requests": [comment, comment]}, format="json"
+        )
+        statuses = [item["status"] for item in response.json()["responses"]]
+        self.assertEqual(statuses, [201, 429])
+
+
+class PubSubHubTest(TestCase):
+    async def test_slow_subscriber_gets_reset(self):
+        hub = pubsub.Hub()
+        subscription = hub.subscribe(["a", "b"], maxsize=2)
+        for number in range(3):
+            hub.dispatch("a", {"type": "tweet", "id": number})
+        hub.dispatch("c", {"type": "tweet", "id": 99})
+        await asyncio.sleep(0)
+        # A terceira mensagem não coube: as pendentes viram um único reset
+        self.assertEqual(await subscription.get(), (None, pubsub.RESET))
+        self.assertTrue(subscription.queue.empty())
+
+        subscription.close()
+        self.assertFalse(hub.has_subscribers("a"))
+        self.assertFalse(hub.has_subscribers("b"))
@@ -0,0 +1,146 @@
+"""
+Limites de requisições por token bucket.
+
+Cada escopo (``THROTTLE_RATES``) tem um balde por usuário autenticado e/ou
+por IP, com ``"N/período"``: até N requisições seguidas, repostas à taxa de N
+por período. Sem token, a requisição recebe 429 com ``Retry-After`` (o tempo
+até o próximo token), pelo ``Throttled`` do DRF.
+
+O escopo vem da view: ``throttle_scopes`` (por action de um viewset) ou
+``throttle_scope``. Views sem escopo, ou escopos sem limite, não são
+limitados.
+
+O estado dos baldes fica em ``THROTTLE_STORE``: ``LocalStore`` guarda em
+memória, por processo; ``CacheStore`` usa o cache do Django (com Redis,
+compartilhado entre os workers). No cache, leitura e gravação não são
+atômicas: requisições simultâneas podem gastar o mesmo token.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """``"N/período"`` → ``(capacidade, tokens por segundo)``."""
+    count, period = rate.split("/")
+    count = int(count)
+    return count, count / PERIODS[period[0]]
+
+
+def take(state, capacity, refill, now):
+    """
+    Gasta um token do balde ``state`` (``(tokens, instante)`` ou ``None``,
+    balde cheio). Devolve o novo estado e a espera em segundos (0 se havia
+    token).
+    """
+    tokens, updated = state if state is not None else (capacity, now)
+    tokens = min(capacity, tokens + max(now - updated, 0) * refill)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / refill
+
+
+class LocalStore:
+    """Baldes em memória; os menos usados saem além de ``THROTTLE_MAX_KEYS``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def take(self, key, capacity, refill):
+        with self._lock:
+            state, wait = take(self._buckets.get(key), capacity, refill, time.time())
+            self._buckets[key] = state
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > settings.THROTTLE_MAX_KEYS:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class CacheStore:
+    """Baldes no cache do Django, expirados quando estariam cheios de novo."""
+
+    KEY_PREFIX = "throttle"
+
+    def take(self, key, capacity, refill):
+        key = f"{self.KEY_PREFIX}:{key}"
+        state, wait = take(cache.get(key), capacity, refill, time.time())
+        cache.set(key, state, timeout=math.ceil(capacity / refill))
+        return wait
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = import_string(settings.THROTTLE_STORE)()
+    return _store
+
+
+@receiver(setting_changed)
+def _reset_store(setting, **kwargs):
+    global _store
+    if setting == "THROTTLE_STORE":
+        _store = None
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Base: balde ``kind`` (``"user"`` ou ``"ip"``) do escopo da view."""
+
+    kind = None
+
+    def get_scope(self, view):
+        action = getattr(view, "action", None)
+        scopes = getattr(view, "throttle_scopes", {})
+        return scopes.get(action, getattr(view, "throttle_scope", None))
+
+    def get_ident_key(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        scope = self.get_scope(view)
+        rate = settings.THROTTLE_RATES.get(scope, {}).get(self.kind)
+        ident = self.get_ident_key(request) if rate else None
+        if ident is None:
+            return True
+        capacity, refill = parse_rate(rate)
+        key = f"{scope}:{self.kind}:{ident}"
+        self.wait_seconds = get_store().take(key, capacity, refill)
+        return self.wait_seconds == 0
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Por usuário autenticado (anônimos ficam só com o limite por IP)."""
+
+    kind = "user"
+
+    def get_ident_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return None
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Por IP do cliente (``NUM_PROXIES`` proxies confiáveis na frente)."""
+
+    kind = "ip"
+
+    def get_ident_key(self, request):
+        return self.get_ident(request)
@@ -20,7 +20,12 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.http import JsonResponse
 from django.urls import include, path
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework_simplejwt.views import TokenRefreshView
+
+from users.views import TokenObtainView
+
+from .batch import BatchView
+from .metrics import metrics_view
 
 
 def api_status(request):
@@ -32,7 +37,9 @@ def api_status(request):
             "endpoints": {
                 "users": "/api/users/",
                 "tweets": "/api/tweets/",
+                "trends": "/api/trends/",
                 "token": "/api/token/",
+                "batch": "/api/batch/",
                 "admin": "/admin/",
             },
         }
@@ -42,9 +49,12 @@ def api_status(request):
 urlpatterns = [
     path("", api_status, name="api_status"),
     path("admin/", admin.site.urls),
+    path("metrics/", metrics_view, name="metrics"),
+    path("api/batch/", BatchView.as_view(), name="batch"),
     path("api/", include("tweets.urls")),
+    path("api/", include("trends.urls")),
     path("api/users/", include("users.urls")),
-    path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path("api/token/", TokenObtainView.as_view(), name="token_obtain_pair"),
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
 ]
 
@@ -0,0 +1,18 @@
+"""
+Rotas sob ASGI (``ASYNC_READ_VIEWS``): as leituras mais frequentes usam as
+views assíncronas; todo o resto, e os métodos de escrita das mesmas rotas,
+seguem para ``twitter.urls``.
+"""
+
+from django.urls import include, path
+
+from tweets.urls import async_urlpatterns as tweets_async_urlpatterns
+from users.urls import async_urlpatterns as users_async_urlpatterns
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path("api/", include(tweets_async_urlpatterns)),
+    path("api/users/", include(users_async_urlpatterns)),
+    *sync_urlpatterns,
+]
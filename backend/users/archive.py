@@ -0,0 +1,58 @@
+"""
+Arquivo completo de um usuário (tweets, comentários, likes e retweets) em
+NDJSON: um objeto JSON por linha, com ``type`` indicando o registro.
+
+As linhas são lidas com cursores do lado do servidor (``iterator()``) e
+enviadas em blocos, então a memória usada não depende do tamanho da conta.
+"""
+
+from django.conf import settings
+
+from tweets.models import Tweet, TweetComment, TweetLike, TweetRetweet
+from tweets.serializers import serialize_tweet_rows, tweet_rows
+from twitter.renderers import FastJSONRenderer
+
+CONTENT_TYPE = "application/x-ndjson"
+
+
+def _chunks(queryset, size):
+    chunk = []
+    for row in queryset.iterator(chunk_size=size):
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def archive_records(user, chunk_size=None):
+    """Blocos de registros do arquivo de ``user``, em ordem cronológica."""
+    size = chunk_size or settings.ARCHIVE_CHUNK_SIZE
+    tweets = tweet_rows(Tweet.objects.filter(author=user).order_by("timestamp", "id"))
+    for rows in _chunks(tweets, size):
+        yield [{"type": "tweet", **tweet} for tweet in serialize_tweet_rows(rows)]
+
+    sources = [
+        (
+            "comment",
+            TweetComment.objects.filter(author=user).values(
+                "id", "tweet_id", "content", "created_at"
+            ),
+        ),
+        ("like", TweetLike.objects.filter(user=user).values("tweet_id", "created_at")),
+        (
+            "retweet",
+            TweetRetweet.objects.filter(user=user).values("tweet_id", "created_at"),
+        ),
+    ]
+    for kind, queryset in sources:
+        for rows in _chunks(queryset.order_by("id"), size):
+            yield [{"type": kind, **row} for row in rows]
+
+
+def stream_archive(user, chunk_size=None):
+    """Bytes NDJSON do arquivo de ``user``, um bloco por lote de registros."""
+    render = FastJSONRenderer().render
+    for records in archive_records(user, chunk_size):
+        yield b"".join(render(record) + b"\n" for record in records)
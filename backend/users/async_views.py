@@ -0,0 +1,65 @@
+"""
+Variantes assíncronas das leituras de ``UserViewSet`` (``retrieve``,
+``stats``, ``following`` e ``followers``), com a mesma saída.
+"""
+
+from asgiref.sync import sync_to_async
+from django.db.models import F
+from django.http import Http404
+from rest_framework.response import Response
+
+from twitter.async_api import async_read_view
+from twitter.pagination import FollowPagination
+
+from . import profile_cache
+from .models import User
+from .serializers import UserSerializer, add_followed_by_me
+from .views import STATS_FIELDS
+
+
+async def _profile(user_id, request=None):
+    user = await User.objects.filter(pk=user_id).afirst()
+    if user is None:
+        raise Http404("No User matches the given query.")
+    return UserSerializer(user, context={"request": request}).data
+
+
+@async_read_view
+async def user_detail(request, pk):
+    # URLs do avatar são absolutas para o host da requisição
+    data = await profile_cache.aget_profile(
+        pk, lambda: _profile(pk, request), variant=request.get_host()
+    )
+    # Cópia: o perfil em cache é o mesmo para qualquer leitor
+    data = await sync_to_async(add_followed_by_me)([dict(data)], request.user)
+    return Response(data[0])
+
+
+@async_read_view
+async def stats(request, pk):
+    profile = await profile_cache.aget_profile(pk, lambda: _profile(pk))
+    return Response({field: profile[field] for field in STATS_FIELDS})
+
+
+async def _follow_page(request, users):
+    paginator = FollowPagination()
+    page = await paginator.apaginate_queryset(users, request)
+    serializer = UserSerializer(page, many=True)
+    data = await sync_to_async(add_followed_by_me)(serializer.data, request.user)
+    return paginator.get_paginated_response(data)
+
+
+@async_read_view
+async def following(request):
+    users = User.objects.filter(followers__user=request.user).annotate(
+        followed_at=F("followers__created_at")
+    )
+    return await _follow_page(request, users)
+
+
+@async_read_view
+async def followers(request):
+    users = User.objects.filter(following__following_user=request.user).annotate(
+        followed_at=F("following__created_at")
+    )
+    return await _follow_page(request, users)
@@ -0,0 +1,85 @@
+"""
+Cache do usuário autenticado por JWT (``users.authentication``).
+
+Sem o cache, toda requisição com JWT buscava a linha do usuário no banco. Aqui
+a linha fica em cache por ``AUTH_CACHE_TIMEOUT`` segundos, junto da versão do
+usuário vigente quando foi lida; versão e linha vêm numa única ida ao cache.
+Qualquer gravação na linha (perfil, senha, contadores) troca a versão, o que
+descarta a entrada em todos os processos; atualizações em massa
+(``counters.recount``) trocam a versão global, de todos os usuários.
+
+O hash da senha não vai para o cache: o campo fica adiado e é lido do banco só
+quando usado (``check_password``).
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .models import User
+
+KEY_PREFIX = "users:auth"
+ALL_KEY = f"{KEY_PREFIX}:version:all"
+# Colunas em cache, na ordem de ``concrete_fields`` (exigida por ``from_db``)
+FIELDS = [
+    field.attname for field in User._meta.concrete_fields if field.name != "password"
+]
+
+
+def _key(user_id):
+    return f"{KEY_PREFIX}:{user_id}"
+
+
+def _version_key(user_id):
+    return f"{KEY_PREFIX}:version:{user_id}"
+
+
+def _bump(keys):
+    cache.set_many(dict.fromkeys(keys, time.time_ns()), timeout=None)
+
+
+def _invalidate(keys):
+    _bump(keys)
+    # De novo após o commit, como em ``profile_cache.invalidate``
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def invalidate(*user_ids):
+    """Troca a versão de ``user_ids``, descartando as entradas em cache."""
+    _invalidate([_version_key(user_id) for user_id in user_ids])
+
+
+def invalidate_all():
+    """Troca a versão global, descartando as entradas de todos os usuários."""
+    _invalidate([ALL_KEY])
+
+
+def _version(cached, version_key):
+    version = cached.get(version_key)
+    if version is None:
+        # Versão nova (e não 0), como as gerações de ``profile_cache``
+        version = time.time_ns()
+        if not cache.add(version_key, version, timeout=None):
+            version = cache.get(version_key, version)
+    return version
+
+
+def get_user(user_id):
+    """``User`` de ``user_id`` (com ``password`` adiado), ou ``None``."""
+    key, version_key = _key(user_id), _version_key(user_id)
+    cached = cache.get_many([key, version_key, ALL_KEY])
+    version = (_version(cached, ALL_KEY), _version(cached, version_key))
+
+    entry = cached.get(key)
+    if entry is not None and entry[0] == version:
+        values = entry[1]
+    else:
+        values = User.objects.filter(pk=user_id).values_list(*FIELDS).first()
+        if values is None:
+            return None
+        # Gravada com as versões lidas antes do banco: se mudaram nesse meio
+        # tempo, a entrada já nasce descartada
+        cache.set(key, (version, values), timeout=settings.AUTH_CACHE_TIMEOUT)
+    return User.from_db(DEFAULT_DB_ALIAS, FIELDS, values)
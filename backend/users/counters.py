@@ -0,0 +1,56 @@
+"""
+Contadores sociais desnormalizados em ``User``.
+
+As colunas são atualizadas com ``F()`` nos sinais de ``Tweet`` e
+``UserFollowing``; ``recount`` recalcula tudo a partir das tabelas de origem.
+"""
+
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from . import auth_cache
+from .models import User, UserFollowing
+
+
+def increment(user_id, field, delta=1):
+    """Soma ``delta`` ao contador ``field`` sem ler a linha do usuário."""
+    users = User.objects.filter(pk=user_id)
+    if delta < 0:
+        users = users.filter(**{f"{field}__gte": -delta})
+    users.update(**{field: F(field) + delta})
+    auth_cache.invalidate(user_id)
+
+
+def subquery_count(model, field):
+    """Total de linhas de ``model`` cujo ``field`` aponta para a linha externa."""
+    totals = (
+        model.objects.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(total=Count("*"))
+        .values("total")
+    )
+    return Coalesce(Subquery(totals), 0)
+
+
+def recount(queryset=None, batch_size=10000):
+    """Recalcula os contadores em lotes de ``batch_size`` ids."""
+    from tweets.models import Tweet
+
+    if queryset is None:
+        queryset = User.objects.all()
+    ids = queryset.order_by("id").values_list("id", flat=True)
+    first, last = ids.first(), ids.last()
+    if first is None:
+        return 0
+
+    updated = 0
+    for start in range(first, last + 1, batch_size):
+        updated += queryset.filter(id__gte=start, id__lt=start + batch_size).update(
+            followers_count=subquery_count(UserFollowing, "following_user"),
+            following_count=subquery_count(UserFollowing, "user"),
+            tweets_count=subquery_count(Tweet, "author"),
+        )
+    # O UPDATE em massa não passa por ``increment``
+    auth_cache.invalidate_all()
+    return updated
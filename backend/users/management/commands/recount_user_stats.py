@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from users import counters, profile_cache
+
+
+class Command(BaseCommand):
+    help = "Recalcula followers_count, following_count e tweets_count"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        updated = counters.recount(batch_size=options["batch_size"])
+        # O UPDATE em massa não dispara os sinais de invalidação
+        profile_cache.invalidate_all()
+        self.stdout.write(self.style.SUCCESS(f"{updated} usuários recalculados"))
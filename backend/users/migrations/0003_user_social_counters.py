@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:55
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    UserFollowing = apps.get_model("users", "UserFollowing")
+    Tweet = apps.get_model("tweets", "Tweet")
+
+    def count(model, field):
+        totals = (
+            model.objects.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(total=Count("*"))
+            .values("total")
+        )
+        return Coalesce(Subquery(totals), 0)
+
+    User.objects.update(
+        followers_count=count(UserFollowing, "following_user"),
+        following_count=count(UserFollowing, "user"),
+        tweets_count=count(Tweet, "author"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_userfollowing"),
+        ("tweets", "0005_timelineentry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="followers_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="following_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="tweets_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
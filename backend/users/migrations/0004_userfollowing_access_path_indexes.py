@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação
+    atomic = False
+
+    dependencies = [
+        ("users", "0003_user_social_counters"),
+    ]
+
+    # user já é coberto pelo unique (user, following_user); following_user
+    # passa a ser coberto por follow_followers_recent_idx
+    operations = [
+        AddIndexConcurrently(
+            model_name="userfollowing",
+            index=models.Index(
+                fields=["user", "-created_at"], name="follow_following_recent_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="userfollowing",
+            index=models.Index(
+                fields=["following_user", "-created_at"],
+                name="follow_followers_recent_idx",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="userfollowing",
+            name="following_user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="followers",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="userfollowing",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="following",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:53
+
+from django.db import migrations
+
+import twitter.images
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0004_userfollowing_access_path_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="user",
+            name="avatar",
+            field=twitter.images.VariantImageField(
+                blank=True, null=True, upload_to="avatars/"
+            ),
+        ),
+    ]
@@ -1,10 +1,22 @@
 from django.contrib.auth.models import AbstractUser, Group, Permission
 from django.db import models
 
+from twitter.images import VariantImageField
+
 
 class User(AbstractUser):
     bio = models.TextField(blank=True, null=True)
-    avatar = models.ImageField(upload_to="avatars/", blank=True, null=True)
+    avatar = VariantImageField(
+        upload_to="avatars/",
+        variants={"small": 96, "medium": 400},
+        crop=True,
+        blank=True,
+        null=True,
+    )
+    # Contadores desnormalizados (mantidos por users.signals e tweets.signals)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    tweets_count = models.PositiveIntegerField(default=0)
     groups = models.ManyToManyField(
         Group, related_name="custom_user_groups", blank=True
     )
@@ -12,17 +24,35 @@ class User(AbstractUser):
         Permission, related_name="custom_user_permissions", blank=True
     )
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Contas mais seguidas (sugestões de users.suggestions)
+            models.Index(fields=["-followers_count", "-id"], name="user_popular_idx"),
+        ]
+
     def __str__(self):
         return self.username
 
 
 # users/models.py - Adicionar
 class UserFollowing(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="following")
+    # Os índices compostos abaixo cobrem as buscas por user e following_user
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="following", db_index=False
+    )
     following_user = models.ForeignKey(
-        User, on_delete=models.CASCADE, related_name="followers"
+        User, on_delete=models.CASCADE, related_name="followers", db_index=False
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         unique_together = ("user", "following_user")
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at"], name="follow_following_recent_idx"
+            ),
+            models.Index(
+                fields=["following_user", "-created_at"],
+                name="follow_followers_recent_idx",
+            ),
+        ]
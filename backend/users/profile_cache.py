@@ -0,0 +1,132 @@
+"""
+Cache das representações de perfil (``retrieve``, ``me`` e ``stats``).
+
+As chaves carregam uma geração por usuário (e uma global): invalidar é
+gravar uma geração nova, o que descarta de uma vez todas as variantes do
+perfil e impede que um cálculo ainda em andamento grave dados antigos numa
+chave que será lida.
+Em um miss, só um processo calcula o perfil; os demais esperam o resultado
+(proteção contra stampede).
+"""
+
+import asyncio
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+KEY_PREFIX = "users:profile"
+ALL_KEY = f"{KEY_PREFIX}:gen:all"
+
+
+def _generation_key(user_id):
+    return f"{KEY_PREFIX}:gen:{user_id}"
+
+
+def _generations(user_id):
+    """Gerações global e do usuário, lidas em uma única ida ao cache."""
+    keys = [ALL_KEY, _generation_key(user_id)]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            # Geração nova (e não 0): se a chave for despejada, entradas
+            # antigas não voltam a ser lidas
+            generation = time.time_ns()
+            if not cache.add(key, generation, timeout=None):
+                generation = cache.get(key, generation)
+            generations[key] = generation
+    return f"{generations[ALL_KEY]}.{generations[keys[1]]}"
+
+
+async def _agenerations(user_id):
+    keys = [ALL_KEY, _generation_key(user_id)]
+    generations = await cache.aget_many(keys)
+    for key in keys:
+        if key not in generations:
+            generation = time.time_ns()
+            if not await cache.aadd(key, generation, timeout=None):
+                generation = await cache.aget(key, generation)
+            generations[key] = generation
+    return f"{generations[ALL_KEY]}.{generations[keys[1]]}"
+
+
+def _bump(keys):
+    generation = time.time_ns()
+    cache.set_many(dict.fromkeys(keys, generation), timeout=None)
+
+
+def invalidate(*user_ids):
+    """Descarta os perfis em cache de ``user_ids``."""
+    keys = [_generation_key(user_id) for user_id in user_ids]
+    _bump(keys)
+    # De novo após o commit: um leitor concorrente pode ter recalculado o
+    # perfil a partir do estado anterior enquanto a transação estava aberta
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def invalidate_all():
+    """Descarta todos os perfis (ex.: após atualizações em massa)."""
+    _bump([ALL_KEY])
+    transaction.on_commit(lambda: _bump([ALL_KEY]))
+
+
+def get_profile(user_id, compute, variant=""):
+    """
+    Perfil de ``user_id`` em cache, calculado com ``compute()`` em um miss.
+
+    ``variant`` separa representações do mesmo usuário que dependem da
+    requisição (ex.: URLs absolutas do avatar por host).
+    """
+    key = f"{KEY_PREFIX}:{user_id}:{_generations(user_id)}:{variant}"
+    profile = cache.get(key)
+    if profile is not None:
+        return profile
+
+    lock_key = f"{key}:lock"
+    lock_timeout = settings.PROFILE_CACHE_LOCK_TIMEOUT
+    deadline = time.monotonic() + lock_timeout
+    locked = cache.add(lock_key, 1, timeout=lock_timeout)
+    while not locked and time.monotonic() < deadline:
+        # Outro processo está calculando este perfil: espera o resultado
+        time.sleep(settings.PROFILE_CACHE_LOCK_POLL)
+        profile = cache.get(key)
+        if profile is not None:
+            return profile
+        locked = cache.add(lock_key, 1, timeout=lock_timeout)
+
+    try:
+        profile = compute()
+        cache.set(key, profile, timeout=settings.PROFILE_CACHE_TIMEOUT)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return profile
+
+
+async def aget_profile(user_id, compute, variant=""):
+    """``get_profile`` para views assíncronas; ``compute`` é uma corrotina."""
+    key = f"{KEY_PREFIX}:{user_id}:{await _agenerations(user_id)}:{variant}"
+    profile = await cache.aget(key)
+    if profile is not None:
+        return profile
+
+    lock_key = f"{key}:lock"
+    lock_timeout = settings.PROFILE_CACHE_LOCK_TIMEOUT
+    deadline = time.monotonic() + lock_timeout
+    locked = await cache.aadd(lock_key, 1, timeout=lock_timeout)
+    while not locked and time.monotonic() < deadline:
+        # A espera não bloqueia o event loop
+        await asyncio.sleep(settings.PROFILE_CACHE_LOCK_POLL)
+        profile = await cache.aget(key)
+        if profile is not None:
+            return profile
+        locked = await cache.aadd(lock_key, 1, timeout=lock_timeout)
+
+    try:
+        profile = await compute()
+        await cache.aset(key, profile, timeout=settings.PROFILE_CACHE_TIMEOUT)
+    finally:
+        if locked:
+            await cache.adelete(lock_key)
+    return profile
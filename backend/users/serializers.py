@@ -1,12 +1,12 @@
 from rest_framework import serializers
 
+from twitter.images import ImageVariantsField
+
 from .models import User, UserFollowing
 
 
 class UserSerializer(serializers.ModelSerializer):
-    followers_count = serializers.SerializerMethodField()
-    following_count = serializers.SerializerMethodField()
-    tweets_count = serializers.SerializerMethodField()
+    avatar_variants = ImageVariantsField(source="avatar")
 
     class Meta:
         model = User
@@ -18,24 +18,20 @@ class UserSerializer(serializers.ModelSerializer):
             "last_name",
             "bio",
             "avatar",
+            "avatar_variants",
             "followers_count",
             "following_count",
             "tweets_count",
         ]
+        read_only_fields = ["followers_count", "following_count", "tweets_count"]
 
-    def get_followers_count(self, obj):
-        return UserFollowing.objects.filter(following_user=obj).count()
-
-    def get_following_count(self, obj):
-        return UserFollowing.objects.filter(user=obj).count()
-
-    def get_tweets_count(self, obj):
-        try:
-            return obj.tweets.count()
-        except Exception as e:
-            # Log do erro para debug
-            print(f"Error in get_tweets_count: {e}")
-            return 0
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        # Só as colunas enviadas: os contadores são somados com F() e a
+        # instância (ex.: request.user, de users.auth_cache) pode estar atrás
+        instance.save(update_fields=list(validated_data))
+        return instance
 
 
 class UserCreateSerializer(serializers.ModelSerializer):
@@ -64,3 +60,21 @@ class UserCreateSerializer(serializers.ModelSerializer):
             bio=validated_data.get("bio", ""),
         )
         return user
+
+
+def add_followed_by_me(data, viewer):
+    """
+    Acrescenta ``followed_by_me`` aos usuários serializados em ``data``, com
+    uma consulta para a página toda. Fica fora do ``UserSerializer``: o perfil
+    em cache é o mesmo para qualquer leitor.
+    """
+    followed = set()
+    if viewer.is_authenticated and data:
+        followed = set(
+            UserFollowing.objects.filter(
+                user=viewer, following_user_id__in=[user["id"] for user in data]
+            ).values_list("following_user_id", flat=True)
+        )
+    for user in data:
+        user["followed_by_me"] = user["id"] in followed
+    return data
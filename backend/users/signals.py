@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import auth_cache, counters, profile_cache, suggestions
+from .models import User, UserFollowing
+
+
+@receiver(post_save, sender=UserFollowing)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        counters.increment(instance.user_id, "following_count")
+        counters.increment(instance.following_user_id, "followers_count")
+        profile_cache.invalidate(instance.user_id, instance.following_user_id)
+        suggestions.invalidate(instance.user_id)
+
+
+@receiver(post_delete, sender=UserFollowing)
+def follow_deleted(sender, instance, **kwargs):
+    counters.increment(instance.user_id, "following_count", -1)
+    counters.increment(instance.following_user_id, "followers_count", -1)
+    profile_cache.invalidate(instance.user_id, instance.following_user_id)
+    suggestions.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    profile_cache.invalidate(instance.pk)
+    auth_cache.invalidate(instance.pk)
@@ -0,0 +1,74 @@
+"""
+Sugestões de quem seguir ("amigos de amigos").
+
+Candidatos são as contas seguidas pelas contas que o usuário segue (só as
+``SUGGESTIONS_MAX_FRIENDS`` seguidas mais recentemente, o que limita o custo
+para quem segue muitas contas), ranqueadas pelo número dessas contas em comum
+e depois pela popularidade. Sem candidatos suficientes, a lista é completada
+com as contas mais seguidas.
+
+O ranking (até ``SUGGESTIONS_MAX`` ids) fica em cache por usuário e é
+descartado quando ele segue ou deixa de seguir alguém.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import User, UserFollowing
+
+KEY_PREFIX = "users:suggestions"
+
+
+def _key(user_id):
+    return f"{KEY_PREFIX}:{user_id}"
+
+
+def compute(user_id):
+    """Ranking de ``user_id``: lista de ``(id sugerido, contas em comum)``."""
+    following = UserFollowing.objects.filter(user_id=user_id)
+    friends = following.order_by("-created_at").values("following_user_id")[
+        : settings.SUGGESTIONS_MAX_FRIENDS
+    ]
+    ranked = list(
+        UserFollowing.objects.filter(user_id__in=friends)
+        .exclude(following_user_id=user_id)
+        .exclude(following_user_id__in=following.values("following_user_id"))
+        .values("following_user_id")
+        .annotate(mutual=Count("id"), followers=F("following_user__followers_count"))
+        .order_by("-mutual", "-followers", "following_user_id")
+        .values_list("following_user_id", "mutual")[: settings.SUGGESTIONS_MAX]
+    )
+
+    missing = settings.SUGGESTIONS_MAX - len(ranked)
+    if missing > 0:
+        # Contas mais seguidas, por user_popular_idx; as já seguidas são
+        # descartadas aqui, e não no SQL, para o índice ser lido só no topo
+        excluded = {user_id, *(candidate for candidate, _ in ranked)}
+        excluded.update(following.values_list("following_user_id", flat=True))
+        popular = User.objects.order_by("-followers_count", "-id").values_list(
+            "id", flat=True
+        )[: missing + len(excluded)]
+        ranked += [
+            (candidate, 0) for candidate in popular if candidate not in excluded
+        ][:missing]
+    return ranked
+
+
+def get_suggestions(user_id):
+    """Ranking de ``user_id``, do cache ou calculado com ``compute``."""
+    key = _key(user_id)
+    ranked = cache.get(key)
+    if ranked is None:
+        ranked = compute(user_id)
+        cache.set(key, ranked, settings.SUGGESTIONS_CACHE_TIMEOUT)
+    return ranked
+
+
+def invalidate(user_id):
+    """Descarta o ranking em cache de ``user_id``."""
+    key = _key(user_id)
+    cache.delete(key)
+    # De novo após o commit, como em ``profile_cache.invalidate``
+    transaction.on_commit(lambda: cache.delete(key))
@@ -1,9 +1,20 @@
-from django.test import TestCase
+import json
+import threading
+import time
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from rest_framework import status
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from .models import User
+from tweets.models import Tweet, TweetComment, TweetLike, TweetRetweet
+
+from . import auth_cache, profile_cache
+from .models import User, UserFollowing
+from .serializers import UserSerializer
 
 
 class UserModelTest(TestCase):
@@ -39,3 +50,335 @@ class UserAPITest(TestCase):
         }
         response = self.client.post("/api/users/", data)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+class FollowListTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="TestUser", email="testuser@example.com", password="password123"
+        )
+        self.others = [
+            User.objects.create_user(
+                username=f"Other{i}", email=f"other{i}@example.com", password="pw"
+            )
+            for i in range(3)
+        ]
+        for other in self.others:
+            UserFollowing.objects.create(user=self.user, following_user=other)
+            UserFollowing.objects.create(user=other, following_user=self.user)
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+    def test_following_is_paginated_by_follow_date(self):
+        response = self.client.get("/api/users/following/", {"count": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        usernames = [user["username"] for user in response.data["results"]]
+        self.assertEqual(usernames, ["Other2", "Other1"])
+
+        response = self.client.get(response.data["next"])
+        usernames = [user["username"] for user in response.data["results"]]
+        self.assertEqual(usernames, ["Other0"])
+
+    def test_followers(self):
+        response = self.client.get("/api/users/followers/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 3)
+
+    def test_followed_by_me(self):
+        UserFollowing.objects.filter(
+            user=self.user, following_user=self.others[0]
+        ).delete()
+        response = self.client.get("/api/users/followers/")
+        flags = {
+            user["username"]: user["followed_by_me"]
+            for user in response.data["results"]
+        }
+        self.assertEqual(flags, {"Other0": False, "Other1": True, "Other2": True})
+
+        # Contagem, página e os flags (o usuário autenticado vem do cache)
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/users/")
+        flags = {
+            user["username"]: user["followed_by_me"]
+            for user in response.data["results"]
+        }
+        self.assertEqual(
+            flags, {"TestUser": False, "Other0": False, "Other1": True, "Other2": True}
+        )
+
+        response = APIClient().get("/api/users/")
+        self.assertFalse(
+            any(user["followed_by_me"] for user in response.data["results"])
+        )
+
+        # O perfil também traz o flag, acima do perfil em cache
+        for other, followed in ((self.others[0], False), (self.others[1], True)):
+            response = self.client.get(f"/api/users/{other.id}/")
+            self.assertEqual(response.data["followed_by_me"], followed)
+        response = APIClient().get(f"/api/users/{self.others[1].id}/")
+        self.assertFalse(response.data["followed_by_me"])
+
+
+@override_settings(SUGGESTIONS_MAX=3)
+class SuggestionsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        names = ["me", "a", "b", "x", "y", "z", "p", "q"]
+        users = {
+            name: User.objects.create_user(username=name, email=f"{name}@example.com")
+            for name in names
+        }
+        follows = ["me a", "me b", "a x", "a y", "b x", "b me", "p z", "q z"]
+        for pair in follows:
+            follower, followed = pair.split()
+            UserFollowing.objects.create(
+                user=users[follower], following_user=users[followed]
+            )
+        self.users = users
+        self.client.force_authenticate(users["me"])
+
+    def suggested(self, **params):
+        response = self.client.get("/api/users/suggestions/", params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, [
+            (user["username"], user["mutual_count"])
+            for user in response.data["results"]
+        ]
+
+    def test_friends_of_friends_then_popular(self):
+        response, suggested = self.suggested(limit=2)
+        self.assertEqual(suggested, [("x", 2), ("y", 1)])
+        response = self.client.get(response.data["next"])
+        self.assertEqual([user["username"] for user in response.data["results"]], ["z"])
+
+    def test_follow_refreshes_suggestions(self):
+        self.suggested()
+        self.client.post(f"/api/users/{self.users['x'].pk}/follow/")
+        _, suggested = self.suggested()
+        self.assertEqual([name for name, _ in suggested], ["y", "z", "q"])
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        response = self.client.get("/api/users/suggestions/")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class SocialCountersTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="TestUser", email="testuser@example.com", password="password123"
+        )
+        self.other = User.objects.create_user(
+            username="Other", email="other@example.com", password="password123"
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+    def counts(self, user):
+        user.refresh_from_db()
+        return user.followers_count, user.following_count, user.tweets_count
+
+    def test_follow_unfollow_and_tweets_update_counters(self):
+        self.client.post(f"/api/users/{self.other.id}/follow/")
+        self.client.post(f"/api/users/{self.other.id}/follow/")
+        self.assertEqual(self.counts(self.user), (0, 1, 0))
+        self.assertEqual(self.counts(self.other), (1, 0, 0))
+
+        response = self.client.post("/api/tweets/", {"content": "hello"})
+        self.assertEqual(response.data["author"]["tweets_count"], 1)
+        self.assertEqual(self.counts(self.user), (0, 1, 1))
+
+        self.client.delete(f"/api/tweets/{response.data['id']}/")
+        self.client.delete(f"/api/users/{self.other.id}/unfollow/")
+        self.assertEqual(self.counts(self.user), (0, 0, 0))
+        self.assertEqual(self.counts(self.other), (0, 0, 0))
+
+    def test_serializer_runs_no_queries(self):
+        with self.assertNumQueries(0):
+            UserSerializer([self.user, self.other], many=True).data
+
+    def test_recount_repairs_drift(self):
+        Tweet.objects.create(author=self.user, content="hello")
+        UserFollowing.objects.create(user=self.other, following_user=self.user)
+        User.objects.update(followers_count=7, following_count=7, tweets_count=7)
+
+        call_command("recount_user_stats", stdout=StringIO())
+        self.assertEqual(self.counts(self.user), (1, 0, 1))
+        self.assertEqual(self.counts(self.other), (0, 1, 0))
+
+
+class ProfileCacheTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="TestUser", email="testuser@example.com", password="password123"
+        )
+        self.other = User.objects.create_user(
+            username="Other", email="other@example.com", password="password123"
+        )
+        self.auth_client = APIClient()
+        refresh = RefreshToken.for_user(self.user)
+        self.auth_client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}"
+        )
+
+    def test_stats_and_detail_are_cached(self):
+        self.client.get(f"/api/users/{self.other.id}/stats/")
+        self.client.get(f"/api/users/{self.other.id}/")
+        with self.assertNumQueries(0):
+            stats = self.client.get(f"/api/users/{self.other.id}/stats/")
+            detail = self.client.get(f"/api/users/{self.other.id}/")
+        self.assertEqual(stats.data["followers_count"], 0)
+        self.assertEqual(detail.data["username"], "Other")
+
+    def test_follow_tweet_and_profile_edit_invalidate(self):
+        self.client.get(f"/api/users/{self.other.id}/stats/")
+        self.auth_client.get("/api/users/me/")
+
+        self.auth_client.post(f"/api/users/{self.other.id}/follow/")
+        stats = self.client.get(f"/api/users/{self.other.id}/stats/")
+        self.assertEqual(stats.data["followers_count"], 1)
+
+        Tweet.objects.create(author=self.user, content="hello")
+        self.auth_client.patch("/api/users/update_profile/", {"bio": "updated"})
+        me = self.auth_client.get("/api/users/me/")
+        self.assertEqual(me.data["following_count"], 1)
+        self.assertEqual(me.data["tweets_count"], 1)
+        self.assertEqual(me.data["bio"], "updated")
+
+    def test_missing_user_is_not_cached(self):
+        response = self.client.get("/api/users/999999/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return {"username": "slow"}
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    profile_cache.get_profile(self.user.id, compute)
+                )
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"username": "slow"}] * 5)
+
+
+class AuthCacheTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="TestUser", email="testuser@example.com", password="password123"
+        )
+        self.client = APIClient()
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+    def test_user_is_cached_without_password(self):
+        self.client.get("/api/users/following/")
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/users/following/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        user = auth_cache.get_user(self.user.pk)
+        self.assertEqual(user.username, "TestUser")
+        self.assertIn("password", user.get_deferred_fields())
+        self.assertNotIn("pbkdf2", str(cache.get(auth_cache._key(self.user.pk))))
+
+    def test_writes_bump_the_version(self):
+        self.client.get("/api/users/me/")
+        self.client.patch("/api/users/update_profile/", {"bio": "updated"})
+        self.assertEqual(auth_cache.get_user(self.user.pk).bio, "updated")
+
+        other = User.objects.create_user(username="Other", email="other@example.com")
+        self.client.post(f"/api/users/{other.pk}/follow/")
+        self.assertEqual(auth_cache.get_user(self.user.pk).following_count, 1)
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        auth_cache.invalidate(self.user.pk)
+        response = self.client.get("/api/users/me/")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_recount_bumps_every_version(self):
+        # Contador fora de sincronia, já em cache
+        User.objects.filter(pk=self.user.pk).update(followers_count=7)
+        self.assertEqual(auth_cache.get_user(self.user.pk).followers_count, 7)
+
+        call_command("recount_user_stats", stdout=StringIO())
+        self.assertEqual(auth_cache.get_user(self.user.pk).followers_count, 0)
+        response = self.client.get("/api/users/me/")
+        self.assertEqual(response.data["followers_count"], 0)
+
+    def test_change_password_keeps_counters(self):
+        self.client.get("/api/users/me/")
+        User.objects.filter(pk=self.user.pk).update(tweets_count=5)
+        response = self.client.post(
+            "/api/users/change_password/",
+            {"old_password": "password123", "new_password": "newpass456"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("newpass456"))
+        self.assertEqual(self.user.tweets_count, 5)
+
+    def test_deleted_user(self):
+        self.client.get("/api/users/me/")
+        self.user.delete()
+        response = self.client.get("/api/users/me/")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ArchiveTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="TestUser", email="testuser@example.com", password="password123"
+        )
+        self.other = User.objects.create_user(
+            username="Other", email="other@example.com", password="password123"
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+        tweets = [
+            Tweet.objects.create(author=self.user, content=f"tweet {i}")
+            for i in range(5)
+        ]
+        foreign = Tweet.objects.create(author=self.other, content="foreign")
+        TweetComment.objects.create(tweet=foreign, author=self.user, content="nice")
+        TweetLike.objects.create(user=self.user, tweet=foreign)
+        TweetRetweet.objects.create(user=self.user, tweet=foreign)
+        TweetLike.objects.create(user=self.other, tweet=tweets[0])
+
+    @override_settings(ARCHIVE_CHUNK_SIZE=2)
+    def test_streams_all_records_as_ndjson(self):
+        response = self.client.get(f"/api/users/{self.user.id}/archive/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+
+        chunks = list(response.streaming_content)
+        records = [json.loads(line) for line in b"".join(chunks).splitlines()]
+        types = [record["type"] for record in records]
+        self.assertEqual(types, ["tweet"] * 5 + ["comment", "like", "retweet"])
+        self.assertEqual(records[0]["content"], "tweet 0")
+        self.assertEqual(records[0]["author"]["username"], "TestUser")
+        self.assertGreater(len(chunks), 3)
+
+    def test_other_users_archive_is_forbidden(self):
+        response = self.client.get(f"/api/users/{self.other.id}/archive/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
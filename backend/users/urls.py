@@ -2,6 +2,7 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenRefreshView
 
+from . import async_views
 from .views import CustomTokenObtainPairView, UserViewSet
 
 router = DefaultRouter()
@@ -12,3 +13,11 @@ urlpatterns = [
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("", include(router.urls)),
 ]
+
+# Leituras assíncronas, montadas antes do router em twitter/urls_async.py
+async_urlpatterns = [
+    path("following/", async_views.following),
+    path("followers/", async_views.followers),
+    path("<int:pk>/", async_views.user_detail),
+    path("<int:pk>/stats/", async_views.stats),
+]
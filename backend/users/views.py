@@ -1,6 +1,8 @@
 import logging
 
 from django.db import transaction
+from django.db.models import F
+from django.http import StreamingHttpResponse
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.parsers import FormParser, MultiPartParser
@@ -8,13 +10,29 @@ from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from rest_framework_simplejwt.views import TokenObtainPairView
 
+from jobs.queue import enqueue
+from twitter.pagination import (
+    FollowPagination,
+    SuggestionPagination,
+    TagPagination,
+    TweetPagination,
+)
+
+from . import profile_cache, suggestions
 from .models import User, UserFollowing
-from .serializers import UserCreateSerializer, UserSerializer
+from .serializers import UserCreateSerializer, UserSerializer, add_followed_by_me
 
 logger = logging.getLogger(__name__)
 
+STATS_FIELDS = ("tweets_count", "following_count", "followers_count")
+
+
+class TokenObtainView(TokenObtainPairView):
+    # Cada tentativa calcula o hash da senha
+    throttle_scope = "login"
 
-class CustomTokenObtainPairView(TokenObtainPairView):
+
+class CustomTokenObtainPairView(TokenObtainView):
     def post(self, request, *args, **kwargs):
         response = super().post(request, *args, **kwargs)
         if response.status_code == 200:
@@ -24,8 +42,35 @@ class CustomTokenObtainPairView(TokenObtainPairView):
 
 
 class UserViewSet(ModelViewSet):
-    queryset = User.objects.all()
+    queryset = User.objects.order_by("id")
     serializer_class = UserSerializer
+    throttle_scopes = {
+        "register": "register",
+        "change_password": "password",
+        "follow": "follow",
+        "unfollow": "follow",
+    }
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(
+            add_followed_by_me(serializer.data, request.user)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            user_id = int(kwargs["pk"])
+        except ValueError:
+            return super().retrieve(request, *args, **kwargs)
+        # URLs do avatar são absolutas para o host da requisição
+        data = profile_cache.get_profile(
+            user_id,
+            lambda: self.get_serializer(self.get_object()).data,
+            variant=request.get_host(),
+        )
+        # Cópia: o perfil em cache é o mesmo para qualquer leitor
+        return Response(add_followed_by_me([dict(data)], request.user)[0])
 
     @action(detail=False, methods=["post"])
     def register(self, request):
@@ -101,8 +146,9 @@ class UserViewSet(ModelViewSet):
     @action(detail=False, methods=["get"])
     def me(self, request):
         if request.user.is_authenticated:
-            serializer = UserSerializer(request.user)
-            return Response(serializer.data)
+            user = request.user
+            data = profile_cache.get_profile(user.pk, lambda: UserSerializer(user).data)
+            return Response(data)
         return Response({"error": "Not authenticated"}, status=401)
 
     @action(
@@ -126,63 +172,136 @@ class UserViewSet(ModelViewSet):
             return Response({"error": "Old password is incorrect"}, status=400)
 
         request.user.set_password(new_password)
-        request.user.save()
+        request.user.save(update_fields=["password"])
         return Response({"message": "Password changed successfully"})
 
     @action(detail=True, methods=["post"])
     def follow(self, request, pk=None):
         user_to_follow = self.get_object()
         if user_to_follow != request.user:
-            UserFollowing.objects.get_or_create(
+            _, created = UserFollowing.objects.get_or_create(
                 user=request.user, following_user=user_to_follow
             )
+            if created:
+                from tweets import live, tasks
+
+                enqueue(tasks.backfill, request.user.pk, user_to_follow.pk)
+                live.publish_follow(request.user.pk, user_to_follow.pk)
             return Response({"message": "User followed successfully"})
         return Response({"error": "Cannot follow yourself"}, status=400)
 
     @action(detail=True, methods=["delete"])
     def unfollow(self, request, pk=None):
         user_to_unfollow = self.get_object()
-        UserFollowing.objects.filter(
+        deleted, _ = UserFollowing.objects.filter(
             user=request.user, following_user=user_to_unfollow
         ).delete()
+        if deleted:
+            from tweets import live, timeline
+
+            timeline.remove_author(request.user, user_to_unfollow)
+            live.publish_follow(request.user.pk, user_to_unfollow.pk, following=False)
         return Response({"message": "User unfollowed successfully"})
 
     @action(detail=False, methods=["get"])
     def following(self, request):
-        following = UserFollowing.objects.filter(user=request.user)
-        users = [f.following_user for f in following]
-        serializer = UserSerializer(users, many=True)
-        return Response(serializer.data)
+        users = User.objects.filter(followers__user=request.user).annotate(
+            followed_at=F("followers__created_at")
+        )
+        paginator = FollowPagination()
+        page = paginator.paginate_queryset(users, request, view=self)
+        serializer = UserSerializer(page, many=True)
+        return paginator.get_paginated_response(
+            add_followed_by_me(serializer.data, request.user)
+        )
 
     @action(detail=False, methods=["get"])
     def followers(self, request):
-        followers = UserFollowing.objects.filter(following_user=request.user)
-        users = [f.user for f in followers]
-        serializer = UserSerializer(users, many=True)
-        return Response(serializer.data)
+        users = User.objects.filter(following__following_user=request.user).annotate(
+            followed_at=F("following__created_at")
+        )
+        paginator = FollowPagination()
+        page = paginator.paginate_queryset(users, request, view=self)
+        serializer = UserSerializer(page, many=True)
+        return paginator.get_paginated_response(
+            add_followed_by_me(serializer.data, request.user)
+        )
+
+    @action(detail=False, methods=["get"])
+    def suggestions(self, request):
+        if not request.user.is_authenticated:
+            return Response({"error": "Not authenticated"}, status=401)
+        paginator = SuggestionPagination()
+        page = paginator.paginate_queryset(
+            suggestions.get_suggestions(request.user.pk), request, view=self
+        )
+        users = User.objects.in_bulk([user_id for user_id, _ in page])
+        # Contas removidas depois do cálculo ficam de fora
+        data = [
+            {**UserSerializer(users[user_id]).data, "mutual_count": mutual}
+            for user_id, mutual in page
+            if user_id in users
+        ]
+        return paginator.get_paginated_response(add_followed_by_me(data, request.user))
 
     @action(detail=True, methods=["get"])
     def stats(self, request, pk=None):
-        user = self.get_object()
-        tweets_count = user.tweets.count()
-        following_count = UserFollowing.objects.filter(user=user).count()
-        followers_count = UserFollowing.objects.filter(following_user=user).count()
-
-        return Response(
-            {
-                "tweets_count": tweets_count,
-                "following_count": following_count,
-                "followers_count": followers_count,
-            }
+        try:
+            user_id = int(pk)
+        except ValueError:
+            user_id = self.get_object().pk
+        profile = profile_cache.get_profile(
+            user_id, lambda: UserSerializer(self.get_object()).data
         )
+        return Response({field: profile[field] for field in STATS_FIELDS})
 
     @action(detail=True, methods=["get"])
     def tweets(self, request, pk=None):
         user = self.get_object()
-        tweets = user.tweets.all().order_by("-timestamp")
 
-        # Importar o serializer de tweets
-        from tweets.serializers import TweetSerializer
+        # Importar o caminho rápido de serialização de tweets
+        from tweets.serializers import serialize_tweet_rows, tweet_rows
 
-        serializer = TweetSerializer(tweets, many=True)
-        return Response(serializer.data)
+        paginator = TweetPagination()
+        page = paginator.paginate_queryset(
+            tweet_rows(user.tweets.all()), request, view=self
+        )
+        return paginator.get_paginated_response(
+            serialize_tweet_rows(page, viewer=request.user)
+        )
+
+    @action(detail=True, methods=["get"])
+    def mentions(self, request, pk=None):
+        user = self.get_object()
+
+        from tweets.serializers import serialize_tweet_rows, tweet_rows
+        from tweets.tags import mention_tweets
+
+        paginator = TagPagination()
+        page = paginator.paginate_queryset(
+            tweet_rows(mention_tweets(user.pk), "tagged_at"), request, view=self
+        )
+        return paginator.get_paginated_response(
+            serialize_tweet_rows(page, request, request.user)
+        )
+
+    @action(detail=True, methods=["get"])
+    def archive(self, request, pk=None):
+        user = self.get_object()
+        if not request.user.is_authenticated:
+            return Response({"error": "Not authenticated"}, status=401)
+        if request.user != user and not request.user.is_staff:
+            return Response(
+                {"error": "Cannot export another user's archive"}, status=403
+            )
+
+        # Streaming: tweets, comentários, likes e retweets em NDJSON, em blocos
+        from .archive import CONTENT_TYPE, stream_archive
+
+        response = StreamingHttpResponse(
+            stream_archive(user), content_type=CONTENT_TYPE
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{user.username}-archive.ndjson"'
+        )
+        return response
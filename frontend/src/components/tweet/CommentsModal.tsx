@@ -3,7 +3,7 @@
 import React, { useState, useEffect } from 'react';
 import { X, Send, MessageCircle } from 'lucide-react';
 import { getAvatarUrl } from '../../utils/avatar';
-import api from '../../services/api';
+import api, { nextPageParams, Page } from '../../services/api';
 
 interface Comment {
   id: number;
@@ -62,6 +62,11 @@ const CommentsModal: React.FC<CommentsModalProps> = ({
   const [loading, setLoading] = useState<boolean>(false);
   const [submitting, setSubmitting] = useState<boolean>(false);
   const [error, setError] = useState<string>('');
+  // Parâmetros da próxima página (cursor), null na última
+  const [nextParams, setNextParams] = useState<Record<string, string> | null>(
+    null
+  );
+  const [loadingMore, setLoadingMore] = useState<boolean>(false);
 
   useEffect(() => {
     if (isOpen) {
@@ -72,8 +77,11 @@ const CommentsModal: React.FC<CommentsModalProps> = ({
   const fetchComments = async (): Promise<void> => {
     try {
       setLoading(true);
-      const response = await api.get(`/tweets/${tweet.id}/comments/`);
-      setComments(response.data);
+      const response = await api.get<Page<Comment>>(
+        `/tweets/${tweet.id}/comments/`
+      );
+      setComments(response.data.results);
+      setNextParams(nextPageParams(response.data.next));
     } catch (err) {
       setError('Erro ao carregar comentários');
       console.error('Failed to fetch comments:', err);
@@ -82,6 +90,29 @@ const CommentsModal: React.FC<CommentsModalProps> = ({
     }
   };
 
+  const loadMoreComments = async (): Promise<void> => {
+    if (!nextParams || loadingMore) return;
+    try {
+      setLoadingMore(true);
+      const response = await api.get<Page<Comment>>(
+        `/tweets/${tweet.id}/comments/`,
+        { params: nextParams }
+      );
+      setComments(current => {
+        const known = new Set(current.map(comment => comment.id));
+        return [
+          ...current,
+          ...response.data.results.filter(comment => !known.has(comment.id)),
+        ];
+      });
+      setNextParams(nextPageParams(response.data.next));
+    } catch (err) {
+      console.error('Failed to fetch more comments:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleSubmitComment = async (e: React.FormEvent): Promise<void> => {
     e.preventDefault();
     if (!newComment.trim() || !currentUser) return;
@@ -255,6 +286,15 @@ const CommentsModal: React.FC<CommentsModalProps> = ({
                   </div>
                 </div>
               ))}
+              {nextParams && (
+                <button
+                  className="w-full p-3 text-blue-500 hover:bg-gray-50 disabled:opacity-50"
+                  onClick={loadMoreComments}
+                  disabled={loadingMore}
+                >
+                  {loadingMore ? 'Carregando...' : 'Carregar mais'}
+                </button>
+              )}
             </div>
           )}
         </div>
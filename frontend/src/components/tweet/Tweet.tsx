@@ -1,12 +1,17 @@
 import React, { useState } from 'react';
 import { Heart, MessageCircle, Repeat2, Share, MapPin } from 'lucide-react';
-import { getAvatarUrl } from '../../utils/avatar';
+import {
+  getAvatarUrl,
+  getImageSrcSet,
+  ImageVariants,
+} from '../../utils/avatar';
 import CommentsModal from './CommentsModal';
 
 interface TweetProps {
   id: number;
   content: string;
   image?: string;
+  image_variants?: ImageVariants;
   location?: string;
   author?: {
     id: number;
@@ -14,6 +19,7 @@ interface TweetProps {
     first_name: string;
     last_name: string;
     avatar?: string;
+    avatar_variants?: ImageVariants;
   };
   timestamp: string;
   likes: number;
@@ -37,6 +43,7 @@ const Tweet: React.FC<TweetProps> = ({
   id,
   content,
   image,
+  image_variants,
   location,
   author,
   timestamp,
@@ -51,17 +58,28 @@ const Tweet: React.FC<TweetProps> = ({
   onCommentAdded,
 }) => {
   const [isCommentsModalOpen, setIsCommentsModalOpen] = useState(false);
+  // Derivadas são geradas pela fila logo após o upload: enquanto não
+  // existem, o erro de carregamento volta para o original
+  const [variantsFailed, setVariantsFailed] = useState(false);
+  const [avatarVariantFailed, setAvatarVariantFailed] = useState(false);
+  // Avatar de 96px em vez do original
+  const avatarUrl =
+    (!avatarVariantFailed && getAvatarUrl(author?.avatar_variants?.small)) ||
+    getAvatarUrl(author?.avatar);
   return (
     <div className="border-b border-gray-200 p-4 hover:bg-gray-50 transition-colors">
       <div className="flex space-x-3">
         {/* Avatar */}
         <div className="flex-shrink-0">
           <div className="w-10 h-10 bg-gray-300 rounded-full flex items-center justify-center overflow-hidden">
-            {getAvatarUrl(author?.avatar) ? (
+            {avatarUrl ? (
               <img
-                src={getAvatarUrl(author?.avatar)!}
+                src={avatarUrl}
                 alt={author?.username || 'Usuário'}
                 className="w-full h-full object-cover"
+                loading="lazy"
+                decoding="async"
+                onError={() => setAvatarVariantFailed(true)}
               />
             ) : (
               <span className="text-gray-600 font-medium">
@@ -94,8 +112,15 @@ const Tweet: React.FC<TweetProps> = ({
             <div className="mt-3">
               <img
                 src={getAvatarUrl(image) || image}
+                srcSet={
+                  variantsFailed ? undefined : getImageSrcSet(image_variants)
+                }
+                sizes="(max-width: 448px) 100vw, 448px"
                 alt="Conteúdo do tweet"
                 className="w-full max-w-md rounded-lg object-cover"
+                loading="lazy"
+                decoding="async"
+                onError={() => setVariantsFailed(true)}
               />
             </div>
           )}
@@ -1,16 +1,19 @@
 // TweetList.tsx - Correção para o erro
 import React from 'react';
 import Tweet from './Tweet';
+import { ImageVariants } from '../../utils/avatar';
 
 interface TweetData {
   id: number;
   content: string;
   image?: string;
+  image_variants?: ImageVariants;
   location?: string;
   author?: {
     id: number;
     username: string;
     avatar?: string;
+    avatar_variants?: ImageVariants;
     first_name: string;
     last_name: string;
   };
@@ -24,54 +24,20 @@ const SuggestedUsers: React.FC<SuggestedUsersProps> = ({ currentUserId }) => {
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
-    const init = async () => {
-      await fetchFollowing();
-      await fetchSuggestedUsers();
-    };
-    init();
+    fetchSuggestedUsers();
   }, [currentUserId]);
 
   const fetchSuggestedUsers = async (): Promise<void> => {
     try {
-      // Buscar following no início para evitar race condition com o state
-      const followingResp = await api.get('/users/following/');
-      const followingList = Array.isArray(followingResp.data)
-        ? followingResp.data
-        : (followingResp.data?.results ?? []);
-      const currentFollowingIds = followingList.map(
-        (user: SuggestedUser) => user.id
-      );
-      // Também manter o estado alinhado
-      setFollowing(currentFollowingIds);
-
-      const usersResp = await api.get('/users/');
-      const users = Array.isArray(usersResp.data)
-        ? usersResp.data
-        : (usersResp.data?.results ?? []);
-      // Filtrar o usuário atual e usuários já seguidos
-      const allUsers = users.filter(
-        (user: SuggestedUser) => user.id !== currentUserId
-      );
-      setSuggestedUsers(
-        allUsers
-          .filter((u: SuggestedUser) => !currentFollowingIds.includes(u.id))
-          .slice(0, 5)
-      ); // Mostrar apenas 5 sugestões
+      // Ranking calculado no servidor (amigos de amigos), já sem o usuário
+      // atual e as contas seguidas
+      const response = await api.get('/users/suggestions/', {
+        params: { limit: 5 },
+      });
+      setSuggestedUsers(response.data.results);
+      setFollowing([]);
     } catch (err) {
       console.error('Failed to fetch suggested users:', err);
-    }
-  };
-
-  const fetchFollowing = async (): Promise<void> => {
-    try {
-      const response = await api.get('/users/following/');
-      const list = Array.isArray(response.data)
-        ? response.data
-        : (response.data?.results ?? []);
-      const followingIds = list.map((user: SuggestedUser) => user.id);
-      setFollowing(followingIds);
-    } catch (err) {
-      console.error('Failed to fetch following:', err);
     } finally {
       setLoading(false);
     }
@@ -18,32 +18,20 @@ const SuggestedUsers: React.FC<SuggestedUsersProps> = ({ onUserClick }) => {
   const [refreshing, setRefreshing] = useState(false);
 
   useEffect(() => {
-    const init = async () => {
-      await fetchFollowing();
-      await fetchSuggestedUsers();
-    };
-    init();
+    fetchSuggestedUsers();
     // reavaliar quando o usuário atual mudar
   }, [currentUser?.id]);
 
   const fetchSuggestedUsers = async () => {
     try {
       setLoading(true);
-      // Obter 'following' mais recente para filtrar corretamente
-      const followingResp = await api.get('/users/following/');
-      const followingSet = new Set<number>(
-        followingResp.data.map((u: any) => u.id as number)
-      );
-      const response = await api.get('/users/');
-      const users = Array.isArray(response.data)
-        ? response.data
-        : (response.data?.results ?? []);
-      // Filtrar o usuário atual e usuários já seguidos
-      const filteredUsers = users.filter(
-        (user: any) => user.id !== currentUser?.id && !followingSet.has(user.id)
-      );
-      // Pegar apenas os primeiros 5 usuários
-      setSuggestedUsers(filteredUsers.slice(0, 5));
+      // Ranking calculado no servidor (amigos de amigos), já sem o usuário
+      // atual e as contas seguidas
+      const response = await api.get('/users/suggestions/', {
+        params: { limit: 5 },
+      });
+      setSuggestedUsers(response.data.results);
+      setFollowing(new Set());
     } catch (error) {
       console.error('Failed to fetch suggested users:', error);
     } finally {
@@ -53,40 +41,23 @@ const SuggestedUsers: React.FC<SuggestedUsersProps> = ({ onUserClick }) => {
 
   const fetchNewUserToSuggest = async () => {
     try {
-      const response = await api.get('/users/');
-      const users = Array.isArray(response.data)
-        ? response.data
-        : (response.data?.results ?? []);
-      // Filtrar o usuário atual, usuários já seguidos e usuários já na lista de sugestões
+      // Seguir descarta o ranking em cache: a próxima sugestão é a 5ª da
+      // lista recalculada
+      const response = await api.get('/users/suggestions/', {
+        params: { limit: 1, offset: 4 },
+      });
       const currentSuggestionIds = new Set(suggestedUsers.map(user => user.id));
-      const filteredUsers = users.filter(
-        (user: any) =>
-          user.id !== currentUser?.id &&
-          !following.has(user.id) &&
-          !currentSuggestionIds.has(user.id)
+      const next = response.data.results.filter(
+        (user: any) => !currentSuggestionIds.has(user.id)
       );
-
-      // Se há usuários disponíveis, adicionar o primeiro à lista
-      if (filteredUsers.length > 0) {
-        setSuggestedUsers(prev => [...prev, filteredUsers[0]]);
+      if (next.length > 0) {
+        setSuggestedUsers(prev => [...prev, next[0]]);
       }
     } catch (error) {
       console.error('Failed to fetch new user suggestion:', error);
     }
   };
 
-  const fetchFollowing = async () => {
-    try {
-      const response = await api.get('/users/following/');
-      const followingIds = new Set<number>(
-        response.data.map((user: any) => user.id as number)
-      );
-      setFollowing(followingIds);
-    } catch (error) {
-      console.error('Failed to fetch following:', error);
-    }
-  };
-
   const handleFollow = async (userId: number) => {
     try {
       await api.post(`/users/${userId}/follow/`);
@@ -117,9 +88,6 @@ const SuggestedUsers: React.FC<SuggestedUsersProps> = ({ onUserClick }) => {
 
   const handleRefresh = async () => {
     setRefreshing(true);
-    // Atualizar lista de seguindo primeiro
-    await fetchFollowing();
-    // Depois buscar novas sugestões baseadas na lista atualizada
     await fetchSuggestedUsers();
     setRefreshing(false);
   };
@@ -9,13 +9,15 @@ import Logo from '../components/ui/Logo';
 import TweetComposer from '../components/tweet/TweetComposer';
 import TweetList from '../components/tweet/TweetList';
 import SuggestedUsers from '../components/user/SuggestedUsers';
-import api from '../services/api';
-import { getAvatarUrl } from '../utils/avatar';
+import api, { nextPageParams, Page } from '../services/api';
+import { FeedEvent, subscribeToFeed } from '../services/stream';
+import { getAvatarUrl, ImageVariants } from '../utils/avatar';
 
 interface Tweet {
   id: number;
   content: string;
   image?: string;
+  image_variants?: ImageVariants;
   location?: string;
   timestamp: string;
   likes: number;
@@ -25,6 +27,7 @@ interface Tweet {
     id: number;
     username: string;
     avatar?: string;
+    avatar_variants?: ImageVariants;
     first_name: string;
     last_name: string;
   };
@@ -36,15 +39,88 @@ const Feed: React.FC = () => {
   const [tweets, setTweets] = useState<Tweet[]>([]);
   const [loading, setLoading] = useState<boolean>(true);
   const [error, setError] = useState<string>('');
+  // Parâmetros da próxima página (cursor), null na última
+  const [nextParams, setNextParams] = useState<Record<string, string> | null>(
+    null
+  );
+  const [loadingMore, setLoadingMore] = useState<boolean>(false);
+  // Tweets novos anunciados pelo stream, ainda não exibidos
+  const [newTweetIds, setNewTweetIds] = useState<number[]>([]);
 
   useEffect(() => {
     fetchTweets();
   }, []);
 
+  // Muda quando entram ou saem tweets da lista (não quando só os contadores
+  // mudam): o stream é reaberto com os ids atuais
+  const loadedIds = tweets.map(tweet => tweet.id).join(',');
+
+  useEffect(() => {
+    if (loading) {
+      return undefined;
+    }
+    // Os contadores dos tweets carregados chegam pelo stream
+    return subscribeToFeed(
+      loadedIds ? loadedIds.split(',').map(Number) : [],
+      handleFeedEvent
+    );
+  }, [loading, loadedIds]);
+
+  const handleFeedEvent = (event: FeedEvent): void => {
+    if (event.type === 'tweet') {
+      // Tweets próprios já entram na lista ao serem criados
+      if (event.author !== user?.id) {
+        setNewTweetIds(ids =>
+          ids.includes(event.id) ? ids : [...ids, event.id]
+        );
+      }
+    } else if (event.type === 'counts') {
+      setTweets(current =>
+        current.map(tweet =>
+          tweet.id === event.id
+            ? {
+                ...tweet,
+                likes: event.likes,
+                retweets: event.retweets,
+                replies: event.replies,
+              }
+            : tweet
+        )
+      );
+    } else {
+      // Eventos perdidos: recarregar o feed
+      setNewTweetIds([]);
+      fetchTweets();
+    }
+  };
+
+  const showNewTweets = async (): Promise<void> => {
+    setNewTweetIds([]);
+    if (tweets.length === 0) {
+      fetchTweets();
+      return;
+    }
+    try {
+      const response = await api.get('/tweets/feed/', {
+        params: { since_id: tweets[0].id },
+      });
+      setTweets(current => {
+        const known = new Set(current.map(tweet => tweet.id));
+        const fresh = (response.data.results as Tweet[]).filter(
+          tweet => !known.has(tweet.id)
+        );
+        return [...fresh, ...current];
+      });
+    } catch (err) {
+      console.error('Failed to fetch new tweets:', err);
+    }
+  };
+
   const fetchTweets = async (): Promise<void> => {
     try {
-      const response = await api.get('/tweets/feed/');
-      setTweets(response.data);
+      const response = await api.get<Page<Tweet>>('/tweets/feed/');
+      setTweets(response.data.results);
+      setNextParams(nextPageParams(response.data.next));
     } catch (err) {
       setError('Erro ao carregar tweets');
       console.error('Failed to fetch tweets:', err);
@@ -53,6 +129,28 @@ const Feed: React.FC = () => {
     }
   };
 
+  const loadMoreTweets = async (): Promise<void> => {
+    if (!nextParams || loadingMore) return;
+    try {
+      setLoadingMore(true);
+      const response = await api.get<Page<Tweet>>('/tweets/feed/', {
+        params: nextParams,
+      });
+      setTweets(current => {
+        const known = new Set(current.map(tweet => tweet.id));
+        return [
+          ...current,
+          ...response.data.results.filter(tweet => !known.has(tweet.id)),
+        ];
+      });
+      setNextParams(nextPageParams(response.data.next));
+    } catch (err) {
+      console.error('Failed to fetch more tweets:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleCreateTweet = async (data: {
     content: string;
     image?: File;
@@ -76,7 +174,7 @@ const Feed: React.FC = () => {
         },
       });
 
-      setTweets([response.data, ...tweets]);
+      setTweets(current => [response.data, ...current]);
     } catch (err) {
       setError('Erro ao criar tweet');
       console.error('Failed to create tweet:', err);
@@ -87,8 +185,8 @@ const Feed: React.FC = () => {
     try {
       await api.post(`/tweets/${tweetId}/like/`);
       // Atualizar contador local
-      setTweets(
-        tweets.map(tweet =>
+      setTweets(current =>
+        current.map(tweet =>
           tweet.id === tweetId ? { ...tweet, likes: tweet.likes + 1 } : tweet
         )
       );
@@ -101,8 +199,8 @@ const Feed: React.FC = () => {
     try {
       await api.post(`/tweets/${tweetId}/retweet/`);
       // Atualizar contador local
-      setTweets(
-        tweets.map(tweet =>
+      setTweets(current =>
+        current.map(tweet =>
           tweet.id === tweetId
             ? { ...tweet, retweets: tweet.retweets + 1 }
             : tweet
@@ -131,8 +229,8 @@ const Feed: React.FC = () => {
 
   const handleCommentAdded = (tweetId: number): void => {
     // Atualizar o contador de replies do tweet específico
-    setTweets(
-      tweets.map(tweet =>
+    setTweets(current =>
+      current.map(tweet =>
         tweet.id === tweetId ? { ...tweet, replies: tweet.replies + 1 } : tweet
       )
     );
@@ -270,6 +368,17 @@ const Feed: React.FC = () => {
             </div>
           )}
 
+          {/* Tweets novos recebidos pelo stream */}
+          {newTweetIds.length > 0 && (
+            <button
+              className="w-full p-3 text-blue-500 border-b border-gray-200 hover:bg-gray-50"
+              onClick={showNewTweets}
+            >
+              Mostrar {newTweetIds.length}{' '}
+              {newTweetIds.length === 1 ? 'novo tweet' : 'novos tweets'}
+            </button>
+          )}
+
           {/* Tweets */}
           <TweetList
             tweets={tweets}
@@ -280,6 +389,16 @@ const Feed: React.FC = () => {
             currentUser={user || undefined}
             onCommentAdded={handleCommentAdded}
           />
+
+          {nextParams && (
+            <button
+              className="w-full p-3 text-blue-500 border-t border-gray-200 hover:bg-gray-50 disabled:opacity-50"
+              onClick={loadMoreTweets}
+              disabled={loadingMore}
+            >
+              {loadingMore ? 'Carregando...' : 'Carregar mais'}
+            </button>
+          )}
         </div>
 
         {/* Right Sidebar */}
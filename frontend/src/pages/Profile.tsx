@@ -18,7 +18,7 @@ import Layout from '../components/ui/Layout';
 import Button from '../components/ui/Button';
 import Logo from '../components/ui/Logo';
 import Input from '../components/ui/Input';
-import api from '../services/api';
+import api, { batch } from '../services/api';
 import { getAvatarUrl } from '../utils/avatar';
 
 interface UserProfile {
@@ -57,13 +57,19 @@ const Profile: React.FC = () => {
 
   useEffect(() => {
     fetchProfile();
-    fetchStats();
   }, []);
 
   const fetchProfile = async (): Promise<void> => {
     try {
-      const response = await api.get('/users/me/');
-      const userData = response.data;
+      // Perfil e estatísticas numa única ida ao servidor
+      const [me, statsResponse] = await batch([
+        { path: '/users/me/' },
+        { path: `/users/${user?.id}/stats/` },
+      ]);
+      if (me.status !== 200) {
+        throw new Error(`HTTP ${me.status}`);
+      }
+      const userData = me.body;
       setProfile(userData);
       setFormData({
         first_name: userData.first_name || '',
@@ -74,6 +80,11 @@ const Profile: React.FC = () => {
       if (userData.avatar) {
         setAvatarPreview(getAvatarUrl(userData.avatar) || '');
       }
+      if (statsResponse.status === 200) {
+        setStats(statsResponse.body);
+      } else {
+        console.error('Failed to fetch stats:', statsResponse.body);
+      }
     } catch (err) {
       setError('Erro ao carregar perfil');
       console.error('Failed to fetch profile:', err);
@@ -82,15 +93,6 @@ const Profile: React.FC = () => {
     }
   };
 
-  const fetchStats = async (): Promise<void> => {
-    try {
-      const response = await api.get(`/users/${user?.id}/stats/`);
-      setStats(response.data);
-    } catch (err) {
-      console.error('Failed to fetch stats:', err);
-    }
-  };
-
   const handleInputChange = (
     e: ChangeEvent<HTMLInputElement | HTMLTextAreaElement>
   ): void => {
@@ -9,7 +9,7 @@ import Button from '../components/ui/Button';
 import Logo from '../components/ui/Logo';
 import TweetList from '../components/tweet/TweetList';
 import { getAvatarUrl } from '../utils/avatar';
-import api from '../services/api';
+import api, { nextPageParams, Page } from '../services/api';
 
 interface UserProfile {
   id: number;
@@ -22,6 +22,7 @@ interface UserProfile {
   followers_count?: number;
   following_count?: number;
   tweets_count?: number;
+  followed_by_me?: boolean;
 }
 
 interface Tweet {
@@ -52,6 +53,11 @@ const UserProfilePage: React.FC = () => {
   const [isFollowing, setIsFollowing] = useState(false);
   const [loading, setLoading] = useState(true);
   const [tweetsLoading, setTweetsLoading] = useState(true);
+  // Parâmetros da próxima página de tweets (cursor), null na última
+  const [nextParams, setNextParams] = useState<Record<string, string> | null>(
+    null
+  );
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string>('');
 
   useEffect(() => {
@@ -66,11 +72,8 @@ const UserProfilePage: React.FC = () => {
       setLoading(true);
       const response = await api.get(`/users/${userId}/`);
       setProfile(response.data);
-
-      // Verificar se o usuário atual está seguindo este usuário
-      if (currentUser?.id !== response.data.id) {
-        checkFollowingStatus(response.data.id);
-      }
+      // O perfil já informa se o usuário atual segue este usuário
+      setIsFollowing(Boolean(response.data.followed_by_me));
     } catch (err) {
       setError('Erro ao carregar perfil do usuário');
       console.error('Failed to fetch user profile:', err);
@@ -82,8 +85,9 @@ const UserProfilePage: React.FC = () => {
   const fetchUserTweets = async () => {
     try {
       setTweetsLoading(true);
-      const response = await api.get(`/users/${userId}/tweets/`);
-      setTweets(response.data);
+      const response = await api.get<Page<Tweet>>(`/users/${userId}/tweets/`);
+      setTweets(response.data.results);
+      setNextParams(nextPageParams(response.data.next));
     } catch (err) {
       console.error('Failed to fetch user tweets:', err);
     } finally {
@@ -91,13 +95,25 @@ const UserProfilePage: React.FC = () => {
     }
   };
 
-  const checkFollowingStatus = async (userId: number) => {
+  const loadMoreTweets = async () => {
+    if (!nextParams || loadingMore) return;
     try {
-      const response = await api.get('/users/following/');
-      const followingIds = response.data.map((user: any) => user.id);
-      setIsFollowing(followingIds.includes(userId));
+      setLoadingMore(true);
+      const response = await api.get<Page<Tweet>>(`/users/${userId}/tweets/`, {
+        params: nextParams,
+      });
+      setTweets(current => {
+        const known = new Set(current.map(tweet => tweet.id));
+        return [
+          ...current,
+          ...response.data.results.filter(tweet => !known.has(tweet.id)),
+        ];
+      });
+      setNextParams(nextPageParams(response.data.next));
     } catch (err) {
-      console.error('Failed to check following status:', err);
+      console.error('Failed to fetch more user tweets:', err);
+    } finally {
+      setLoadingMore(false);
     }
   };
 
@@ -358,13 +374,24 @@ const UserProfilePage: React.FC = () => {
               <div className="text-lg">Carregando tweets...</div>
             </div>
           ) : (
-            <TweetList
-              tweets={tweets}
-              onLike={handleLike}
-              onRetweet={handleRetweet}
-              onReply={handleReply}
-              onShare={handleShare}
-            />
+            <>
+              <TweetList
+                tweets={tweets}
+                onLike={handleLike}
+                onRetweet={handleRetweet}
+                onReply={handleReply}
+                onShare={handleShare}
+              />
+              {nextParams && (
+                <button
+                  className="w-full p-3 text-blue-500 border-t border-gray-200 hover:bg-gray-50 disabled:opacity-50"
+                  onClick={loadMoreTweets}
+                  disabled={loadingMore}
+                >
+                  {loadingMore ? 'Carregando...' : 'Carregar mais'}
+                </button>
+              )}
+            </>
           )}
         </div>
       </div>
@@ -63,4 +63,48 @@ api.interceptors.response.use(
   }
 );
 
+// Listagens paginadas por cursor: `next` é a URL da página seguinte, ou null
+export interface Page<T> {
+  results: T[];
+  next: string | null;
+}
+
+// Parâmetros da página seguinte, tirados da URL em `next`, para a requisição
+// seguir pela baseURL da API (e pelos interceptors)
+export const nextPageParams = (
+  next: string | null
+): Record<string, string> | null => {
+  if (!next) return null;
+  const params: Record<string, string> = {};
+  new URL(next).searchParams.forEach((value, key) => {
+    params[key] = value;
+  });
+  return params;
+};
+
+export interface BatchRequest {
+  method?: 'GET' | 'POST' | 'PUT' | 'PATCH' | 'DELETE';
+  path: string; // relativo à API, ex.: '/users/me/'
+  body?: unknown;
+}
+
+export interface BatchResponse<T = any> {
+  status: number;
+  body: T;
+}
+
+// Várias chamadas numa única requisição (POST /api/batch/); as respostas
+// vêm na mesma ordem, cada uma com o próprio status
+export const batch = async (
+  requests: BatchRequest[]
+): Promise<BatchResponse[]> => {
+  const response = await api.post('/batch/', {
+    requests: requests.map(({ path, ...rest }) => ({
+      ...rest,
+      path: `/api${path}`,
+    })),
+  });
+  return response.data.responses;
+};
+
 export default api;
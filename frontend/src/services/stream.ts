@@ -0,0 +1,113 @@
+import api from './api';
+
+// Eventos de /tweets/stream/ (SSE, disponível quando o backend roda sob ASGI)
+export type FeedEvent =
+  | { type: 'tweet'; id: number; author: number }
+  | {
+      type: 'counts';
+      id: number;
+      likes: number;
+      retweets: number;
+      replies: number;
+    }
+  | { type: 'reset' };
+
+const DEFAULT_RETRY_MS = 5000;
+
+/**
+ * Abre o stream de eventos do feed. Usa fetch em vez de EventSource para
+ * enviar o token JWT no header. Reconecta sozinho (com token recusado, só
+ * depois que o token mudar); devolve a função que encerra a conexão.
+ */
+export const subscribeToFeed = (
+  tweetIds: number[],
+  onEvent: (event: FeedEvent) => void
+): (() => void) => {
+  const controller = new AbortController();
+  let retry = DEFAULT_RETRY_MS;
+
+  const handleBlock = (block: string): void => {
+    let data = '';
+    block.split('\n').forEach(line => {
+      if (line.startsWith('retry:')) {
+        retry = Number(line.slice(6)) || retry;
+      } else if (line.startsWith('data:')) {
+        data += line.slice(5).trim();
+      }
+    });
+    if (data) {
+      onEvent(JSON.parse(data) as FeedEvent);
+    }
+  };
+
+  const wait = (): Promise<void> =>
+    new Promise(resolve => setTimeout(resolve, retry));
+
+  // Espera o token mudar (renovado pelo interceptor de `api`); false se ele
+  // sumir (logout ou refresh recusado) ou a conexão for encerrada
+  const waitForNewToken = async (rejected: string | null): Promise<boolean> => {
+    while (!controller.signal.aborted) {
+      await wait();
+      const token = localStorage.getItem('accessToken');
+      if (!token) {
+        return false;
+      }
+      if (token !== rejected) {
+        return true;
+      }
+    }
+    return false;
+  };
+
+  const connect = async (): Promise<void> => {
+    while (!controller.signal.aborted) {
+      const token = localStorage.getItem('accessToken');
+      try {
+        const query = tweetIds.length ? `?tweets=${tweetIds.join(',')}` : '';
+        const response = await fetch(
+          `${api.defaults.baseURL}/tweets/stream/${query}`,
+          {
+            headers: token ? { Authorization: `Bearer ${token}` } : {},
+            signal: controller.signal,
+          }
+        );
+        if (response.status === 404) {
+          // Backend sob WSGI: sem stream, o feed segue sem tempo real
+          return;
+        }
+        if (response.status === 401 || response.status === 403) {
+          // Token recusado: repetir com ele não adianta
+          if (await waitForNewToken(token)) {
+            continue;
+          }
+          return;
+        }
+        if (!response.ok || !response.body) {
+          throw new Error(`HTTP ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        for (;;) {
+          const { value, done } = await reader.read();
+          if (done) {
+            break;
+          }
+          buffer += decoder.decode(value, { stream: true });
+          const blocks = buffer.split('\n\n');
+          buffer = blocks.pop() ?? '';
+          blocks.forEach(handleBlock);
+        }
+      } catch (err) {
+        if (controller.signal.aborted) {
+          return;
+        }
+      }
+      await wait();
+    }
+  };
+
+  connect();
+  return () => controller.abort();
+};
@@ -1,3 +1,6 @@
+// Derivadas WebP geradas pelo backend (ex.: { small: url, large: url })
+export type ImageVariants = Record<string, string> | null;
+
 /**
  * Utility function to get the full avatar URL
  * @param avatarPath - The avatar path from the API (e.g., "/media/avatars/filename.png")
@@ -26,3 +29,18 @@ export const getAvatarUrl = (
   // If it's just a filename, construct the full path
   return `${BACKEND_BASE}/media/${avatarPath}`;
 };
+
+/**
+ * srcSet das derivadas de uma imagem de tweet (lados máximos em px)
+ */
+const TWEET_IMAGE_WIDTHS: Record<string, number> = { small: 640, large: 1280 };
+
+export const getImageSrcSet = (
+  variants: ImageVariants | undefined
+): string | undefined => {
+  if (!variants) return undefined;
+  return Object.entries(TWEET_IMAGE_WIDTHS)
+    .filter(([label]) => variants[label])
+    .map(([label, width]) => `${getAvatarUrl(variants[label])} ${width}w`)
+    .join(', ');
+};